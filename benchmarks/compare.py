@@ -0,0 +1,125 @@
+"""
+Сравнение отчёта бенчмарков с базовой линией; код возврата 1 — есть регрессия.
+
+    python -m benchmarks.compare benchmarks/baselines/micro.json /tmp/micro.json
+    python -m benchmarks.compare old-load.json new-load.json --metric p99 --threshold 15
+
+Понимает отчёты benchmarks.micro (время операции, по умолчанию min_ns — лучший раунд,
+меньше всего зависящий от фоновой нагрузки) и benchmarks.load (латентность сценария,
+по умолчанию p95). Чем значение больше, тем хуже.
+Порог (%) — --threshold, иначе threshold_pct из базовой линии; отдельные бенчмарки
+можно ослабить или ужесточить в базовой линии: "thresholds": {"имя": процент}.
+Бенчмарки, которых нет в одном из отчётов, показываются, но не считаются регрессией.
+"""
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any, Optional
+
+DEFAULT_THRESHOLD_PCT = 20.0
+
+
+@dataclass
+class Row:
+    name: str
+    baseline: Optional[float]
+    current: Optional[float]
+    threshold: float
+
+    @property
+    def change_pct(self) -> Optional[float]:
+        if not self.baseline or self.current is None:
+            return None
+        return (self.current - self.baseline) / self.baseline * 100
+
+    @property
+    def status(self) -> str:
+        if self.baseline is None:
+            return "new"
+        if self.current is None:
+            return "missing"
+        change = self.change_pct or 0.0
+        if change > self.threshold:
+            return "REGRESSION"
+        if change < -self.threshold:
+            return "improved"
+        return "ok"
+
+
+def load_report(path: str) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def extract(report: dict[str, Any], metric: Optional[str] = None) -> dict[str, float]:
+    """Значения метрики по именам бенчмарков (micro) или сценариев (load)."""
+    if "benchmarks" in report:
+        metric = metric or "min_ns"
+        return {name: item[metric] for name, item in report["benchmarks"].items()}
+    if "scenarios" in report:
+        metric = metric or "p95"
+        return {name: item["latency_ms"][metric] for name, item in report["scenarios"].items()}
+    raise ValueError("Unknown report format: expected 'benchmarks' or 'scenarios'")
+
+
+def compare_reports(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    *,
+    threshold: Optional[float] = None,
+    metric: Optional[str] = None,
+) -> tuple[list[Row], bool]:
+    """Строки сравнения и признак регрессии хотя бы одного бенчмарка."""
+    default = threshold if threshold is not None else baseline.get("threshold_pct", DEFAULT_THRESHOLD_PCT)
+    overrides = baseline.get("thresholds", {})
+    before = extract(baseline, metric)
+    after = extract(current, metric)
+
+    rows = [
+        Row(name, before.get(name), after.get(name), overrides.get(name, default))
+        for name in (*before, *(name for name in after if name not in before))
+    ]
+    return rows, any(row.status == "REGRESSION" for row in rows)
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:,.1f}"
+
+
+def print_comparison(rows: list[Row], file=sys.stdout) -> None:
+    width = max((len(row.name) for row in rows), default=10)
+    print(f"{'benchmark':<{width}}  {'baseline':>14}  {'current':>14}  {'change':>8}  limit  status", file=file)
+    for row in rows:
+        change = "-" if row.change_pct is None else f"{row.change_pct:+.1f}%"
+        print(
+            f"{row.name:<{width}}  {_fmt(row.baseline):>14}  {_fmt(row.current):>14}  "
+            f"{change:>8}  {row.threshold:>4.0f}%  {row.status}",
+            file=file,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare a benchmark report against a baseline")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="допустимое замедление, %% (по умолчанию — из базовой линии)")
+    parser.add_argument("--metric", default=None,
+                        help="micro: min_ns/median_ns/mean_ns; load: p50/p95/p99/mean/max")
+    args = parser.parse_args()
+
+    try:
+        rows, failed = compare_reports(
+            load_report(args.baseline), load_report(args.current), threshold=args.threshold, metric=args.metric
+        )
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(str(e))
+    print_comparison(rows)
+    if failed:
+        print("Performance regression beyond threshold", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
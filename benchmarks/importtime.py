@@ -0,0 +1,208 @@
+"""
+Время холодного старта процесса API (импорт и startup приложения) и проверка бюджета.
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --top 30 --json /tmp/importtime.json
+    python -m benchmarks.importtime --budget-ms 900 --runs 7
+
+Каждый замер — отдельный интерпретатор: `import src.main` (приложение, роутеры,
+DI-контейнер, настройки), затем startup из lifespan приложения (пул хеширования,
+Lua-скрипты Redis, L1-кеш сессий, брокер). Сидирование администраторов в замер не
+входит (SEED_ADMINS_ON_STARTUP=False, если не задано иначе) — это шаг деплоя, см.
+src.startup.add_admin. Отчёт по -X importtime одного прогона: самые дорогие модули
+(собственное и накопленное время) и собственное время по пакетам верхнего уровня.
+
+Код возврата 1, если медиана времени импорта вместе со startup больше --budget-ms
+(по умолчанию DEFAULT_BUDGET_MS, 0 — не проверять) или при импорте подгружается модуль
+из --forbid (по умолчанию — то, что должно загружаться лениво: taskiq, aio-pika, uvicorn).
+Та же проверка — в tests/test_startup_budget.py. Бюджет по умолчанию взят с запасом
+(~2.5x от замера на одном vCPU); на медленных машинах его задаёт STARTUP_BUDGET_MS.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+TARGET = "src.main"
+DEFAULT_FORBIDDEN = ("taskiq", "taskiq_aio_pika", "taskiq_fastapi", "aio_pika", "aiohttp", "uvicorn")
+DEFAULT_BUDGET_MS = float(os.environ.get("STARTUP_BUDGET_MS", 1500))
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# startup — вход в lifespan приложения target.app; shutdown в замер не входит
+_MEASURE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import {target} as target
+imported = time.perf_counter()
+startup_ms = None
+if {startup}:
+    async def startup():
+        lifespan = target.app.router.lifespan_context(target.app)
+        began = time.perf_counter()
+        await lifespan.__aenter__()
+        elapsed = time.perf_counter() - began
+        await lifespan.__aexit__(None, None, None)
+        return elapsed
+    startup_ms = asyncio.run(startup()) * 1000
+modules = sorted(sys.modules)
+print(json.dumps({{"import_ms": (imported - started) * 1000, "startup_ms": startup_ms, "modules": modules}}))
+"""
+
+
+@dataclass
+class Measurement:
+    import_ms: float
+    startup_ms: Optional[float]
+    modules: list[str]
+
+    @property
+    def total_ms(self) -> float:
+        return self.import_ms + (self.startup_ms or 0.0)
+
+
+@dataclass
+class ModuleTime:
+    name: str
+    self_ms: float
+    cumulative_ms: float
+
+
+def _run(args: list[str], env: Optional[dict[str, str]] = None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True, env=env, cwd=ROOT
+    )
+
+
+def measure_startup(target: str = TARGET, *, startup: bool = True) -> Measurement:
+    """
+    Время `import target` и startup его приложения (мс) в новом интерпретаторе
+    и список модулей, загруженных к концу startup.
+    """
+    env = dict(os.environ)
+    env.setdefault("SEED_ADMINS_ON_STARTUP", "False")
+    # без PYTHONDONTWRITEBYTECODE: меряем как на поде с уже скомпилированным .pyc
+    script = _MEASURE.format(target=target, startup=startup)
+    result = json.loads(_run(["-c", script], env=env).stdout.strip().splitlines()[-1])
+    return Measurement(result["import_ms"], result["startup_ms"], result["modules"])
+
+
+def import_profile(target: str = TARGET) -> list[ModuleTime]:
+    """Разбор вывода -X importtime: собственное и накопленное время каждого модуля (мс)."""
+    stderr = _run(["-X", "importtime", "-c", f"import {target}"]).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append(ModuleTime(name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+    return modules
+
+
+def forbidden_modules(modules: list[str], forbid: list[str] | tuple[str, ...]) -> list[str]:
+    """Загруженные модули из пакетов forbid (и их подмодули)."""
+    return sorted(
+        {name for name in modules for prefix in forbid if name == prefix or name.startswith(prefix + ".")}
+    )
+
+
+def by_package(modules: list[ModuleTime]) -> dict[str, float]:
+    """Собственное время импорта, сложенное по пакету верхнего уровня."""
+    totals: dict[str, float] = defaultdict(float)
+    for module in modules:
+        totals[module.name.split(".")[0]] += module.self_ms
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def report(args: argparse.Namespace) -> tuple[dict[str, Any], list[str]]:
+    """Отчёт и список нарушений (пустой — проверка пройдена)."""
+    # первый прогон прогревает .pyc и файловый кеш, в замеры не идёт
+    modules = measure_startup(args.target, startup=args.startup).modules
+    runs = sorted(
+        (measure_startup(args.target, startup=args.startup) for _ in range(args.runs)), key=lambda m: m.total_ms
+    )
+    median = statistics.median(m.total_ms for m in runs)
+
+    profile = import_profile(args.target)
+    forbidden = forbidden_modules(modules, args.forbid)
+
+    problems = []
+    what = f"import {args.target}" + (" + startup" if args.startup else "")
+    if args.budget_ms and median > args.budget_ms:
+        problems.append(f"{what}: median {median:.0f} ms > budget {args.budget_ms:.0f} ms")
+    for name in forbidden:
+        if "." not in name:
+            problems.append(f"{what} loads {name}, which must be imported lazily")
+
+    data = {
+        "target": args.target,
+        "python": sys.version.split()[0],
+        "startup": args.startup,
+        "runs_ms": [round(m.total_ms, 1) for m in runs],
+        "median_ms": round(median, 1),
+        "median_import_ms": round(statistics.median(m.import_ms for m in runs), 1),
+        "median_startup_ms": (
+            round(statistics.median(m.startup_ms for m in runs), 1) if args.startup else None
+        ),
+        "budget_ms": args.budget_ms or None,
+        "modules_loaded": len(modules),
+        "forbidden_loaded": forbidden,
+        "packages_self_ms": {name: round(ms, 1) for name, ms in list(by_package(profile).items())[: args.top]},
+        "top_cumulative": [
+            asdict(m) for m in sorted(profile, key=lambda m: m.cumulative_ms, reverse=True)[: args.top]
+        ],
+        "top_self": [asdict(m) for m in sorted(profile, key=lambda m: m.self_ms, reverse=True)[: args.top]],
+    }
+    return data, problems
+
+
+def print_report(data: dict[str, Any], file=sys.stdout) -> None:
+    budget = f" (budget {data['budget_ms']:.0f} ms)" if data["budget_ms"] is not None else ""
+    startup = f" + startup {data['median_startup_ms']:.0f} ms" if data["startup"] else ""
+    print(f"import {data['target']} {data['median_import_ms']:.0f} ms{startup}: median {data['median_ms']:.0f} ms"
+          f"{budget}, runs {data['runs_ms']}, {data['modules_loaded']} modules", file=file)
+    print("\nself time by top-level package, ms:", file=file)
+    for name, ms in data["packages_self_ms"].items():
+        print(f"  {ms:>8.1f}  {name}", file=file)
+    print("\nslowest modules (cumulative / self, ms; -X importtime adds overhead):", file=file)
+    for item in data["top_cumulative"]:
+        print(f"  {item['cumulative_ms']:>8.1f}  {item['self_ms']:>7.1f}  {item['name']}", file=file)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time report and startup budget check")
+    parser.add_argument("--target", default=TARGET, help="импортируемый модуль")
+    parser.add_argument("--runs", type=int, default=5, help="число холодных замеров")
+    parser.add_argument("--top", type=int, default=20, help="строк в отчёте")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="допустимая медиана импорта + startup, мс (0 — не проверять); превышение — код 1")
+    parser.add_argument("--no-startup", dest="startup", action="store_false",
+                        help="мерить только импорт, без startup приложения")
+    parser.add_argument("--forbid", default=",".join(DEFAULT_FORBIDDEN),
+                        help="пакеты, которые не должны загружаться при импорте (через запятую)")
+    parser.add_argument("--json", dest="json_path", default=None, help="сохранить отчёт в JSON")
+    args = parser.parse_args()
+    args.forbid = [name.strip() for name in args.forbid.split(",") if name.strip()]
+
+    try:
+        data, problems = report(args)
+    except subprocess.CalledProcessError as e:
+        print(e.stderr, file=sys.stderr)
+        sys.exit(2)
+
+    print_report(data)
+    if args.json_path:
+        os.makedirs(os.path.dirname(args.json_path) or ".", exist_ok=True)
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
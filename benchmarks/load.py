@@ -0,0 +1,316 @@
+"""
+Нагрузочный бенчмарк основных сценариев в одном процессе: настоящее приложение
+src.main:app через ASGI-транспорт httpx (без сети и uvicorn), локальные Postgres
+(настройки DB_* из .env, миграции применены) и Redis — или Redis в памяти (fakeredis).
+
+    python -m benchmarks.load
+    python -m benchmarks.load --concurrency 32 --requests 2000 --redis memory
+    python -m benchmarks.load --scenarios login,me --output benchmarks/results/load.json
+
+Сценарии: register, login, me, patch, admin_list, mixed (me/patch/login/admin_list
+в пропорции 70/10/10/10). Результат — JSON с пропускной способностью и p50/p95/p99
+по каждому сценарию и настройками прогона — отчёты разных коммитов можно сравнивать.
+
+Нужны httpx (и fakeredis для --redis memory): pip install httpx fakeredis.
+Ограничение попыток входа на время прогона отключается (все запросы — с одного IP),
+если явно не задано LOGIN_THROTTLE_ENABLED. Созданные пользователи bench-*
+удаляются в конце прогона.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+SCENARIOS = ("register", "login", "me", "patch", "admin_list", "mixed")
+MIXED_WEIGHTS = {"me": 70, "patch": 10, "login": 10, "admin_list": 10}
+PASSWORD = "bench-password"
+SUPER_ADMIN = ("superadmin@example.com", "superpass")
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    concurrency: int
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+    duration: float = 0.0
+
+    def to_json(self) -> dict[str, Any]:
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+        return {
+            "requests": count,
+            "concurrency": self.concurrency,
+            "errors": self.errors,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "duration_s": round(self.duration, 4),
+            "throughput_rps": round(count / self.duration, 2) if self.duration else 0.0,
+            "latency_ms": {
+                "mean": round(sum(ordered) / count * 1000, 3) if count else None,
+                "p50": percentile(ordered, 50),
+                "p95": percentile(ordered, 95),
+                "p99": percentile(ordered, 99),
+                "max": round(ordered[-1] * 1000, 3) if count else None,
+            },
+        }
+
+
+def percentile(ordered: list[float], q: float) -> Optional[float]:
+    """Перцентиль по рангу (nearest-rank) в мс."""
+    if not ordered:
+        return None
+    rank = min(len(ordered), max(1, math.ceil(q / 100 * len(ordered)))) - 1
+    return round(ordered[rank] * 1000, 3)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def use_memory_redis() -> None:
+    """Подменяет Redis.from_url до импорта приложения: все клиенты — один fakeredis-сервер."""
+    import fakeredis
+    import redis.asyncio
+
+    server = fakeredis.FakeServer()
+    redis.asyncio.Redis.from_url = staticmethod(
+        lambda *args, **kwargs: fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    )
+
+
+class Bench:
+    def __init__(self, app, *, concurrency: int, requests: int, run_id: str) -> None:
+        import httpx
+
+        self.app = app
+        self.concurrency = concurrency
+        self.requests = requests
+        self.run_id = run_id
+        self._transport = httpx.ASGITransport(app=app)
+        self._httpx = httpx
+        self._seq = 0
+        self.users: list[str] = []
+        self.clients: list[Any] = []
+        self.admin: Any = None
+
+    def client(self):
+        return self._httpx.AsyncClient(transport=self._transport, base_url="https://bench")
+
+    def next_email(self) -> str:
+        self._seq += 1
+        return f"bench-{self.run_id}-{self._seq}@example.com"
+
+    async def register(self, client, email: Optional[str] = None) -> int:
+        email = email or self.next_email()
+        r = await client.post(
+            "/auth/register",
+            json={
+                "email": email,
+                "password": PASSWORD,
+                "password_confirm": PASSWORD,
+                "first_name": "Bench",
+                "last_name": "User",
+            },
+        )
+        return r.status_code
+
+    async def login(self, client, email: str, password: str = PASSWORD) -> int:
+        r = await client.post("/auth/login", json={"email": email, "password": password})
+        return r.status_code
+
+    async def setup(self) -> None:
+        """По пользователю и авторизованному клиенту на каждого воркера + суперадмин."""
+        setup_client = self.client()
+        for _ in range(self.concurrency):
+            email = self.next_email()
+            status = await self.register(setup_client, email)
+            if status != 201:
+                raise RuntimeError(f"Register failed during setup: HTTP {status}")
+            self.users.append(email)
+        await setup_client.aclose()
+
+        for email in self.users:
+            client = self.client()
+            if await self.login(client, email) != 200:
+                raise RuntimeError(f"Login failed during setup for {email}")
+            self.clients.append(client)
+
+        self.admin = self.client()
+        if await self.login(self.admin, *SUPER_ADMIN) != 200:
+            raise RuntimeError("Super admin login failed (create_default_admins must have run)")
+
+    async def close(self) -> None:
+        for client in (*self.clients, self.admin):
+            if client is not None:
+                await client.aclose()
+
+    # ---------- операции одного запроса; возвращают HTTP-статус ----------
+    async def op_register(self, worker: int) -> int:
+        return await self.register(self.clients[worker])
+
+    async def op_login(self, worker: int) -> int:
+        # отдельный клиент, чтобы не подменять cookie рабочего клиента
+        async with self.client() as client:
+            return await self.login(client, self.users[worker])
+
+    async def op_me(self, worker: int) -> int:
+        return (await self.clients[worker].get("/api/users/me")).status_code
+
+    async def op_patch(self, worker: int) -> int:
+        r = await self.clients[worker].patch(
+            "/api/users/me", json={"first_name": f"Bench{random.randrange(1000)}"}
+        )
+        return r.status_code
+
+    async def op_admin_list(self, worker: int) -> int:
+        return (await self.admin.get("/api/admins/users", params={"limit": 50})).status_code
+
+    async def op_mixed(self, worker: int) -> int:
+        name = random.choices(list(MIXED_WEIGHTS), weights=list(MIXED_WEIGHTS.values()))[0]
+        return await getattr(self, f"op_{name}")(worker)
+
+    async def run(self, name: str, warmup: int) -> ScenarioResult:
+        op: Callable[[int], Awaitable[int]] = getattr(self, f"op_{name}")
+        result = ScenarioResult(name, self.concurrency)
+
+        for i in range(warmup):
+            await op(i % self.concurrency)
+
+        per_worker, extra = divmod(self.requests, self.concurrency)
+
+        async def worker(index: int) -> None:
+            for _ in range(per_worker + (1 if index < extra else 0)):
+                started = time.perf_counter()
+                try:
+                    status = await op(index)
+                except Exception:
+                    result.errors += 1
+                    continue
+                result.latencies.append(time.perf_counter() - started)
+                result.statuses[status] += 1
+                if status >= 400:
+                    result.errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(self.concurrency)))
+        result.duration = time.perf_counter() - started
+        return result
+
+
+async def cleanup(run_id: str) -> None:
+    from sqlalchemy import delete
+
+    from src.database import db_helper
+    from src.database.models import User
+
+    async with db_helper.session_factory() as session:
+        await session.execute(delete(User).where(User.email.like(f"bench-{run_id}-%")))
+        await session.commit()
+
+
+def describe_settings() -> dict[str, Any]:
+    from src.core.config.settings import settings
+
+    return {
+        "password_hasher": settings.security.password_hasher,
+        "bcrypt_rounds": settings.security.bcrypt_rounds,
+        "hash_workers": settings.security.hash_workers,
+        "session_mode": settings.session.mode,
+        "session_cache": settings.session.cache_enabled,
+        "session_snapshot": settings.session.snapshot_enabled,
+        "admission": settings.admission.enabled,
+        "login_throttle": settings.throttle.enabled,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    from src.main import app
+
+    run_id = uuid.uuid4().hex[:8]
+    report: dict[str, Any] = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "redis": args.redis,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "settings": describe_settings(),
+        },
+        "scenarios": {},
+    }
+
+    async with app.router.lifespan_context(app):
+        bench = Bench(app, concurrency=args.concurrency, requests=args.requests, run_id=run_id)
+        try:
+            await bench.setup()
+            for name in args.scenarios:
+                result = await bench.run(name, args.warmup)
+                report["scenarios"][name] = result.to_json()
+                print_row(name, report["scenarios"][name])
+        finally:
+            await bench.close()
+            await cleanup(run_id)
+    return report
+
+
+def print_row(name: str, row: dict[str, Any]) -> None:
+    latency = row["latency_ms"]
+    print(
+        f"{name:<11} {row['throughput_rps']:>9.1f} rps  "
+        f"p50 {latency['p50']:>8} ms  p95 {latency['p95']:>8} ms  p99 {latency['p99']:>8} ms  "
+        f"errors {row['errors']}",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-process load benchmark of auth/API hot paths")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"через запятую, из: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="запросов на сценарий")
+    parser.add_argument("--warmup", type=int, default=20, help="запросов прогрева на сценарий (не учитываются)")
+    parser.add_argument("--redis", choices=("local", "memory"), default="local",
+                        help="local — Redis из настроек, memory — fakeredis в процессе")
+    parser.add_argument("--output", default=None, help="JSON-отчёт (по умолчанию — stdout)")
+    args = parser.parse_args()
+
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    # настройки читаются при импорте приложения — всё окружение готовим до него
+    os.environ.setdefault("LOGIN_THROTTLE_ENABLED", "False")
+    if args.redis == "memory":
+        use_memory_redis()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
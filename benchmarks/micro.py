@@ -0,0 +1,486 @@
+"""
+Микробенчмарки горячих частей аутентификации и Redis-слоя (без HTTP и Postgres):
+создание и чтение сессии, построение ключей и операции RedisRepo, кодек сессии,
+разрешение guard-зависимостей FastAPI/Dishka и сериализация UserOut/AdminOut.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --filter session --output /tmp/micro.json
+    python -m benchmarks.micro --output benchmarks/baselines/micro.json   # записать базовую линию
+    python -m benchmarks.micro --compare benchmarks/baselines/micro.json
+
+Время — на одну операцию (нс): каждый бенчмарк калибруется, как timeit.autorange,
+до --min-time секунд на раунд и повторяется --repeat раундов; в отчёте min/median/mean.
+С --compare результат сравнивается с базовой линией (см. benchmarks.compare),
+и код возврата ненулевой, если какой-либо бенчмарк замедлился сильнее порога.
+
+Redis по умолчанию — fakeredis в процессе (нужны fakeredis и lupa для Lua-скриптов),
+поэтому цифры отражают стоимость клиента и нашего кода, а не сети; --redis local —
+Redis из настроек. Базовые линии сравнимы только между прогонами на одной машине,
+поэтому в репозитории не хранятся (benchmarks/baselines/ в .gitignore): базовую линию
+записывают на исходном коммите перед сравнением.
+"""
+import argparse
+import asyncio
+import datetime
+import gc
+import inspect
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from benchmarks.compare import DEFAULT_THRESHOLD_PCT, compare_reports, load_report, print_comparison
+from benchmarks.load import git_revision, use_memory_redis
+
+Op = Callable[[], Union[None, Awaitable[Any]]]
+Factory = Callable[["Context"], Awaitable[Op]]
+
+BENCHMARKS: dict[str, Factory] = {}
+
+
+def benchmark(name: str) -> Callable[[Factory], Factory]:
+    """Регистрирует фабрику бенчмарка: async (ctx) -> операция (функция или корутина)."""
+
+    def decorator(factory: Factory) -> Factory:
+        BENCHMARKS[name] = factory
+        return factory
+
+    return decorator
+
+
+class Context:
+    """Общие объекты бенчмарков: сервисы аутентификации без БД и готовые сессии."""
+
+    def __init__(self) -> None:
+        from src.api.auth.services import AuthService
+
+        self.user_ids = itertools.count(10_000_000)
+        self.service = AuthService(None, snapshot_enabled=False, session_mode="redis")  # type: ignore[arg-type]
+        self.snapshot_service = AuthService(None, snapshot_enabled=True, session_mode="redis")  # type: ignore[arg-type]
+        self.token_service = AuthService(None, session_mode="token")  # type: ignore[arg-type]
+
+    async def session(self, flags: int) -> str:
+        """Сессия со снапшотом (версия совпадает с user_ver) — чтение обходится без БД."""
+        from src.redis_storage.repositories.sessions import SessionRepo
+        from src.redis_storage.session_codec import SessionRecord
+
+        user_id = next(self.user_ids)
+        now = int(time.time())
+        sid = SessionRepo.make_sid(user_id)
+        record = SessionRecord(
+            user_id,
+            now,
+            now + self.service.session_ttl,
+            version="0",
+            email=f"bench-{user_id}@example.com",
+            first_name="Bench",
+            last_name="User",
+            flags=flags,
+        )
+        await SessionRepo(ttl=self.service.session_ttl).create(sid, record)
+        return sid
+
+
+def _guard_app():
+    """Минимальное приложение: те же guard'ы и DishkaRoute, AuthService без БД."""
+    from dishka import Provider, Scope, make_async_container, provide
+    from dishka.integrations.fastapi import DishkaRoute, FastapiProvider, setup_dishka
+    from fastapi import APIRouter, Depends, FastAPI, Response
+
+    from src.api.auth.services import AuthService
+    from src.guards import require_admin, require_user
+
+    class BenchAuthProvider(Provider):
+        scope = Scope.REQUEST
+
+        @provide
+        def service(self) -> AuthService:
+            return AuthService(None, snapshot_enabled=True, session_mode="redis")  # type: ignore[arg-type]
+
+    router = APIRouter(route_class=DishkaRoute)
+
+    @router.get("/none")
+    async def no_guard() -> Response:
+        return Response(status_code=204)
+
+    @router.get("/user", dependencies=[Depends(require_user)])
+    async def user_guard() -> Response:
+        return Response(status_code=204)
+
+    @router.get("/admin", dependencies=[Depends(require_admin)])
+    async def admin_guard() -> Response:
+        return Response(status_code=204)
+
+    app = FastAPI()
+    app.include_router(router)
+    setup_dishka(make_async_container(FastapiProvider(), BenchAuthProvider()), app)
+    return app
+
+
+def _asgi_get(app, path: str, cookie: str) -> Callable[[], Awaitable[None]]:
+    """GET напрямую через ASGI (без HTTP-клиента); не-204 — ошибка бенчмарка."""
+    headers = [(b"host", b"bench"), (b"cookie", f"sessionid={cookie}".encode())]
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def call() -> None:
+        status = 0
+
+        async def send(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+        await app(scope, receive, send)
+        if status != 204:
+            raise RuntimeError(f"GET {path}: HTTP {status}")
+
+    return call
+
+
+def _user(user_id: int = 1):
+    from src.database.models import User
+
+    return User(
+        id=user_id,
+        email=f"user{user_id}@example.com",
+        password_hash="x",
+        first_name="Ivan",
+        last_name="Petrov",
+        middle_name="Sergeevich",
+        is_active=True,
+        created_at=datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc),
+    )
+
+
+# ---------- ключи и операции RedisRepo ----------
+@benchmark("redis_key_build")
+async def _(ctx: Context) -> Op:
+    from src.redis_storage.repositories import RedisRepo
+
+    repo = RedisRepo(prefix="bench")
+    return lambda: repo._key("42")
+
+
+@benchmark("session_key_build")
+async def _(ctx: Context) -> Op:
+    from src.redis_storage.repositories.sessions import SessionRepo
+
+    repo = SessionRepo()
+    sid = SessionRepo.make_sid(42)
+    return lambda: (repo._key(sid), SessionRepo._index_key(42))
+
+
+@benchmark("redis_h_set")
+async def _(ctx: Context) -> Op:
+    from src.redis_storage.repositories import RedisRepo
+
+    repo = RedisRepo(prefix="bench_h", key="1", ttl=60)
+    data = {"user_id": "1", "email": "user1@example.com", "name": "Ivan"}
+    return lambda: repo.h_set(data)
+
+
+@benchmark("redis_h_get_all")
+async def _(ctx: Context) -> Op:
+    from src.redis_storage.repositories import RedisRepo
+
+    repo = RedisRepo(prefix="bench_h", key="2", ttl=60)
+    await repo.h_set({"user_id": "2", "email": "user2@example.com", "name": "Ivan"})
+    return repo.h_get_all
+
+
+# ---------- сессии ----------
+@benchmark("session_repo_create")
+async def _(ctx: Context) -> Op:
+    from src.redis_storage.repositories.sessions import SessionRepo
+    from src.redis_storage.session_codec import FLAG_ACTIVE, SessionRecord
+
+    repo = SessionRepo(ttl=ctx.service.session_ttl)
+    now = int(time.time())
+
+    def op() -> Awaitable[None]:
+        # новый пользователь на каждый вызов: индекс user_sessions не растёт от итерации к итерации
+        user_id = next(ctx.user_ids)
+        record = SessionRecord(user_id, now, now + repo.ttl, "0", "user@example.com", "Ivan", "Petrov", None, FLAG_ACTIVE)
+        return repo.create(SessionRepo.make_sid(user_id), record)
+
+    return op
+
+
+@benchmark("session_repo_load")
+async def _(ctx: Context) -> Op:
+    # как AuthService._load_session в режиме снапшотов: сессия + user_ver за один вызов
+    from src.redis_storage.keys import tagged_prefix
+    from src.redis_storage.repositories.sessions import SessionRepo, sid_tag
+    from src.redis_storage.session_codec import FLAG_ACTIVE
+    from src.redis_storage.user_versions import USER_VERSION_PREFIX
+
+    sid = await ctx.session(FLAG_ACTIVE)
+    repo = SessionRepo(key=sid, ttl=ctx.service.session_ttl)
+    version_prefix = tagged_prefix(USER_VERSION_PREFIX, sid_tag(sid))
+    return lambda: repo.load(version_prefix)
+
+
+@benchmark("session_encode")
+async def _(ctx: Context) -> Op:
+    from src.redis_storage.session_codec import FLAG_ACTIVE, SessionRecord, encode_session
+
+    record = SessionRecord(1, 1_700_000_000, 1_700_043_200, "3", "user1@example.com", "Ivan", "Petrov", None, FLAG_ACTIVE)
+    return lambda: encode_session(record)
+
+
+@benchmark("session_decode")
+async def _(ctx: Context) -> Op:
+    from src.redis_storage.session_codec import FLAG_ACTIVE, SessionRecord, decode_session, encode_session
+
+    value = encode_session(
+        SessionRecord(1, 1_700_000_000, 1_700_043_200, "3", "user1@example.com", "Ivan", "Petrov", None, FLAG_ACTIVE)
+    )
+    return lambda: decode_session(value)
+
+
+@benchmark("session_create")
+async def _(ctx: Context) -> Op:
+    # новый пользователь на каждый вызов: индекс user_sessions не растёт от итерации к итерации
+    return lambda: ctx.service._create_session(next(ctx.user_ids))
+
+
+@benchmark("session_get_current_user")
+async def _(ctx: Context) -> Op:
+    from src.redis_storage.session_codec import FLAG_ACTIVE
+
+    sid = await ctx.session(FLAG_ACTIVE)
+    return lambda: ctx.snapshot_service.get_current_user(sid)
+
+
+@benchmark("token_get_current_principal")
+async def _(ctx: Context) -> Op:
+    from src.core.security.tokens import SessionToken, token_signer
+
+    now = int(time.time() * 1000)
+    value = token_signer.sign(
+        SessionToken(
+            user_id=1,
+            jti="bench",
+            issued_at=now,
+            expires_at=now + 3600_000,
+            refresh_until=now + 7200_000,
+            is_active=True,
+            is_admin=False,
+            is_super_admin=False,
+        )
+    )
+    return lambda: ctx.token_service.get_current_principal(value)
+
+
+# ---------- guard'ы ----------
+@benchmark("guard_none")
+async def _(ctx: Context) -> Op:
+    return _asgi_get(_guard_app(), "/none", "-")
+
+
+@benchmark("guard_require_user")
+async def _(ctx: Context) -> Op:
+    from src.redis_storage.session_codec import FLAG_ACTIVE
+
+    return _asgi_get(_guard_app(), "/user", await ctx.session(FLAG_ACTIVE))
+
+
+@benchmark("guard_require_admin")
+async def _(ctx: Context) -> Op:
+    from src.redis_storage.session_codec import FLAG_ACTIVE, FLAG_ADMIN
+
+    return _asgi_get(_guard_app(), "/admin", await ctx.session(FLAG_ACTIVE | FLAG_ADMIN))
+
+
+# ---------- сериализация ----------
+@benchmark("serialize_user_out_orm")
+async def _(ctx: Context) -> Op:
+    from src.api.users.schemas import UserOut
+
+    user = _user()
+    return lambda: UserOut.model_validate(user).model_dump_json()
+
+
+@benchmark("serialize_user_out_snapshot")
+async def _(ctx: Context) -> Op:
+    from src.api.auth.services import _snapshot_from_record
+    from src.api.users.schemas import UserOut
+    from src.redis_storage.session_codec import FLAG_ACTIVE, SessionRecord
+
+    snapshot = _snapshot_from_record(
+        SessionRecord(1, 0, 0, "0", "user1@example.com", "Ivan", "Petrov", None, FLAG_ACTIVE)
+    )
+    return lambda: UserOut.model_validate(snapshot).model_dump_json()
+
+
+@benchmark("serialize_admin_out")
+async def _(ctx: Context) -> Op:
+    from src.api.admins.schemas import AdminOut
+    from src.database.models.admins import Admin
+
+    admin = Admin(id=1, user_id=1, super_admin=False)
+    return lambda: AdminOut.model_validate(admin).model_dump_json()
+
+
+@benchmark("serialize_user_page_50")
+async def _(ctx: Context) -> Op:
+    from src.api.admins.schemas import AdminUserOut, UserPage
+
+    users = [_user(i) for i in range(1, 51)]
+
+    def op() -> str:
+        items = [
+            AdminUserOut(
+                id=u.id,
+                email=u.email,
+                first_name=u.first_name,
+                last_name=u.last_name,
+                middle_name=u.middle_name,
+                is_active=u.is_active,
+                created_at=u.created_at,
+                is_admin=False,
+                is_super_admin=False,
+            )
+            for u in users
+        ]
+        return UserPage(items=items, next_cursor="cursor").model_dump_json()
+
+    return op
+
+
+async def measure(op: Op, *, min_time: float, repeat: int) -> dict[str, Any]:
+    """Время одной операции (нс) по раундам из number вызовов, number подбирается как в timeit."""
+    # первый вызов — прогрев; заодно видно, возвращает ли операция awaitable
+    result = op()
+    is_async = inspect.isawaitable(result)
+    if is_async:
+        await result  # type: ignore[misc]
+
+    async def run(number: int) -> float:
+        # как timeit: сборщик мусора выключен на время раунда, чтобы паузы GC
+        # от предыдущих бенчмарков не попадали в замер
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            if is_async:
+                for _ in range(number):
+                    await op()  # type: ignore[misc]
+            else:
+                for _ in range(number):
+                    op()
+            return time.perf_counter() - started
+        finally:
+            gc.enable()
+
+    number = 1
+    while True:
+        elapsed = await run(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+
+    per_op = sorted([(await run(number)) / number * 1e9 for _ in range(repeat)])
+    return {
+        "number": number,
+        "rounds": repeat,
+        "min_ns": round(per_op[0], 1),
+        "median_ns": round(statistics.median(per_op), 1),
+        "mean_ns": round(statistics.fmean(per_op), 1),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    # порядок импорта: src.api до src.guards (циклический импорт guards <-> api)
+    import src.api  # noqa: F401
+    from src.redis_storage import scripts
+
+    scripts_loaded = await scripts.load_scripts()
+    ctx = Context()
+    report: dict[str, Any] = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "redis": args.redis,
+            "scripts": scripts_loaded,
+            "min_time": args.min_time,
+            "repeat": args.repeat,
+        },
+        "threshold_pct": DEFAULT_THRESHOLD_PCT,
+        "benchmarks": {},
+    }
+    for name, factory in BENCHMARKS.items():
+        if args.filter and not any(f in name for f in args.filter):
+            continue
+        op = await factory(ctx)
+        result = await measure(op, min_time=args.min_time, repeat=args.repeat)
+        report["benchmarks"][name] = result
+        print(f"{name:<30} {result['median_ns'] / 1000:>10.2f} us  (min {result['min_ns'] / 1000:.2f})",
+              file=sys.stderr)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmarks of auth/Redis hot paths")
+    parser.add_argument("--filter", default="", help="подстроки имён через запятую")
+    parser.add_argument("--min-time", type=float, default=0.05, help="минимальная длительность раунда, с")
+    parser.add_argument("--repeat", type=int, default=7, help="число раундов")
+    parser.add_argument("--redis", choices=("local", "memory"), default="memory",
+                        help="memory — fakeredis в процессе, local — Redis из настроек")
+    parser.add_argument("--output", default=None, help="JSON-отчёт (по умолчанию — stdout, если нет --compare)")
+    parser.add_argument("--compare", metavar="BASELINE", default=None,
+                        help="сравнить с базовой линией; код возврата 1 при регрессии")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="допустимое замедление, %% (по умолчанию — из базовой линии)")
+    args = parser.parse_args()
+    args.filter = [f.strip() for f in args.filter.split(",") if f.strip()]
+
+    if args.redis == "memory":
+        use_memory_redis()
+
+    report = asyncio.run(run(args))
+    if args.output and os.path.exists(args.output):
+        # перезапись базовой линии сохраняет настроенные в ней пороги
+        previous = load_report(args.output)
+        for key in ("threshold_pct", "thresholds"):
+            if key in previous:
+                report[key] = previous[key]
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+
+        rows, failed = compare_reports(load_report(args.compare), report, threshold=args.threshold)
+        print_comparison(rows)
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
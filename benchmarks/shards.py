@@ -0,0 +1,213 @@
+"""
+Проверка шардированного хранения сессий на нескольких локальных Redis.
+
+    python -m benchmarks.shards
+    python -m benchmarks.shards --nodes 4 --users 5000 --sessions 3
+    python -m benchmarks.shards --urls redis://127.0.0.1:7001/0,redis://127.0.0.1:7002/0 --flush
+
+Без --urls запускает --nodes процессов `redis-server --port N` (нужен redis-server в PATH;
+порты — свободные, начиная с --base-port), без --urls узлы останавливаются в конце.
+Проверка считает ключи узлов, поэтому узлы очищаются (FLUSHDB) до и после неё: запущенные
+скриптом — всегда, узлы из --urls — только с явным --flush (их данные будут удалены),
+без него скрипт откажется работать с чужими узлами.
+Приложение настраивается на них через REDIS_SHARD_URLS, первый узел — основной (REDIS_HOST).
+
+Через SessionRepo создаются сессии --users пользователей и проверяется, что:
+  - ключи распределены по всем узлам, и доля каждого отличается от средней не больше
+    чем на --max-skew (доля от среднего, по умолчанию 0.3);
+  - сессии, индекс user_sessions и user_ver пользователя лежат на одном узле —
+    на том, который выбирает RedisBackend, и ни на каком другом;
+  - SessionRepo.load читает каждую сессию по SID;
+  - revoke_all удаляет сессии и индекс пользователя на его узле и не трогает
+    ключи остальных пользователей.
+Код возврата 1, если какая-то проверка не прошла.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+
+def _port_is_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex(("127.0.0.1", port)) != 0
+
+
+@contextmanager
+def redis_servers(count: int, base_port: int, binary: str) -> Iterator[list[str]]:
+    """Запускает count процессов redis-server без персистентности; отдаёт их URL."""
+    if shutil.which(binary) is None:
+        raise SystemExit(f"{binary} not found in PATH (or pass --urls of running nodes)")
+    ports: list[int] = []
+    port = base_port
+    while len(ports) < count:
+        if _port_is_free(port):
+            ports.append(port)
+        port += 1
+
+    processes = [
+        subprocess.Popen(
+            [binary, "--port", str(p), "--bind", "127.0.0.1", "--save", "", "--appendonly", "no"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for p in ports
+    ]
+    try:
+        deadline = time.monotonic() + 10
+        while any(_port_is_free(p) for p in ports):
+            if time.monotonic() > deadline or any(proc.poll() is not None for proc in processes):
+                raise SystemExit(f"redis-server did not start on ports {ports}")
+            time.sleep(0.05)
+        yield [f"redis://127.0.0.1:{p}/0" for p in ports]
+    finally:
+        for proc in processes:
+            proc.terminate()
+        for proc in processes:
+            proc.wait(timeout=10)
+
+
+def configure(urls: list[str], *, spawned: bool) -> None:
+    """Окружение для настроек приложения — до первого импорта src."""
+    os.environ["REDIS_SHARD_URLS"] = ",".join(urls)
+    os.environ["REDIS_CLUSTER_URL"] = ""
+    if spawned:
+        host, port = urls[0].removeprefix("redis://").split("/")[0].rsplit(":", 1)
+        os.environ.update(REDIS_HOST=host, REDIS_PORT=port, REDIS_PASSWORD="", REDIS_DB="0")
+
+
+async def check(args: argparse.Namespace, urls: list[str]) -> list[str]:
+    """Список нарушений (пустой — всё в порядке). Очищает узлы до и после проверки."""
+    from src.redis_storage import backend, scripts
+    from src.redis_storage.keys import tagged_prefix, user_tag
+    from src.redis_storage.repositories.sessions import SessionRepo
+    from src.redis_storage.session_codec import SessionRecord
+    from src.redis_storage.user_versions import USER_VERSION_PREFIX, bump_user_version
+
+    problems: list[str] = []
+    if len(backend.nodes) != len(urls):
+        return [f"backend has {len(backend.nodes)} node(s), expected {len(urls)}"]
+    names = {id(node): url for node, url in zip(backend.nodes, urls)}
+
+    for node in backend.nodes:
+        await node.flushdb()
+    await scripts.load_scripts()
+    print(f"nodes: {len(urls)}, Lua scripts: {'on' if scripts.scripts_available else 'off'}")
+
+    repo = SessionRepo(ttl=3600)
+    now = int(time.time())
+    sids: dict[int, list[str]] = {}
+    for user_id in range(1, args.users + 1):
+        sids[user_id] = []
+        for _ in range(args.sessions):
+            sid = SessionRepo.make_sid(user_id)
+            await repo.create(sid, SessionRecord(user_id=user_id, issued_at=now, expires_at=now + 3600))
+            sids[user_id].append(sid)
+        await bump_user_version(user_id)
+
+    # распределение ключей по узлам
+    sizes = {names[id(node)]: await node.dbsize() for node in backend.nodes}
+    mean = sum(sizes.values()) / len(sizes)
+    print("keys per node:")
+    for url, size in sizes.items():
+        print(f"  {url}: {size} ({(size - mean) / mean:+.1%} from mean)")
+        if abs(size - mean) > args.max_skew * mean:
+            problems.append(f"{url} holds {size} keys, mean {mean:.0f}: skew above {args.max_skew:.0%}")
+
+    # ключи пользователя — на узле, который выбирает backend, и только на нём
+    misplaced = 0
+    for user_id, user_sids in sids.items():
+        keys = [
+            *(repo._key(sid) for sid in user_sids),
+            SessionRepo._index_key(user_id),
+            f"{tagged_prefix(USER_VERSION_PREFIX, user_tag(user_id))}:{user_id}",
+        ]
+        owner = backend.client_for(keys[0])
+        for key in keys:
+            if backend.client_for(key) is not owner:
+                problems.append(f"user {user_id}: {key} routes to another node than its sessions")
+            for node in backend.nodes:
+                if bool(await node.exists(key)) != (node is owner):
+                    misplaced += 1
+        for sid in user_sids:
+            record, _, _ = await SessionRepo(key=sid).load()
+            if record is None or record.user_id != user_id:
+                problems.append(f"user {user_id}: session {sid} cannot be loaded")
+    if misplaced:
+        problems.append(f"{misplaced} key(s) are missing on their node or present on another")
+    print(f"co-location: {'ok' if not misplaced else f'{misplaced} misplaced'}")
+
+    # revoke_all — на узле пользователя, соседей не задевает
+    revoked_users = list(sids)[:: max(1, len(sids) // args.revoke)][: args.revoke]
+    before = {id(node): await node.dbsize() for node in backend.nodes}
+    expected = Counter()
+    for user_id in revoked_users:
+        owner = backend.client_for(SessionRepo._index_key(user_id))
+        revoked = await repo.revoke_all(user_id)
+        if sorted(revoked) != sorted(sids[user_id]):
+            problems.append(f"user {user_id}: revoke_all returned {len(revoked)} of {len(sids[user_id])} SIDs")
+        # сессии + индекс; user_ver остаётся
+        expected[id(owner)] += len(sids[user_id]) + 1
+        for sid in sids[user_id]:
+            if await owner.exists(repo._key(sid)):
+                problems.append(f"user {user_id}: session {sid} survived revoke_all")
+        if await owner.exists(SessionRepo._index_key(user_id)):
+            problems.append(f"user {user_id}: session index survived revoke_all")
+    for node in backend.nodes:
+        removed = before[id(node)] - await node.dbsize()
+        if removed != expected[id(node)]:
+            problems.append(f"{names[id(node)]}: revoke_all removed {removed} key(s), expected {expected[id(node)]}")
+    print(f"revoke_all: {len(revoked_users)} user(s), removed per node "
+          f"{[expected[id(node)] for node in backend.nodes]}")
+
+    for node in backend.nodes:
+        await node.flushdb()
+        await node.aclose()
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check sharded session storage on several local Redis nodes")
+    parser.add_argument("--nodes", type=int, default=3, help="сколько redis-server запустить")
+    parser.add_argument("--base-port", type=int, default=7400, help="первый порт для redis-server")
+    parser.add_argument("--redis-server", default="redis-server", help="путь к redis-server")
+    parser.add_argument("--urls", default="", help="уже запущенные узлы через запятую (вместо --nodes)")
+    parser.add_argument("--flush", action="store_true",
+                        help="разрешить FLUSHDB узлов из --urls (обязательно с --urls)")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=2, help="сессий на пользователя")
+    parser.add_argument("--revoke", type=int, default=50, help="скольким пользователям сделать revoke_all")
+    parser.add_argument("--max-skew", type=float, default=0.3,
+                        help="допустимое отклонение числа ключей узла от среднего (доля)")
+    args = parser.parse_args()
+
+    urls = [url.strip() for url in args.urls.split(",") if url.strip()]
+    if urls:
+        if len(urls) < 2:
+            parser.error("--urls needs at least two nodes")
+        if not args.flush:
+            parser.error("--urls nodes are flushed before and after the check: pass --flush to confirm")
+        configure(urls, spawned=False)
+        problems = asyncio.run(check(args, urls))
+    else:
+        if args.nodes < 2:
+            parser.error("--nodes must be at least 2")
+        with redis_servers(args.nodes, args.base_port, args.redis_server) as spawned:
+            configure(spawned, spawned=True)
+            problems = asyncio.run(check(args, spawned))
+
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    print("OK" if not problems else f"{len(problems)} problem(s)")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,20 @@
 from dishka import make_async_container
 from dishka.integrations.fastapi import DishkaRoute, FastapiProvider, setup_dishka
-from fastapi import APIRouter, Depends, FastAPI
+from fastapi import APIRouter, FastAPI
 
 from .auth import AuthProvider
 from .users import UsersProvider
-from ..guards import require_user
 
 from ..providers.db_provider import DatabaseProvider
 
 from .users import users_router
 from .admins import admins_router, AdminsProvider
 
+# Аутентификация — на уровне вложенных роутеров: users требует профиль (require_user),
+# admins — только принципала с флагами (require_principal), чтобы не делать лишних запросов.
 api_router = APIRouter(
     prefix="/api",
     route_class=DishkaRoute,
-    dependencies=[Depends(require_user)]
 )
 
 api_router.include_router(users_router)
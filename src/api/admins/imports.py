@@ -0,0 +1,167 @@
+import asyncio
+import codecs
+import csv
+import json
+import logging
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.admins.schemas import ImportReport, ImportRowIssue, ImportUserIn
+from src.core.security import password_executor
+from src.database.repositories.users import UserRepository
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+DEFAULT_BATCH_SIZE = 1000
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Режет поток байтов (UTF-8, опционально с BOM) на строки."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        tail += decoder.decode(chunk)
+        *lines, tail = tail.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+async def iter_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[tuple[int, object]]:
+    """
+    (номер строки, запись) из CSV (первая строка — заголовок, одна запись на строку)
+    или NDJSON. Нераспознанная строка отдаётся как исключение вместо записи.
+    """
+    header: list[str] | None = None
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            if fmt == "csv":
+                row = next(csv.reader([line]))
+                if header is None:
+                    header = [name.strip() for name in row]
+                    continue
+                record = {k: (v or None) for k, v in zip(header, row)}
+            else:
+                record = json.loads(line)
+        except (csv.Error, ValueError) as e:
+            record = e
+        yield line_no, record
+
+
+async def _hash_batch(batch: list[tuple[int, ImportUserIn]]) -> list[tuple]:
+    """Хеширует пароли пачки параллельно во всех процессах пула."""
+    hashes = await password_executor.hash_many([row.password for _, row in batch])
+    return [
+        (line, str(row.email), password_hash, row.first_name, row.last_name, row.middle_name)
+        for (line, row), password_hash in zip(batch, hashes)
+    ]
+
+
+async def import_users(
+    session: AsyncSession,
+    lines: AsyncIterator[str],
+    fmt: str,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> ImportReport:
+    """
+    Массовый импорт пользователей в одной транзакции:
+      1) валидация и дедупликация по email внутри файла (до bcrypt),
+      2) хеширование паролей пачками в пуле процессов,
+      3) COPY пачек во временную таблицу (хеширование следующей пачки
+         идёт параллельно с COPY предыдущей),
+      4) один INSERT ... SELECT ... ON CONFLICT DO NOTHING в users.
+    По каждой пропущенной строке в отчёте есть причина.
+    """
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+    repo = UserRepository(session)
+    report = ImportReport()
+    seen: set[str] = set()
+    batch: list[tuple[int, ImportUserIn]] = []
+    pending: asyncio.Task | None = None
+
+    async def flush() -> None:
+        nonlocal pending, batch
+        if pending is not None:
+            await repo.copy_to_staging(await pending)
+            pending = None
+        if batch:
+            pending = asyncio.create_task(_hash_batch(batch))
+            batch = []
+
+    try:
+        await repo.create_import_staging()
+        async for line_no, record in iter_records(lines, fmt):
+            report.total += 1
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                row = ImportUserIn.model_validate(record)
+            except (ValueError, TypeError, csv.Error) as e:
+                report.invalid += 1
+                report.issues.append(ImportRowIssue(
+                    line=line_no,
+                    email=record.get("email") if isinstance(record, dict) else None,
+                    reason="invalid",
+                    detail=_describe(e),
+                ))
+                continue
+
+            email = str(row.email).strip().lower()
+            if email in seen:
+                report.duplicates += 1
+                report.issues.append(ImportRowIssue(line=line_no, email=email, reason="duplicate_in_file"))
+                continue
+            seen.add(email)
+            row.email = email
+            batch.append((line_no, row))
+            if len(batch) >= batch_size:
+                await flush()
+
+        await flush()  # последняя неполная пачка уходит на хеширование
+        await flush()  # ... и в COPY
+
+        existing = await repo.merge_staging()
+        await session.commit()
+    except BaseException:
+        if pending is not None:
+            pending.cancel()
+        await session.rollback()
+        raise
+
+    for line_no, email in existing:
+        report.issues.append(ImportRowIssue(line=line_no, email=email, reason="already_exists"))
+    report.duplicates += len(existing)
+    report.created = len(seen) - len(existing)
+    report.issues.sort(key=lambda issue: issue.line)
+    logger.info(
+        "User import: total=%s created=%s duplicates=%s invalid=%s",
+        report.total, report.created, report.duplicates, report.invalid,
+    )
+    return report
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in error.errors()
+        )
+    return str(error)
+
+
+async def iter_file_lines(path: str) -> AsyncIterator[str]:
+    """Строки локального файла (для CLI)."""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        for line in f:
+            yield line.rstrip("\r\n")
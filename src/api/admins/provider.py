@@ -1,11 +1,12 @@
 from dishka import Provider, Scope, provide
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.api.auth.services import AuthService
 from .services import AdminService
 
 class AdminsProvider(Provider):
     scope = Scope.REQUEST
 
     @provide
-    async def service(self, session: AsyncSession) -> AdminService:
-        return AdminService(session)
\ No newline at end of file
+    async def service(self, session: AsyncSession, auth_service: AuthService) -> AdminService:
+        return AdminService(session, auth_service)
\ No newline at end of file
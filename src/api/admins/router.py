@@ -1,20 +1,29 @@
+import datetime
+from typing import Literal, Optional
+
 from dishka import FromDishka
 from dishka.integrations.fastapi import DishkaRoute
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
 from src.api.admins.schemas import (
     AdminOut,
     AdminCreateIn,
     AdminSetSuperIn,
+    ImportReport,
+    UserPage,
 )
+from src.api.admins.imports import iter_lines
 from src.api.admins.services import AdminService
 from src.core.infra.exceptions import NotFound, Conflict
-from src.guards import require_admin, require_super_admin
+from src.core.infra.pagination import InvalidCursor
+from src.guards import require_admin, require_principal, require_super_admin
 
 router = APIRouter(
     prefix="/admins",
     tags=["admins"],
     route_class=DishkaRoute,
+    dependencies=[Depends(require_principal)],
 )
 
 # ----- READ -----
@@ -29,6 +38,61 @@ async def list_admins(service: FromDishka[AdminService]) -> list[AdminOut]:
     return [AdminOut.model_validate(a) for a in admins]
 
 
+@router.get(
+    "/users",
+    response_model=UserPage,
+    dependencies=[Depends(require_admin)],
+)
+async def list_users(
+    service: FromDishka[AdminService],
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor предыдущей страницы"),
+    is_active: Optional[bool] = None,
+    created_from: Optional[datetime.datetime] = Query(None, description="created_at >= (включительно)"),
+    created_to: Optional[datetime.datetime] = Query(None, description="created_at < (не включительно)"),
+    is_admin: Optional[bool] = None,
+) -> UserPage:
+    try:
+        return await service.list_users(
+            limit=limit,
+            cursor=cursor,
+            is_active=is_active,
+            created_from=created_from,
+            created_to=created_to,
+            is_admin=is_admin,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+@router.get(
+    "/users/export",
+    response_class=StreamingResponse,
+    dependencies=[Depends(require_admin)],
+)
+async def export_users(
+    response: Response,
+    service: FromDishka[AdminService],
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+) -> StreamingResponse:
+    stream = StreamingResponse(
+        service.export_users(fmt),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="users.{fmt}"'},
+    )
+    # FastAPI не переносит заголовки response в возвращённый Response:
+    # обновлённый guard'ом токен сессии (cookie) переносим сами
+    for cookie in response.headers.getlist("set-cookie"):
+        stream.headers.append("set-cookie", cookie)
+    return stream
+
+
 @router.get(
     "/{user_id}",
     response_model=AdminOut,
@@ -65,6 +129,24 @@ async def add_admin(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
 
+@router.post(
+    "/users/import",
+    response_model=ImportReport,
+    dependencies=[Depends(require_admin)],
+)
+async def import_users(
+    request: Request,
+    service: FromDishka[AdminService],
+    fmt: Literal["csv", "ndjson"] = Query("csv", alias="format"),
+) -> ImportReport:
+    """
+    Массовое создание пользователей из тела запроса (CSV с заголовком или NDJSON).
+    Поля: email, password, first_name, last_name, middle_name.
+    Строки с занятым/повторяющимся email или невалидные пропускаются и попадают в отчёт.
+    """
+    return await service.import_users(iter_lines(request.stream()), fmt)
+
+
 @router.patch(
     "/{user_id}/super",
     response_model=AdminOut,
@@ -1,4 +1,9 @@
-from pydantic import BaseModel, Field, ConfigDict
+import datetime
+from typing import Optional
+
+from pydantic import BaseModel, EmailStr, Field, ConfigDict
+
+from src.api.users.schemas import UserOut
 
 
 class AdminOut(BaseModel):
@@ -16,3 +21,40 @@ class AdminCreateIn(BaseModel):
 
 class AdminSetSuperIn(BaseModel):
     super_admin: bool = Field(description="Новое значение признака супер-админа")
+
+
+class AdminUserOut(UserOut):
+    created_at: datetime.datetime
+    is_admin: bool
+    is_super_admin: bool
+
+
+class UserPage(BaseModel):
+    items: list[AdminUserOut]
+    next_cursor: Optional[str] = Field(
+        default=None, description="Курсор следующей страницы; null — страниц больше нет"
+    )
+
+
+class ImportUserIn(BaseModel):
+    """Строка файла импорта пользователей (CSV или NDJSON)."""
+    email: EmailStr
+    password: str = Field(min_length=6)
+    first_name: str = Field(min_length=1, max_length=100)
+    last_name: str = Field(min_length=1, max_length=100)
+    middle_name: Optional[str] = Field(default=None, max_length=100)
+
+
+class ImportRowIssue(BaseModel):
+    line: int = Field(description="Номер строки во входном файле (с 1)")
+    email: Optional[str] = None
+    reason: str = Field(examples=["duplicate_in_file", "already_exists", "invalid"])
+    detail: Optional[str] = None
+
+
+class ImportReport(BaseModel):
+    total: int = 0
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    issues: list[ImportRowIssue] = Field(default_factory=list)
@@ -1,10 +1,21 @@
-from sqlalchemy import select
+import csv
+import datetime
+import io
+import json
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.api.auth.services import AuthService
 from src.core.infra.exceptions import NotFound, Conflict
-from src.database.models import User
+from src.core.infra.pagination import decode_cursor, encode_cursor
+from src.database.errors import is_foreign_key_violation
 from src.database.repositories.admins import AdminRepository
-from src.api.admins.schemas import AdminCreateIn
+from src.database.repositories.users import UserRepository
+from src.api.admins.imports import import_users
+from src.api.admins.schemas import AdminCreateIn, AdminUserOut, ImportReport, UserPage
+from src.api.users.schemas import UserOut
 from src.database.models.admins import Admin
 
 
@@ -12,12 +23,15 @@ class AdminService:
     """
     Бизнес-логика управления администраторами.
     Работает через AdminRepository. При добавлении админа проверяет,
-    что пользователь существует.
+    что пользователь существует. При снятии прав или смене флага супер-админа
+    отзывает все сессии пользователя.
     """
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, auth_service: AuthService) -> None:
         self.session = session
+        self.auth_service = auth_service
         self.repo = AdminRepository(session)
+        self.users = UserRepository(session)
 
     # ---------- queries ----------
     async def list_admins(self) -> list[Admin]:
@@ -29,27 +43,97 @@ class AdminService:
             raise NotFound("Admin not found")
         return admin
 
+    async def list_users(
+        self,
+        *,
+        limit: int,
+        cursor: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        created_from: Optional[datetime.datetime] = None,
+        created_to: Optional[datetime.datetime] = None,
+        is_admin: Optional[bool] = None,
+    ) -> UserPage:
+        """
+        Страница пользователей для админки. Берём limit+1 строк, чтобы понять,
+        есть ли следующая страница, не делая COUNT.
+        Бросает InvalidCursor на битом курсоре.
+        """
+        rows = await self.users.list_page(
+            limit=limit + 1,
+            after=decode_cursor(cursor) if cursor else None,
+            is_active=is_active,
+            created_from=created_from,
+            created_to=created_to,
+            is_admin=is_admin,
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        items = [
+            AdminUserOut(
+                id=user.id,
+                email=user.email,
+                first_name=user.first_name,
+                last_name=user.last_name,
+                middle_name=user.middle_name,
+                is_active=user.is_active,
+                created_at=user.created_at,
+                is_admin=is_admin_flag,
+                is_super_admin=is_super_flag,
+            )
+            for user, is_admin_flag, is_super_flag in rows
+        ]
+        next_cursor = None
+        if has_more:
+            last = rows[-1][0]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        return UserPage(items=items, next_cursor=next_cursor)
+
+    async def export_users(self, fmt: str) -> AsyncIterator[str]:
+        """
+        Выгрузка всех пользователей (NDJSON или CSV) потоком, по пачке строк на чанк.
+        Отдаются только поля UserOut — password_hash в выгрузку не попадает.
+        """
+        fields = list(UserOut.model_fields)
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(fields)
+            async for batch in self.users.stream_columns(fields):
+                writer.writerows(batch)
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+            if buf.tell():
+                yield buf.getvalue()
+        else:
+            async for batch in self.users.stream_columns(fields):
+                yield "".join(
+                    json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n"
+                    for row in batch
+                )
+
     # ---------- commands ----------
-    async def add_admin(self, data: AdminCreateIn) -> Admin:
-        user = await self.session.scalar(select(User).where(User.id == data.user_id))
-        if not user:
-            raise NotFound("User not found")
+    async def import_users(self, lines: AsyncIterator[str], fmt: str) -> ImportReport:
+        return await import_users(self.session, lines, fmt)
 
-        existing = await self.repo.get_by_user_id(data.user_id)
-        if existing:
+    async def add_admin(self, data: AdminCreateIn) -> Admin:
+        try:
+            admin = await self.repo.add_admin(user_id=data.user_id, super_admin=data.super_admin)
+        except IntegrityError as e:
+            if is_foreign_key_violation(e):
+                raise NotFound("User not found")
+            raise
+        if admin is None:
             raise Conflict("User is already an admin")
-
-        admin = await self.repo.add_admin(user_id=data.user_id, super_admin=data.super_admin)
         return admin
 
     async def remove_admin(self, user_id: int) -> None:
         await self.repo.remove_admin(user_id)
+        await self.auth_service.revoke_all_sessions(user_id)
 
     async def set_super_admin(self, user_id: int, value: bool) -> Admin:
-        admin = await self.repo.get_by_user_id(user_id)
-        if not admin:
-            raise NotFound("Admin not found")
         updated = await self.repo.set_super_admin(user_id, value)
         if not updated:
-            raise NotFound("Admin not found after update")
-        return updated
\ No newline at end of file
+            raise NotFound("Admin not found")
+        await self.auth_service.revoke_all_sessions(user_id)
+        return updated
@@ -0,0 +1,16 @@
+from fastapi import Response
+
+from src.api.auth.services import COOKIE_NAME, DEFAULT_SESSION_TTL
+
+
+def set_session_cookie(response: Response, value: str) -> None:
+    """Ставит cookie сессии: SID серверной сессии или подписанный токен."""
+    response.set_cookie(
+        key=COOKIE_NAME,
+        value=value,
+        httponly=True,
+        secure=True,               # в dev можно сделать False, если тестируешь без HTTPS
+        samesite="lax",
+        max_age=DEFAULT_SESSION_TTL,
+        path="/",
+    )
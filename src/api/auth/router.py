@@ -8,7 +8,8 @@ from src.api.auth.schemas import (
     LogoutResponse,
     UserData,
 )
-from src.api.auth.services import AuthService, COOKIE_NAME, DEFAULT_SESSION_TTL
+from src.api.auth.cookies import set_session_cookie
+from src.api.auth.services import AuthService, COOKIE_NAME
 
 router = APIRouter(
     prefix="/auth",
@@ -32,21 +33,15 @@ async def register(data: RegisterIn, service: FromDishka[AuthService]):
 @router.post("/login", response_model=LoginResponse)
 async def login(
     data: LoginIn,
+    request: Request,
     response: Response,
     service: FromDishka[AuthService],
 ):
-    sid = await service.login(email=data.email, password=data.password)
+    client_ip = request.client.host if request.client else None
+    sid = await service.login(email=data.email, password=data.password, client_ip=client_ip)
 
-    # Ставим cookie сессии
-    response.set_cookie(
-        key=COOKIE_NAME,
-        value=sid,                 # только SID; данные сессии лежат в Redis
-        httponly=True,
-        secure=True,               # в dev можно сделать False, если тестируешь без HTTPS
-        samesite="lax",
-        max_age=DEFAULT_SESSION_TTL,
-        path="/",
-    )
+    # Ставим cookie сессии: SID (данные сессии лежат в Redis) или подписанный токен
+    set_session_cookie(response, sid)
     return LoginResponse()
 
 
@@ -53,4 +53,22 @@ class LogoutResponse(BaseModel):
 
 
 class MeResponse(BaseModel):
-    user: UserData
\ No newline at end of file
+    user: UserData
+
+
+class UserSnapshot(BaseModel):
+    """
+    Снапшот авторизационных данных пользователя, хранящийся в самой сессии.
+    Позволяет guard'ам отвечать без запроса в БД. Актуален, пока version
+    совпадает с user_ver:{id} в Redis.
+    """
+    id: int
+    email: str
+    first_name: str
+    last_name: str
+    middle_name: Optional[str] = None
+    is_active: bool
+    is_admin: bool = False
+    is_super_admin: bool = False
+    version: str
+
@@ -1,11 +1,13 @@
 import logging
-import datetime
+import dataclasses
 
 import secrets
+import time
 from typing import Optional
 
-import bcrypt
-from sqlalchemy import select, func
+from sqlalchemy import exists, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.infra.exceptions import (
@@ -15,9 +17,25 @@ from src.core.infra.exceptions import (
     SessionExpired,
     NotFound,
     InactiveUser,
+    TooManyRequests,
 )
+from src.api.auth.schemas import UserSnapshot
+from src.core.config.settings import settings
+from src.core.metrics import auth_duration
+from src.core.security import password_executor
+from src.core.security.tokens import SessionToken, token_signer
+from src.database.errors import is_unique_violation
 from src.database.models import User
-from src.redis_storage.repositories import RedisRepo
+from src.database.models.admins import Admin
+from src.database.repositories.principals import Principal, PrincipalRepository
+from src.redis_storage.keys import tagged_prefix
+from src.redis_storage.repositories.sessions import SessionRepo, sid_tag
+from src.redis_storage.session_codec import FLAG_ACTIVE, FLAG_ADMIN, FLAG_SUPER_ADMIN, SessionRecord
+from src.redis_storage.revocations import is_token_revoked, revoke_token, revoke_user_tokens
+from src.redis_storage.session_cache import session_cache
+from src.redis_storage.session_touch import session_toucher
+from src.redis_storage.throttle import login_throttle
+from src.redis_storage.user_versions import USER_VERSION_PREFIX, get_user_version
 
 
 logger = logging.getLogger(__name__)
@@ -27,49 +45,220 @@ COOKIE_NAME = "sessionid"
 DEFAULT_SESSION_TTL = 12 * 3600  # время активности сессии
 
 
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _snapshot_record(snapshot: UserSnapshot, *, issued_at: int, expires_at: int) -> SessionRecord:
+    flags = (
+        (FLAG_ACTIVE if snapshot.is_active else 0)
+        | (FLAG_ADMIN if snapshot.is_admin else 0)
+        | (FLAG_SUPER_ADMIN if snapshot.is_super_admin else 0)
+    )
+    return SessionRecord(
+        user_id=snapshot.id,
+        issued_at=issued_at,
+        expires_at=expires_at,
+        version=snapshot.version,
+        email=snapshot.email,
+        first_name=snapshot.first_name,
+        last_name=snapshot.last_name,
+        middle_name=snapshot.middle_name,
+        flags=flags,
+    )
+
+
+def _snapshot_from_record(record: SessionRecord) -> Optional[UserSnapshot]:
+    """Снапшот из сессии; None — если его нет или он устарел."""
+    if record.version is None:
+        return None
+    # данные записаны нами же (_snapshot_record) — повторная валидация не нужна
+    return UserSnapshot.model_construct(
+        id=record.user_id,
+        email=record.email,
+        first_name=record.first_name,
+        last_name=record.last_name,
+        middle_name=record.middle_name,
+        is_active=bool(record.flags & FLAG_ACTIVE),
+        is_admin=bool(record.flags & FLAG_ADMIN),
+        is_super_admin=bool(record.flags & FLAG_SUPER_ADMIN),
+        version=record.version,
+    )
+
+
 class AuthService:
     """
     Сервис аутентификации/сессий.
     - хранит пользователей в БД,
-    - серверные сессии в Redis: sess:{sid} -> { user_id, issued_at, expires_at, ... }
+    - серверные сессии в Redis: sess:{sid} -> упакованная SessionRecord (user_id, issued_at, ...)
+      и индекс user_sessions:{user_id} -> {sid, ...} для отзыва всех сессий,
+    - в режиме snapshot_enabled сессия дополнительно хранит UserSnapshot,
+      и get_current_user обходится без запроса в БД,
+    - в режиме session_mode="token" cookie — подписанный токен (user_id, флаги, срок);
+      пока он не истёк, Redis не нужен; при обновлении проверяется список отзыва.
+      Cookie со старыми SID продолжают обслуживаться серверными сессиями.
     """
 
-    def __init__(self, session: AsyncSession, *, session_ttl: int = DEFAULT_SESSION_TTL) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        session_ttl: int = DEFAULT_SESSION_TTL,
+        snapshot_enabled: bool = settings.session.snapshot_enabled,
+        rehash_on_login: bool = settings.security.rehash_on_login,
+        session_mode: str = settings.session.mode,
+        token_ttl: int = settings.session.token_ttl,
+    ) -> None:
         self.session = session
         self.session_ttl = session_ttl
+        self.snapshot_enabled = snapshot_enabled
+        self.rehash_on_login = rehash_on_login
+        self.session_mode = session_mode
+        self.token_ttl = token_ttl
+        # новый токен, выданный при обновлении в ходе запроса (guard кладёт его в cookie)
+        self.refreshed_token: Optional[str] = None
 
     @staticmethod
-    def _hash_password(password: str) -> str:
-        salt = bcrypt.gensalt(rounds=12)
-        return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+    async def _hash_password(password: str) -> str:
+        return await password_executor.hash(password)
 
     @staticmethod
-    def _check_password(password: str, password_hash: str) -> bool:
+    async def _check_password(password: str, password_hash: str) -> bool:
         try:
-            return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+            return await password_executor.verify(password, password_hash)
         except Exception as e:
             logger.exception("Error checking password: %s", e)
             return False
 
     async def _create_session(self, user_id: int) -> str:
         """Создаёт серверную сессию в Redis и возвращает SID (значение для cookie)."""
-        sid = secrets.token_urlsafe(32)
-        repo = RedisRepo(prefix="sess", key=sid, ttl=self.session_ttl)
-
-        now = datetime.datetime.now(datetime.UTC)
-
-        payload = {
-            "user_id": str(user_id),
-            "issued_at": now.isoformat(),
-            "expires_at": (now + datetime.timedelta(seconds=self.session_ttl)).isoformat(),
-        }
-        await repo.h_set(payload)
+        sid = SessionRepo.make_sid(user_id)
+        repo = SessionRepo(ttl=self.session_ttl)
+
+        now = int(time.time())
+        expires_at = now + self.session_ttl
+        if self.snapshot_enabled:
+            snapshot = await self._build_snapshot(user_id)
+            record = _snapshot_record(snapshot, issued_at=now, expires_at=expires_at)
+        else:
+            record = SessionRecord(user_id, now, expires_at)
+        await repo.create(sid, record)
         return sid
 
     async def _delete_session(self, sid: str) -> None:
-        repo = RedisRepo(prefix="sess", key=sid, ttl=self.session_ttl)
-        await repo.delete()
+        repo = SessionRepo(ttl=self.session_ttl)
+        await repo.remove(sid)
+        session_cache.evict(repo._key(sid))
+
+    async def revoke_all_sessions(self, user_id: int) -> int:
+        """
+        Отзывает все сессии пользователя (по индексу user_sessions:{user_id}).
+        В режиме токенов дополнительно отзывает все выданные токены: они перестанут
+        обновляться, а действующие истекут не позже чем через token_ttl.
+        """
+        repo = SessionRepo(ttl=self.session_ttl)
+        sids = await repo.revoke_all(user_id)
+        for sid in sids:
+            session_cache.evict(repo._key(sid))
+        if self.session_mode == "token":
+            await revoke_user_tokens(user_id, _now_ms(), self.session_ttl)
+        if sids:
+            logger.info("Revoked %s session(s) of user %s", len(sids), user_id)
+        return len(sids)
+
+    # ---------- подписанные токены ----------
+    async def _issue_token(self, user_id: int) -> str:
+        principal = await PrincipalRepository(self.session).get(user_id)
+        if not principal:
+            raise NotFound("User not found")
+        now = _now_ms()
+        token = SessionToken(
+            user_id=user_id,
+            jti=secrets.token_urlsafe(12),
+            issued_at=now,
+            expires_at=now + self.token_ttl * 1000,
+            refresh_until=now + self.session_ttl * 1000,
+            is_active=principal.is_active,
+            is_admin=principal.is_admin,
+            is_super_admin=principal.is_super_admin,
+        )
+        return token_signer.sign(token)
 
+    def _is_token(self, value: str) -> bool:
+        return self.session_mode == "token" and token_signer.is_token(value)
+
+    @auth_duration.time("authenticate_token")
+    async def _authenticate_token(self, value: str) -> SessionToken:
+        """
+        Проверяет подпись и срок токена в памяти процесса. Истёкший (но в пределах
+        refresh_until) токен обновляется: проверка отзыва в Redis + флаги из БД.
+        """
+        token = token_signer.load(value)
+        if token is None:
+            raise SessionExpired(detail="Invalid session token")
+
+        now = _now_ms()
+        if now < token.expires_at:
+            return token
+        if now >= token.refresh_until:
+            raise SessionExpired()
+
+        if await is_token_revoked(token.jti, token.user_id, token.issued_at):
+            raise SessionExpired()
+        principal = await PrincipalRepository(self.session).get(token.user_id)
+        if not principal:
+            raise NotFound("User not found")
+        if not principal.is_active:
+            raise InactiveUser()
+
+        renewed = token.renewed(
+            now=now,
+            ttl=self.token_ttl,
+            refresh_ttl=self.session_ttl,
+            is_active=principal.is_active,
+            is_admin=principal.is_admin,
+            is_super_admin=principal.is_super_admin,
+        )
+        self.refreshed_token = token_signer.sign(renewed)
+        return renewed
+
+    async def _build_snapshot(self, user_id: int) -> UserSnapshot:
+        """
+        Собирает снапшот из БД. Версию читаем до запроса в БД: если пользователя
+        изменят параллельно, снапшот получит старую версию и будет перечитан.
+        """
+        version = await get_user_version(user_id)
+
+        stmt = (
+            select(User, Admin.id, Admin.super_admin)
+            .outerjoin(Admin, Admin.user_id == User.id)
+            .where(User.id == user_id)
+        )
+        row = (await self.session.execute(stmt)).first()
+        if row is None:
+            raise NotFound("User not found")
+        user, admin_id, super_admin = row
+
+        return UserSnapshot(
+            id=user.id,
+            email=user.email,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            middle_name=user.middle_name,
+            is_active=user.is_active,
+            is_admin=admin_id is not None,
+            is_super_admin=bool(super_admin),
+            version=version,
+        )
+
+    async def _refresh_snapshot(self, sid: str, record: SessionRecord) -> UserSnapshot:
+        snapshot = await self._build_snapshot(record.user_id)
+        repo = SessionRepo(key=sid)
+        await repo.replace(_snapshot_record(snapshot, issued_at=record.issued_at, expires_at=record.expires_at))
+        session_cache.evict(repo._key())
+        return snapshot
+
+    @auth_duration.time("register")
     async def register(
             self,
             email: str,
@@ -82,85 +271,197 @@ class AuthService:
         """Создаёт нового пользователя. Бросает Conflict, если email занят."""
         email_norm = email.strip().lower()
 
-        exists_stmt = select(func.count()).select_from(User).where(User.email == email_norm)
-        (count,) = (await self.session.execute(exists_stmt)).one()
-        if count:
+        # занятый email отсекаем дешёвым запросом по уникальному индексу до хеширования пароля:
+        # повторная регистрация не должна стоить bcrypt
+        if await self.session.scalar(select(exists().where(User.email == email_norm))):
             raise Conflict("User with this email already exists")
 
-        user = User(
-            email=email_norm,
-            password_hash=self._hash_password(password),
-            first_name=first_name.strip(),
-            last_name=last_name.strip(),
-            middle_name=(middle_name.strip() if middle_name else None),
-            is_active=True,
+        # гонку двух регистраций одного email закрывает INSERT ... ON CONFLICT (email) DO NOTHING RETURNING *
+        stmt = (
+            pg_insert(User)
+            .values(
+                email=email_norm,
+                password_hash=await self._hash_password(password),
+                first_name=first_name.strip(),
+                last_name=last_name.strip(),
+                middle_name=(middle_name.strip() if middle_name else None),
+                is_active=True,
+            )
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User)
         )
-        self.session.add(user)
+        try:
+            user = await self.session.scalar(stmt)
+        except IntegrityError as e:
+            await self.session.rollback()
+            if is_unique_violation(e):
+                raise Conflict("User with this email already exists")
+            raise
+        if user is None:
+            await self.session.rollback()
+            raise Conflict("User with this email already exists")
+
         await self.session.commit()
-        await self.session.refresh(user)
         return user
 
-    async def login(self, email: str, password: str) -> str:
+    @auth_duration.time("login")
+    async def login(self, email: str, password: str, client_ip: Optional[str] = None) -> str:
         """
         Проверяет логин/пароль, возвращает SID (значение для Set-Cookie).
         Исключения:
+          - TooManyRequests — превышен лимит попыток по email/IP (до запроса в БД и bcrypt)
           - InvalidCredentials — если пары (email, password) нет
           - InactiveUser — если пользователь заблокирован
         """
+        retry_after = await login_throttle.hit(email, client_ip)
+        if retry_after:
+            raise TooManyRequests("Too many login attempts", retry_after=retry_after)
+
         stmt = select(User).where(User.email == email)
         user = await self.session.scalar(stmt)
-        if not user or not self._check_password(password, user.password_hash):
+        if not user or not await self._check_password(password, user.password_hash):
             raise InvalidCredentials()
 
         if not user.is_active:
             raise InactiveUser()
 
+        if self.rehash_on_login and password_executor.needs_rehash(user.password_hash):
+            await self._rehash_password(user, password)
+
+        if self.session_mode == "token":
+            return await self._issue_token(user.id)
         sid = await self._create_session(user.id)
         return sid
 
+    async def _rehash_password(self, user: User, password: str) -> None:
+        """
+        Перехеширует пароль текущим алгоритмом/стоимостью после успешного входа.
+        Обновление условное (по старому хешу), чтобы не затереть параллельную смену пароля.
+        Ошибка перехеширования не мешает входу.
+        """
+        old_hash = user.password_hash
+        try:
+            new_hash = await self._hash_password(password)
+            await self.session.execute(
+                update(User)
+                .where(User.id == user.id, User.password_hash == old_hash)
+                .values(password_hash=new_hash)
+            )
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            logger.warning("Password rehash failed for user %s: %s", user.id, e)
+
+    @auth_duration.time("logout")
     async def logout_by_sid(self, sid: Optional[str]) -> None:
         """Логаут по SID из cookie. Если SID нет — NotAuthenticated."""
         if not sid:
             raise NotAuthenticated()
+        if self._is_token(sid):
+            token = token_signer.load(sid)
+            if token is not None:
+                ttl = max(1, -(-(token.refresh_until - _now_ms()) // 1000))
+                await revoke_token(token.jti, ttl)
+            return
         await self._delete_session(sid)
 
-    async def get_current_user(self, sid: Optional[str]) -> User:
+    async def get_current_user(self, sid: Optional[str]) -> User | UserSnapshot:
         """
-        Возвращает пользователя по SID. Бросает:
+        Возвращает пользователя по SID (в режиме snapshot_enabled — UserSnapshot). Бросает:
           - NotAuthenticated — если SID отсутствует
           - SessionExpired — если сессия не найдена/протухла/битая
           - NotFound — если пользователь удалён
           - InactiveUser — если пользователь заблокирован
         """
-        if not sid:
-            raise NotAuthenticated()
+        user_id, snapshot = await self._authenticate(sid)
+        if snapshot is not None:
+            return snapshot
 
-        repo = RedisRepo(prefix="sess", key=sid, ttl=self.session_ttl)
-        raw = await repo.h_get_all()
-        if not raw:
-            raise SessionExpired()
+        user = await self.session.scalar(select(User).where(User.id == user_id))
+        if not user:
+            raise NotFound("User not found")
+        if not user.is_active:
+            raise InactiveUser()
 
-        def _to_str(x):
-            return x.decode() if isinstance(x, (bytes, bytearray)) else x
+        return user
 
-        data = {_to_str(k): _to_str(v) for k, v in raw.items()}
+    async def get_current_principal(self, sid: Optional[str]) -> Principal | UserSnapshot:
+        """
+        То же, что get_current_user, но без профиля: id, is_active и флаги
+        администратора одним запросом (или из снапшота/токена без запроса в БД).
+        """
+        if sid and self._is_token(sid):
+            token = await self._authenticate_token(sid)
+            if not token.is_active:
+                raise InactiveUser()
+            return Principal(token.user_id, token.is_active, token.is_admin, token.is_super_admin)
+
+        user_id, snapshot = await self._authenticate(sid)
+        if snapshot is not None:
+            return snapshot
+
+        principal = await PrincipalRepository(self.session).get(user_id)
+        if not principal:
+            raise NotFound("User not found")
+        if not principal.is_active:
+            raise InactiveUser()
 
-        user_id_raw = data.get("user_id")
-        if not user_id_raw:
-            raise SessionExpired(detail="Missing user_id in session")
+        return principal
 
-        try:
-            user_id = int(user_id_raw)
-        except (TypeError, ValueError):
-            raise SessionExpired(detail="Corrupted user_id in session")
+    @auth_duration.time("authenticate_session")
+    async def _authenticate(self, sid: Optional[str]) -> tuple[int, Optional[UserSnapshot]]:
+        """Проверяет сессию; возвращает user_id и снапшот (если включён режим снапшотов)."""
+        if not sid:
+            raise NotAuthenticated()
 
-        user = await self.session.scalar(select(User).where(User.id == user_id))
-        if not user:
-            raise NotFound("User not found")
-        if not user.is_active:
+        if self._is_token(sid):
+            token = await self._authenticate_token(sid)
+            return token.user_id, None
+
+        record = await self._load_session(sid)
+        if record is None:
+            raise SessionExpired()
+
+        if not self.snapshot_enabled:
+            return record.user_id, None
+
+        snapshot = _snapshot_from_record(record)
+        if snapshot is None:
+            snapshot = await self._refresh_snapshot(sid, record)
+        if not snapshot.is_active:
             raise InactiveUser()
+        return record.user_id, snapshot
 
-        # Продлеваем TTL сессии (скользящее окно)
-        await repo.redis.expire(repo._key(), self.session_ttl)
+    async def _load_session(self, sid: str) -> Optional[SessionRecord]:
+        """
+        Читает sess:{sid} (сессия + PTTL за один round trip, без записи).
+        Скользящий TTL продлевается через session_toucher — только когда оставшийся
+        TTL опустился ниже заданной доли, пачками в фоне.
+        При включённом L1-кеше повторные обращения обслуживаются из памяти
+        без похода в Redis; TTL при этом продлевается при следующем промахе.
+        """
+        repo = SessionRepo(key=sid, ttl=self.session_ttl)
+        key = repo._key()
 
-        return user
\ No newline at end of file
+        cached = session_cache.get(key)
+        if cached is not None:
+            return cached
+
+        seen = session_cache.begin(key)
+        version_prefix = tagged_prefix(USER_VERSION_PREFIX, sid_tag(sid)) if self.snapshot_enabled else None
+        try:
+            record, version, pttl = await repo.load(version_prefix)
+        except ValueError:
+            session_cache.complete(key, seen, None)
+            raise SessionExpired(detail="Corrupted session")
+
+        if record is not None and session_toucher.due(pttl, self.session_ttl):
+            session_toucher.touch(key, self.session_ttl)
+            if sid_tag(sid) is not None:
+                # индекс должен пережить продлённую сессию (у старых SID индекс без TTL)
+                session_toucher.touch(SessionRepo._index_key(record.user_id), self.session_ttl)
+        if self.snapshot_enabled and record is not None and record.version not in (None, version or "0"):
+            # снапшот устарел — get_current_user перечитает его из БД
+            record = dataclasses.replace(record, version=None)
+        session_cache.complete(key, seen, record)
+        return record
@@ -1,4 +1,5 @@
 import logging
+import math
 from fastapi import Request, status, Response
 
 from src.core.infra import ErrorJsonResponse, ErrorStatus
@@ -59,6 +60,17 @@ async def conflict_exception_handler(_request: Request, exc: Exception) -> Respo
         status=ErrorStatus.ALREADY_EXISTS,
     )
 
+async def too_many_requests_exception_handler(_request: Request, exc: Exception) -> Response:
+    response = ErrorJsonResponse(
+        code=status.HTTP_429_TOO_MANY_REQUESTS,
+        message=exc.detail or "Too many requests",
+        status=ErrorStatus.RESOURCE_EXHAUSTED,
+    )
+    retry_after = exc.extra.get("retry_after")
+    if retry_after:
+        response.headers["Retry-After"] = str(math.ceil(retry_after))
+    return response
+
 async def http_exception_handler(_request: Request, exc: Exception):
 
     logger.error(
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, Response, status
 from src.guards import require_user
 from src.api.users.schemas import UpdateProfileDTO, UserOut
 from src.api.users.services import UserService, NotFound, Conflict, Forbidden
+from src.api.auth.schemas import UserSnapshot
 from src.database.models import User
 from src.api.auth.services import COOKIE_NAME
 
@@ -12,17 +13,18 @@ router = APIRouter(
     prefix="/users",
     tags=["users"],
     route_class=DishkaRoute,  # как и в auth
+    dependencies=[Depends(require_user)],
 )
 
 @router.get("/me", response_model=UserOut)
-async def get_me(current_user: User = Depends(require_user)) -> UserOut:
+async def get_me(current_user: User | UserSnapshot = Depends(require_user)) -> UserOut:
     return UserOut.model_validate(current_user)
 
 @router.patch("/me", response_model=UserOut, status_code=status.HTTP_200_OK)
 async def update_me(
     data: UpdateProfileDTO,
     user_service: FromDishka[UserService],
-    current_user: User = Depends(require_user),
+    current_user: User | UserSnapshot = Depends(require_user),
 ) -> UserOut:
     try:
         user = await user_service.update_profile(current_user.id, data)
@@ -38,7 +40,7 @@ async def update_me(
 async def delete_me(
     response: Response,
     user_service: FromDishka[UserService],
-    current_user: User = Depends(require_user),
+    current_user: User | UserSnapshot = Depends(require_user),
 ) -> None:
     await user_service.soft_delete(current_user.id)
     response.delete_cookie(COOKIE_NAME, path="/")
@@ -1,11 +1,14 @@
 from typing import Optional
 
-from sqlalchemy import select, update, exists
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.api.users.schemas import UpdateProfileDTO
 from src.core.infra.exceptions import NotFound, Forbidden, Conflict
+from src.database.errors import is_unique_violation
 from src.database.models import User
+from src.redis_storage.user_versions import bump_user_version
 
 
 class UserService:
@@ -26,20 +29,13 @@ class UserService:
     async def update_profile(self, user_id: int, data: UpdateProfileDTO) -> User:
         """
         Обновляет профиль. Поддерживает:
-          - смену email (с проверкой на уникальность),
+          - смену email (уникальность проверяет БД, нарушение -> Conflict),
           - смену first_name/last_name/middle_name.
+        Обычный путь — один UPDATE ... RETURNING.
         """
-        user = await self.get_by_id(user_id)
-        if not user.is_active:
-            raise Forbidden("Inactive user cannot be updated")
-
         values: dict = {}
 
-        if data.email is not None and data.email != user.email:
-            exists_q = select(exists().where(User.email == data.email, User.id != user_id))
-            email_taken = (await self.session.execute(exists_q)).scalar()
-            if email_taken:
-                raise Conflict("Email is already in use")
+        if data.email is not None:
             values["email"] = str(data.email)
 
         # имена
@@ -51,16 +47,34 @@ class UserService:
             values["middle_name"] = data.middle_name
 
         if not values:
+            user = await self.get_by_id(user_id)
+            if not user.is_active:
+                raise Forbidden("Inactive user cannot be updated")
             return user
 
-        await self.session.execute(
+        stmt = (
             update(User)
-            .where(User.id == user_id)
+            .where(User.id == user_id, User.is_active.is_(True))
             .values(**values)
+            .returning(User)
+            .execution_options(populate_existing=True)
         )
-        await self.session.commit()
+        try:
+            user = await self.session.scalar(stmt)
+        except IntegrityError as e:
+            await self.session.rollback()
+            if is_unique_violation(e):
+                raise Conflict("Email is already in use")
+            raise
+
+        if user is None:
+            # ни одной строки: пользователя нет или он неактивен
+            await self.session.rollback()
+            await self.get_by_id(user_id)
+            raise Forbidden("Inactive user cannot be updated")
 
-        await self.session.refresh(user)
+        await self.session.commit()
+        await bump_user_version(user_id)
         return user
 
     async def soft_delete(self, user_id: int) -> None:
@@ -68,13 +82,18 @@ class UserService:
         Мягкое удаление: ставим is_active=False и инвалидируем все сессии.
         Пользователь больше не сможет залогиниться.
         """
-        user = await self.get_by_id(user_id)
-        if not user.is_active:
-            return
-
-        await self.session.execute(
+        deactivated = await self.session.scalar(
             update(User)
-            .where(User.id == user_id)
+            .where(User.id == user_id, User.is_active.is_(True))
             .values(is_active=False)
+            .returning(User.id)
         )
-        await self.session.commit()
\ No newline at end of file
+        if deactivated is None:
+            # уже неактивен — ничего не делаем; отсутствующий пользователь -> NotFound
+            await self.session.rollback()
+            await self.get_by_id(user_id)
+            return
+
+        await self.session.commit()
+        await bump_user_version(user_id)
+        await self.auth_service.revoke_all_sessions(user_id)
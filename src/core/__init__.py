@@ -1,6 +1,16 @@
-__all__ = ["broker", "settings", "setup_logging", "lifespan", "scheduler"]
+__all__ = ["broker", "settings", "setup_logging", "scheduler"]
+
+# lifespan (src.core.lifespan) здесь не импортируется: он тянет БД, Redis и сидирование,
+# а src.core импортирует каждый модуль, читающий settings — это давало циклы импорта
 
 from src.core.config.settings import settings
-from .lifespan import lifespan
-from .taskiq_broker import broker, scheduler
 from src.core.config.log_setup import setup_logging
+
+
+def __getattr__(name: str):
+    # брокер и планировщик taskiq создаются при первом обращении (см. taskiq_broker)
+    if name in ("broker", "scheduler"):
+        from . import taskiq_broker
+
+        return getattr(taskiq_broker, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
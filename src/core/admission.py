@@ -0,0 +1,179 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.config.settings import settings
+from src.core.infra import ErrorJsonResponse, ErrorStatus
+from src.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AdmissionStats:
+    admitted: int = 0
+    rejected: int = 0   # очередь переполнена
+    timed_out: int = 0  # не дождались слота за queue_timeout
+
+
+class AdmissionBudget:
+    """
+    Бюджет параллелизма для класса маршрутов: не более limit запросов
+    одновременно и не более queue_size ожидающих. Остальные отклоняются сразу.
+    """
+
+    def __init__(self, name: str, *, limit: int, queue_size: int, timeout: float) -> None:
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self.stats = AdmissionStats()
+        self._slots = asyncio.Semaphore(limit)
+
+    @property
+    def queue_depth(self) -> int:
+        return self.waiting
+
+    async def acquire(self) -> bool:
+        if not self._slots.locked():
+            # свободный слот: берётся без ожидания
+            await self._slots.acquire()
+        elif self.waiting >= self.queue_size:
+            self.stats.rejected += 1
+            return False
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                self.stats.timed_out += 1
+                return False
+            finally:
+                self.waiting -= 1
+        self.active += 1
+        self.stats.admitted += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._slots.release()
+
+
+class AdmissionController:
+    """
+    Сопоставляет путь запроса с бюджетом:
+      - credentials — маршруты с bcrypt (login/register/импорт),
+      - authenticated — всё остальное под /api и /auth.
+    Остальные пути (документация, редиректы) не ограничиваются.
+    """
+
+    CREDENTIAL_PATHS = frozenset({"/auth/login", "/auth/register", "/api/admins/users/import"})
+    AUTHENTICATED_PREFIXES = ("/api/", "/auth/")
+
+    def __init__(
+        self,
+        *,
+        credentials: AdmissionBudget,
+        authenticated: AdmissionBudget,
+        retry_after: int,
+        enabled: bool = True,
+    ) -> None:
+        self.credentials = credentials
+        self.authenticated = authenticated
+        self.retry_after = retry_after
+        self.enabled = enabled
+
+    @property
+    def budgets(self) -> tuple[AdmissionBudget, ...]:
+        return self.credentials, self.authenticated
+
+    def classify(self, path: str) -> Optional[AdmissionBudget]:
+        if not self.enabled:
+            return None
+        if path in self.CREDENTIAL_PATHS:
+            return self.credentials
+        if path.startswith(self.AUTHENTICATED_PREFIXES):
+            return self.authenticated
+        return None
+
+
+class AdmissionMiddleware:
+    """ASGI-middleware: не пускает запрос дальше, пока его класс не получит слот."""
+
+    def __init__(self, app: ASGIApp, controller: "AdmissionController") -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget = self.controller.classify(scope["path"])
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await budget.acquire():
+            logger.warning(
+                "Admission rejected: %s (active=%s, queued=%s)", budget.name, budget.active, budget.waiting
+            )
+            response = ErrorJsonResponse(
+                code=503,
+                message="Server is busy, retry later",
+                status=ErrorStatus.UNAVAILABLE,
+            )
+            response.headers["Retry-After"] = str(self.controller.retry_after)
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            budget.release()
+
+
+admission = AdmissionController(
+    credentials=AdmissionBudget(
+        "credentials",
+        limit=settings.admission.credentials_concurrency,
+        queue_size=settings.admission.credentials_queue,
+        timeout=settings.admission.queue_timeout,
+    ),
+    authenticated=AdmissionBudget(
+        "authenticated",
+        limit=settings.admission.authenticated_concurrency,
+        queue_size=settings.admission.authenticated_queue,
+        timeout=settings.admission.queue_timeout,
+    ),
+    retry_after=settings.admission.retry_after,
+    enabled=settings.admission.enabled,
+)
+
+registry.counter_callback(
+    "admission_requests_total",
+    "Admission decisions per route class",
+    lambda: [
+        ((budget.name, outcome), getattr(budget.stats, outcome))
+        for budget in admission.budgets
+        for outcome in ("admitted", "rejected", "timed_out")
+    ],
+    ("route_class", "outcome"),
+)
+registry.gauge(
+    "admission_active",
+    "Requests currently holding an admission slot",
+    lambda: [((budget.name,), budget.active) for budget in admission.budgets],
+    ("route_class",),
+)
+registry.gauge(
+    "admission_queue_depth",
+    "Requests waiting for an admission slot",
+    lambda: [((budget.name,), budget.queue_depth) for budget in admission.budgets],
+    ("route_class",),
+)
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from typing import Optional
 
@@ -8,6 +9,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 
 class AppConfig(BaseModel):
     debug: bool
+    # False — админы по умолчанию создаются отдельно: python -m src.startup.add_admin
+    seed_admins_on_startup: bool = True
 
 class DatabaseConfig(BaseModel):
     database: str
@@ -28,6 +31,8 @@ class RedisConfig(BaseModel):
     port: int
     password: str
     db: int
+    shard_urls: list[str] = []
+    cluster_url: str = ""
 
     def connection_url(self, db: Optional[int] = None) -> str:
         actual_db = db if db is not None else self.db
@@ -44,11 +49,75 @@ class RabbitMQConfig(BaseModel):
         return f"amqp://{self.user}:{self.password}@{self.host}:{self.port}"
 
 
+class SecurityConfig(BaseModel):
+    password_hasher: str
+    bcrypt_rounds: int
+    scrypt_ln: int
+    argon2_time_cost: int
+    argon2_memory_cost: int
+    rehash_on_login: bool
+    hash_workers: int
+    hash_batch_workers: int
+
+
+class SessionConfig(BaseModel):
+    mode: str
+    token_secret: str
+    token_ttl: int
+    touch_fraction: float
+    touch_flush_ms: float
+    cache_enabled: bool
+    cache_size: int
+    cache_ttl: float
+    snapshot_enabled: bool
+
+
+class RoleCacheConfig(BaseModel):
+    ttl: float
+    size: int
+    version_check_interval: float
+
+
+class AdmissionConfig(BaseModel):
+    enabled: bool
+    credentials_concurrency: int
+    credentials_queue: int
+    authenticated_concurrency: int
+    authenticated_queue: int
+    queue_timeout: float
+    retry_after: int
+
+
+class ThrottleConfig(BaseModel):
+    enabled: bool
+    login_email_limit: int
+    login_email_period: int
+    login_ip_limit: int
+    login_ip_period: int
+
+
+class MetricsConfig(BaseModel):
+    enabled: bool
+    path: str
+
+
+class TracingConfig(BaseModel):
+    enabled: bool
+    sample_rate: float
+
+
 class Settings(BaseModel):
     app: AppConfig
     db: DatabaseConfig
     redis: RedisConfig
     rabbitmq: RabbitMQConfig
+    security: SecurityConfig
+    session: SessionConfig
+    role_cache: RoleCacheConfig
+    admission: AdmissionConfig
+    throttle: ThrottleConfig
+    metrics: MetricsConfig
+    tracing: TracingConfig
 
 
 def load_settings() -> Settings:
@@ -60,6 +129,7 @@ def load_settings() -> Settings:
     return Settings(
         app=AppConfig(
           debug=env.bool("DEBUG"),
+          seed_admins_on_startup=env.bool("SEED_ADMINS_ON_STARTUP", True),
         ),
         db=DatabaseConfig(
             database=env.str("DB_NAME"),
@@ -73,6 +143,8 @@ def load_settings() -> Settings:
             port=env.int("REDIS_PORT"),
             password=env.str("REDIS_PASSWORD"),
             db=env.int("REDIS_DB"),
+            shard_urls=env.list("REDIS_SHARD_URLS", []),
+            cluster_url=env.str("REDIS_CLUSTER_URL", ""),
         ),
         rabbitmq=RabbitMQConfig(
             user=env.str("RABBITMQ_USER"),
@@ -80,6 +152,56 @@ def load_settings() -> Settings:
             host=env.str("RABBITMQ_HOST"),
             port=env.int("RABBITMQ_PORT"),
         ),
+        security=SecurityConfig(
+            password_hasher=env.str("PASSWORD_HASHER", "bcrypt"),
+            bcrypt_rounds=env.int("BCRYPT_ROUNDS", 12),
+            scrypt_ln=env.int("SCRYPT_LN", 15),
+            argon2_time_cost=env.int("ARGON2_TIME_COST", 3),
+            argon2_memory_cost=env.int("ARGON2_MEMORY_COST", 65536),
+            rehash_on_login=env.bool("PASSWORD_REHASH_ON_LOGIN", True),
+            hash_workers=env.int("PASSWORD_HASH_WORKERS", os.cpu_count() or 1),
+            hash_batch_workers=env.int("PASSWORD_HASH_BATCH_WORKERS", 0),
+        ),
+        session=SessionConfig(
+            mode=env.str("SESSION_MODE", "redis"),
+            token_secret=env.str("SESSION_TOKEN_SECRET", ""),
+            token_ttl=env.int("SESSION_TOKEN_TTL", 300),
+            touch_fraction=env.float("SESSION_TOUCH_FRACTION", 0.9),
+            touch_flush_ms=env.float("SESSION_TOUCH_FLUSH_MS", 5.0),
+            cache_enabled=env.bool("SESSION_CACHE_ENABLED", False),
+            cache_size=env.int("SESSION_CACHE_SIZE", 10_000),
+            cache_ttl=env.float("SESSION_CACHE_TTL", 30.0),
+            snapshot_enabled=env.bool("SESSION_SNAPSHOT_ENABLED", False),
+        ),
+        role_cache=RoleCacheConfig(
+            ttl=env.float("ROLE_CACHE_TTL", 60.0),
+            size=env.int("ROLE_CACHE_SIZE", 10_000),
+            version_check_interval=env.float("ROLE_CACHE_VERSION_CHECK_INTERVAL", 1.0),
+        ),
+        admission=AdmissionConfig(
+            enabled=env.bool("ADMISSION_ENABLED", True),
+            credentials_concurrency=env.int("ADMISSION_CREDENTIALS_CONCURRENCY", 2 * (os.cpu_count() or 1)),
+            credentials_queue=env.int("ADMISSION_CREDENTIALS_QUEUE", 16 * (os.cpu_count() or 1)),
+            authenticated_concurrency=env.int("ADMISSION_AUTHENTICATED_CONCURRENCY", 256),
+            authenticated_queue=env.int("ADMISSION_AUTHENTICATED_QUEUE", 1024),
+            queue_timeout=env.float("ADMISSION_QUEUE_TIMEOUT", 5.0),
+            retry_after=env.int("ADMISSION_RETRY_AFTER", 1),
+        ),
+        throttle=ThrottleConfig(
+            enabled=env.bool("LOGIN_THROTTLE_ENABLED", True),
+            login_email_limit=env.int("LOGIN_EMAIL_LIMIT", 10),
+            login_email_period=env.int("LOGIN_EMAIL_PERIOD", 300),
+            login_ip_limit=env.int("LOGIN_IP_LIMIT", 100),
+            login_ip_period=env.int("LOGIN_IP_PERIOD", 60),
+        ),
+        metrics=MetricsConfig(
+            enabled=env.bool("METRICS_ENABLED", False),
+            path=env.str("METRICS_PATH", "/metrics"),
+        ),
+        tracing=TracingConfig(
+            enabled=env.bool("TRACING_ENABLED", False),
+            sample_rate=env.float("TRACING_SAMPLE_RATE", 1.0),
+        ),
     )
 
 
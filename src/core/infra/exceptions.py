@@ -50,4 +50,8 @@ class InactiveUser(AppException):
 
 
 class Conflict(AppException):
-    """Конфликт данных"""
\ No newline at end of file
+    """Конфликт данных"""
+
+
+class TooManyRequests(AppException):
+    """Слишком много попыток, повторите позже"""
@@ -0,0 +1,26 @@
+import base64
+import datetime
+import json
+
+
+class InvalidCursor(ValueError):
+    """Курсор не удалось разобрать."""
+
+
+def encode_cursor(created_at: datetime.datetime, row_id: int) -> str:
+    """Непрозрачный курсор keyset-пагинации: позиция последней отданной строки."""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    """Обратное к encode_cursor. Бросает InvalidCursor на битом курсоре."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        created = datetime.datetime.fromisoformat(created_at)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    if not isinstance(row_id, int) or created.tzinfo is None:
+        raise InvalidCursor("Invalid cursor")
+    return created, row_id
@@ -5,8 +5,13 @@ from typing import AsyncGenerator
 from fastapi import FastAPI
 
 
-from .taskiq_broker import broker
+from .config.settings import settings
+from .security import password_executor
+from .taskiq_broker import shutdown_broker, startup_broker
 from ..database import db_helper
+from ..redis_storage.scripts import load_scripts
+from ..redis_storage.session_cache import session_cache
+from ..redis_storage.session_touch import session_toucher
 from ..startup.add_admin import create_default_admins
 
 logger = logging.getLogger(__name__)
@@ -17,13 +22,18 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Startup
 
     logger.info("Starting application....")
-    await create_default_admins()
-    if not broker.is_worker_process:
-        await broker.startup()
+    password_executor.start()
+    if settings.app.seed_admins_on_startup:
+        await create_default_admins()
+    await load_scripts()
+    await session_cache.start()
+    await startup_broker()
     yield
-    if not broker.is_worker_process:
-        await broker.shutdown()
+    await session_toucher.stop()
+    await session_cache.stop()
+    await shutdown_broker()
     await db_helper.dispose()
+    password_executor.shutdown()
     await app.state.dishka_container.close()
 
     logger.info("Application shutdown complete.")
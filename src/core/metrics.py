@@ -0,0 +1,270 @@
+import bisect
+import functools
+import math
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional, TypeVar, Union
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.tracing import SPAN_DB, SPAN_HASH, SPAN_REDIS, current_trace
+
+# Метрики в текстовом формате Prometheus (exposition format 0.0.4).
+# Своя минимальная реализация вместо prometheus_client: нужны только счётчики,
+# гистограммы и gauge со значением, вычисляемым в момент сбора.
+# Запись — несколько операций со словарём и bisect, без блокировок:
+# всё вызывается из одного event loop.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# секунды: от быстрых обращений к Redis до bcrypt и медленных запросов
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[str, ...]
+GaugeValue = Union[float, Iterable[tuple[Labels, float]]]
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Labels, values: Labels, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Labels = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Labels = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        span: Optional[str] = None,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+        # вид спана для трассировки запроса (Server-Timing); None — не трассируется
+        self.span = span
+        # labels -> [счётчики по корзинам (не накопленные), последняя — +Inf; сумма]
+        self._series: dict[Labels, tuple[list[int], list[float]]] = {}
+
+    def observe(self, seconds: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        series[1][0] += seconds
+        if self.span is not None:
+            trace = current_trace.get()
+            if trace is not None:
+                trace.add(self.span, seconds, ",".join(labels))
+
+    def time(self, *labels: str) -> Callable[[F], F]:
+        """Декоратор корутины: длительность каждого вызова попадает в гистограмму."""
+
+        def decorator(fn: F) -> F:
+            @functools.wraps(fn)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - started, *labels)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorator
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = _format_labels(self.labels, labels, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_str = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class CallbackMetric(Metric):
+    """Значение читается в момент сбора (состояние пула, счётчики других компонентов)."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        fn: Callable[[], GaugeValue],
+        labels: Labels = (),
+        kind: str = "gauge",
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.kind = kind
+        self.fn = fn
+
+    def samples(self) -> list[str]:
+        value = self.fn()
+        if isinstance(value, (int, float)):
+            return [f"{self.name} {_format_value(value)}"]
+        return [
+            f"{self.name}{_format_labels(self.labels, labels)} {_format_value(v)}"
+            for labels, v in value
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Any:
+        # повторная регистрация (например, второй экземпляр компонента) заменяет метрику
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Labels = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Labels = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        span: Optional[str] = None,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets, span))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        fn: Callable[[], GaugeValue],
+        labels: Labels = (),
+    ) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, fn, labels))
+
+    def counter_callback(
+        self,
+        name: str,
+        documentation: str,
+        fn: Callable[[], GaugeValue],
+        labels: Labels = (),
+    ) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, fn, labels, kind="counter"))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+auth_duration = registry.histogram(
+    "auth_operation_duration_seconds",
+    "AuthService operation latency",
+    ("operation",),
+)
+password_hash_duration = registry.histogram(
+    "password_hash_duration_seconds",
+    "Password hashing/verification latency (including pool queueing)",
+    ("operation",),
+    span=SPAN_HASH,
+)
+redis_duration = registry.histogram(
+    "redis_operation_duration_seconds",
+    "Redis round trips made by repositories",
+    ("operation",),
+    span=SPAN_REDIS,
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    ("statement",),
+    span=SPAN_DB,
+)
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: латентность запросов по шаблону маршрута (/api/admins/{user_id})."""
+
+    def __init__(self, app: ASGIApp, histogram: Optional[Histogram] = None, skip_paths: Iterable[str] = ()) -> None:
+        self.app = app
+        self.histogram = histogram or http_request_duration
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # шаблон маршрута, а не сырой путь: иначе число рядов растёт с каждым id
+            template = getattr(route, "path", None) or "<unmatched>"
+            self.histogram.observe(time.perf_counter() - started, scope["method"], template, status)
@@ -0,0 +1,13 @@
+__all__ = [
+    "PasswordExecutor",
+    "password_executor",
+    "PasswordHasher",
+    "BcryptHasher",
+    "ScryptHasher",
+    "Argon2Hasher",
+    "make_hasher",
+    "identify_hasher",
+]
+
+from .executor import PasswordExecutor, password_executor
+from .hashers import Argon2Hasher, BcryptHasher, PasswordHasher, ScryptHasher, identify_hasher, make_hasher
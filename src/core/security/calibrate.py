@@ -0,0 +1,68 @@
+"""
+Подбор стоимости хеширования под целевое время проверки пароля на этом железе.
+
+    python -m src.core.security.calibrate --target-ms 250
+    python -m src.core.security.calibrate --algorithm scrypt --target-ms 100
+
+Печатает время verify для каждой стоимости и рекомендуемую строку для .env.
+Выбирается максимальная стоимость, при которой verify укладывается в цель.
+"""
+import argparse
+import statistics
+import time
+
+from src.core.security.hashers import PasswordHasher, available_algorithms, make_hasher
+
+# (параметр в .env, минимальная и максимальная стоимость)
+COST_RANGES = {
+    "bcrypt": ("BCRYPT_ROUNDS", 4, 20),
+    "scrypt": ("SCRYPT_LN", 10, 22),
+    "argon2": ("ARGON2_TIME_COST", 1, 20),
+}
+
+
+def measure_verify(hasher: PasswordHasher, samples: int) -> float:
+    """Медиана времени verify в миллисекундах."""
+    encoded = hasher.hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.verify("calibration-password", encoded)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(algorithm: str, target_ms: float, samples: int) -> tuple[int, list[tuple[int, float]]]:
+    _, low, high = COST_RANGES[algorithm]
+    base = make_hasher(algorithm)
+    chosen = low
+    timings: list[tuple[int, float]] = []
+    for cost in range(low, high + 1):
+        elapsed = measure_verify(base.with_cost(cost), samples)
+        timings.append((cost, elapsed))
+        if elapsed > target_ms:
+            break
+        chosen = cost
+    return chosen, timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrate password hashing cost")
+    parser.add_argument("--algorithm", choices=available_algorithms(), default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="целевое время verify, мс")
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    chosen, timings = calibrate(args.algorithm, args.target_ms, args.samples)
+    for cost, elapsed in timings:
+        marker = "  <-" if cost == chosen else ""
+        print(f"{args.algorithm} cost={cost:<3} verify={elapsed:8.1f} ms{marker}")
+
+    env_name = COST_RANGES[args.algorithm][0]
+    print()
+    print(f"PASSWORD_HASHER={args.algorithm}")
+    print(f"{env_name}={chosen}")
+
+
+if __name__ == "__main__":
+    main()
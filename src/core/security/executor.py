@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Sequence
+
+from src.core.config.settings import settings
+from src.core.metrics import password_hash_duration, registry
+from src.core.security.hashers import PasswordHasher, identify_hasher, make_hasher
+
+logger = logging.getLogger(__name__)
+
+
+# ---------- функции, выполняемые в дочерних процессах ----------
+
+def _hash(hasher: PasswordHasher, password: str) -> str:
+    return hasher.hash(password)
+
+
+def _hash_many(hasher: PasswordHasher, passwords: Sequence[str]) -> list[str]:
+    return [hasher.hash(password) for password in passwords]
+
+
+def _verify(hasher: PasswordHasher, password: str, password_hash: str) -> bool:
+    return hasher.verify(password, password_hash)
+
+
+# ---------- статистика ----------
+
+@dataclass
+class OperationStats:
+    count: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def observe(self, elapsed: float, *, failed: bool = False) -> None:
+        self.count += 1
+        if failed:
+            self.errors += 1
+        self.total_seconds += elapsed
+        if elapsed > self.max_seconds:
+            self.max_seconds = elapsed
+
+
+@dataclass
+class HashingStats:
+    in_flight: int = 0
+    hash: OperationStats = field(default_factory=OperationStats)
+    hash_batch: OperationStats = field(default_factory=OperationStats)
+    verify: OperationStats = field(default_factory=OperationStats)
+
+
+class PasswordExecutor:
+    """
+    Выполняет хеширование/проверку паролей в ограниченном пуле процессов,
+    чтобы CPU-тяжёлая работа не блокировала event loop.
+    При workers=0 используется стандартный пул потоков (bcrypt/scrypt отпускают GIL).
+
+    Новые хеши строятся hasher-ом из настроек; проверяются хеши любого
+    поддерживаемого формата (алгоритм определяется по префиксу).
+
+    Массовое хеширование (hash_many) занимает не больше batch_workers воркеров
+    одновременно (по умолчанию — половину), чтобы импорт не вытеснял вход в систему.
+    """
+
+    def __init__(self, *, workers: int, hasher: PasswordHasher, batch_workers: int = 0) -> None:
+        self.workers = workers
+        self.hasher = hasher
+        self.batch_workers = batch_workers or max(1, (workers or os.cpu_count() or 1) // 2)
+        self.stats = HashingStats()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # общий для всех импортов: сколько частей пачек хешируется одновременно
+        self._batch_slots = asyncio.Semaphore(self.batch_workers)
+
+    @property
+    def queue_depth(self) -> int:
+        """Сколько задач ждут свободного процесса."""
+        if not self.workers:
+            return 0
+        return max(0, self.stats.in_flight - self.workers)
+
+    def start(self) -> None:
+        if self.workers and self._pool is None:
+            # fork: дочерним процессам не нужно заново импортировать приложение
+            ctx = multiprocessing.get_context("spawn" if sys.platform == "win32" else "fork")
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+            logger.info("Password executor started with %s workers", self.workers)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash, self.hasher, password)
+
+    async def hash_many(self, passwords: Sequence[str]) -> list[str]:
+        """
+        Хеширует пачку паролей (массовый импорт): пачка делится на batch_workers
+        частей, чтобы не платить за межпроцессный обмен на каждый пароль. Части всех
+        одновременных импортов делят batch_workers слотов; в метриках — операция hash_batch.
+        """
+        if not passwords:
+            return []
+        size = -(-len(passwords) // self.batch_workers)
+        chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+        results = await asyncio.gather(*(self._hash_chunk(chunk) for chunk in chunks))
+        return [h for chunk in results for h in chunk]
+
+    async def _hash_chunk(self, passwords: Sequence[str]) -> list[str]:
+        async with self._batch_slots:
+            return await self._run("hash_batch", _hash_many, self.hasher, passwords)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        hasher = identify_hasher(password_hash)
+        if hasher is None:
+            # неизвестный/битый формат хеша
+            return False
+        return await self._run("verify", _verify, hasher, password, password_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Хеш построен другим алгоритмом или с другой стоимостью, чем в настройках."""
+        hasher = identify_hasher(password_hash)
+        if hasher is None or hasher.algorithm != self.hasher.algorithm:
+            return True
+        return self.hasher.needs_rehash(password_hash)
+
+    async def _run(self, operation: str, fn: Callable[..., Any], *args: Any) -> Any:
+        self.start()
+        op_stats: OperationStats = getattr(self.stats, operation)
+        loop = asyncio.get_running_loop()
+
+        self.stats.in_flight += 1
+        started = time.perf_counter()
+        failed = False
+        try:
+            try:
+                return await loop.run_in_executor(self._pool, fn, *args)
+            except BrokenProcessPool:
+                # процесс-воркер упал — пересоздаём пул и пробуем ещё раз
+                logger.warning("Password executor pool is broken, restarting")
+                self.shutdown()
+                self.start()
+                return await loop.run_in_executor(self._pool, fn, *args)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.stats.in_flight -= 1
+            elapsed = time.perf_counter() - started
+            op_stats.observe(elapsed, failed=failed)
+            password_hash_duration.observe(elapsed, operation)
+
+
+password_executor = PasswordExecutor(
+    workers=settings.security.hash_workers,
+    batch_workers=settings.security.hash_batch_workers,
+    hasher=make_hasher(
+        settings.security.password_hasher,
+        bcrypt_rounds=settings.security.bcrypt_rounds,
+        scrypt_ln=settings.security.scrypt_ln,
+        argon2_time_cost=settings.security.argon2_time_cost,
+        argon2_memory_cost=settings.security.argon2_memory_cost,
+    ),
+)
+
+registry.gauge(
+    "password_executor_in_flight",
+    "Password hashing tasks submitted and not yet finished",
+    lambda: password_executor.stats.in_flight,
+)
+registry.gauge(
+    "password_executor_queue_depth",
+    "Password hashing tasks waiting for a free worker",
+    lambda: password_executor.queue_depth,
+)
+registry.counter_callback(
+    "password_executor_errors_total",
+    "Failed password hashing tasks",
+    lambda: [
+        (("hash",), password_executor.stats.hash.errors),
+        (("hash_batch",), password_executor.stats.hash_batch.errors),
+        (("verify",), password_executor.stats.verify.errors),
+    ],
+    ("operation",),
+)
@@ -0,0 +1,241 @@
+import base64
+import hashlib
+import hmac
+import re
+import secrets
+from dataclasses import dataclass
+from typing import Optional
+
+import bcrypt
+
+try:
+    import argon2
+except ImportError:  # argon2-cffi — необязательная зависимость
+    argon2 = None
+
+
+class PasswordHasher:
+    """
+    Алгоритм хеширования паролей. Хеш самоописывающий: префикс определяет
+    алгоритм, параметры стоимости хранятся в самом хеше.
+    Экземпляры передаются в дочерние процессы, поэтому должны сериализоваться pickle.
+    """
+
+    algorithm: str = ""
+    prefixes: tuple[str, ...] = ()
+
+    def identify(self, encoded: str) -> bool:
+        return encoded.startswith(self.prefixes)
+
+    def hash(self, password: str) -> str:
+        raise NotImplementedError
+
+    def verify(self, password: str, encoded: str) -> bool:
+        raise NotImplementedError
+
+    def needs_rehash(self, encoded: str) -> bool:
+        """Хеш этого алгоритма, но с другими параметрами стоимости."""
+        raise NotImplementedError
+
+    def with_cost(self, cost: int) -> "PasswordHasher":
+        """Тот же алгоритм с другим значением основного параметра стоимости (для калибровки)."""
+        raise NotImplementedError
+
+    @property
+    def cost(self) -> int:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class BcryptHasher(PasswordHasher):
+    rounds: int = 12
+
+    algorithm = "bcrypt"
+    prefixes = ("$2a$", "$2b$", "$2y$")
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+    def verify(self, password: str, encoded: str) -> bool:
+        try:
+            return bcrypt.checkpw(password.encode("utf-8"), encoded.encode("utf-8"))
+        except ValueError:
+            # битый хеш
+            return False
+
+    def needs_rehash(self, encoded: str) -> bool:
+        # $2b$12$...
+        try:
+            return int(encoded.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def with_cost(self, cost: int) -> "BcryptHasher":
+        return BcryptHasher(rounds=cost)
+
+    @property
+    def cost(self) -> int:
+        return self.rounds
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.b64decode(value + "=" * (-len(value) % 4))
+
+
+@dataclass(frozen=True)
+class ScryptHasher(PasswordHasher):
+    """scrypt из hashlib. Формат: $scrypt$ln=<log2 N>,r=<r>,p=<p>$<salt>$<hash>."""
+
+    ln: int = 15
+    r: int = 8
+    p: int = 1
+
+    algorithm = "scrypt"
+    prefixes = ("$scrypt$",)
+
+    _PARAMS = re.compile(r"^ln=(\d+),r=(\d+),p=(\d+)$")
+    _SALT_BYTES = 16
+    _KEY_BYTES = 32
+
+    @staticmethod
+    def _derive(password: str, salt: bytes, ln: int, r: int, p: int) -> bytes:
+        n = 1 << ln
+        return hashlib.scrypt(
+            password.encode("utf-8"),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r * max(p, 1) + (1 << 20),
+            dklen=ScryptHasher._KEY_BYTES,
+        )
+
+    def _parse(self, encoded: str) -> Optional[tuple[int, int, int, bytes, bytes]]:
+        parts = encoded.split("$")
+        # ['', 'scrypt', 'ln=..,r=..,p=..', salt, hash]
+        if len(parts) != 5 or parts[1] != self.algorithm:
+            return None
+        match = self._PARAMS.match(parts[2])
+        if not match:
+            return None
+        try:
+            ln, r, p = (int(v) for v in match.groups())
+            return ln, r, p, _b64decode(parts[3]), _b64decode(parts[4])
+        except ValueError:
+            return None
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_bytes(self._SALT_BYTES)
+        key = self._derive(password, salt, self.ln, self.r, self.p)
+        return f"$scrypt$ln={self.ln},r={self.r},p={self.p}${_b64encode(salt)}${_b64encode(key)}"
+
+    def verify(self, password: str, encoded: str) -> bool:
+        parsed = self._parse(encoded)
+        if parsed is None:
+            return False
+        ln, r, p, salt, expected = parsed
+        try:
+            key = self._derive(password, salt, ln, r, p)
+        except ValueError:
+            return False
+        return hmac.compare_digest(key, expected)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        parsed = self._parse(encoded)
+        return parsed is None or parsed[:3] != (self.ln, self.r, self.p)
+
+    def with_cost(self, cost: int) -> "ScryptHasher":
+        return ScryptHasher(ln=cost, r=self.r, p=self.p)
+
+    @property
+    def cost(self) -> int:
+        return self.ln
+
+
+@dataclass(frozen=True)
+class Argon2Hasher(PasswordHasher):
+    """argon2id через argon2-cffi (если установлен). memory_cost — в KiB."""
+
+    time_cost: int = 3
+    memory_cost: int = 65536
+    parallelism: int = 1
+
+    algorithm = "argon2"
+    prefixes = ("$argon2",)
+
+    def _hasher(self) -> "argon2.PasswordHasher":
+        if argon2 is None:
+            raise RuntimeError("argon2-cffi is not installed")
+        return argon2.PasswordHasher(
+            time_cost=self.time_cost,
+            memory_cost=self.memory_cost,
+            parallelism=self.parallelism,
+        )
+
+    def hash(self, password: str) -> str:
+        return self._hasher().hash(password)
+
+    def verify(self, password: str, encoded: str) -> bool:
+        hasher = self._hasher()
+        try:
+            return hasher.verify(encoded, password)
+        except (argon2.exceptions.VerificationError, argon2.exceptions.InvalidHashError):
+            return False
+
+    def needs_rehash(self, encoded: str) -> bool:
+        hasher = self._hasher()
+        try:
+            return hasher.check_needs_rehash(encoded)
+        except argon2.exceptions.InvalidHashError:
+            return True
+
+    def with_cost(self, cost: int) -> "Argon2Hasher":
+        return Argon2Hasher(time_cost=cost, memory_cost=self.memory_cost, parallelism=self.parallelism)
+
+    @property
+    def cost(self) -> int:
+        return self.time_cost
+
+
+def available_algorithms() -> tuple[str, ...]:
+    names = [BcryptHasher.algorithm, ScryptHasher.algorithm]
+    if argon2 is not None:
+        names.append(Argon2Hasher.algorithm)
+    return tuple(names)
+
+
+def make_hasher(
+    algorithm: str,
+    *,
+    bcrypt_rounds: int = 12,
+    scrypt_ln: int = 15,
+    argon2_time_cost: int = 3,
+    argon2_memory_cost: int = 65536,
+) -> PasswordHasher:
+    if algorithm == BcryptHasher.algorithm:
+        return BcryptHasher(rounds=bcrypt_rounds)
+    if algorithm == ScryptHasher.algorithm:
+        return ScryptHasher(ln=scrypt_ln)
+    if algorithm == Argon2Hasher.algorithm:
+        if argon2 is None:
+            raise RuntimeError("PASSWORD_HASHER=argon2 requires argon2-cffi")
+        return Argon2Hasher(time_cost=argon2_time_cost, memory_cost=argon2_memory_cost)
+    raise ValueError(f"Unknown password hasher: {algorithm}")
+
+
+# для проверки хешей любого поддерживаемого формата (параметры берутся из самого хеша)
+VERIFIERS: tuple[PasswordHasher, ...] = (BcryptHasher(), ScryptHasher()) + (
+    (Argon2Hasher(),) if argon2 is not None else ()
+)
+
+
+def identify_hasher(encoded: str) -> Optional[PasswordHasher]:
+    for hasher in VERIFIERS:
+        if hasher.identify(encoded):
+            return hasher
+    return None
@@ -0,0 +1,108 @@
+import base64
+import hashlib
+import hmac
+import json
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from src.core.config.settings import settings
+
+TOKEN_VERSION = "v1"
+
+_FLAG_ACTIVE = 1
+_FLAG_ADMIN = 2
+_FLAG_SUPER_ADMIN = 4
+
+
+@dataclass(frozen=True)
+class SessionToken:
+    """
+    Содержимое подписанного cookie-токена сессии. Время — unix-время в миллисекундах.
+    До expires_at токен принимается без обращений к Redis/БД; после — до refresh_until
+    его можно обновить (с проверкой списка отзыва).
+    """
+    user_id: int
+    jti: str
+    issued_at: int
+    expires_at: int
+    refresh_until: int
+    is_active: bool = True
+    is_admin: bool = False
+    is_super_admin: bool = False
+
+    def renewed(self, *, now: int, ttl: int, refresh_ttl: int, **flags: bool) -> "SessionToken":
+        return replace(
+            self,
+            issued_at=now,
+            expires_at=now + ttl * 1000,
+            refresh_until=now + refresh_ttl * 1000,
+            **flags,
+        )
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+class TokenSigner:
+    """HMAC-SHA256 подпись токенов вида v1.<payload>.<signature> (base64url)."""
+
+    def __init__(self, secret: str) -> None:
+        self._key = secret.encode("utf-8")
+
+    @staticmethod
+    def is_token(value: str) -> bool:
+        """
+        Отличает токен от SID серверной сессии по префиксу "v1.": SID вида
+        {tag}.{random} начинается с hex-тега пользователя, старые SID точек не содержат.
+        """
+        return value.startswith(f"{TOKEN_VERSION}.")
+
+    def _signature(self, signed_part: str) -> str:
+        return _b64encode(hmac.new(self._key, signed_part.encode("ascii"), hashlib.sha256).digest())
+
+    def sign(self, token: SessionToken) -> str:
+        flags = (
+            (_FLAG_ACTIVE if token.is_active else 0)
+            | (_FLAG_ADMIN if token.is_admin else 0)
+            | (_FLAG_SUPER_ADMIN if token.is_super_admin else 0)
+        )
+        body = [token.user_id, token.jti, token.issued_at, token.expires_at, token.refresh_until, flags]
+        payload = _b64encode(json.dumps(body, separators=(",", ":")).encode("utf-8"))
+        signed_part = f"{TOKEN_VERSION}.{payload}"
+        return f"{signed_part}.{self._signature(signed_part)}"
+
+    def load(self, value: str) -> Optional[SessionToken]:
+        """Проверяет подпись и разбирает токен; None — если он битый или подделан."""
+        try:
+            version, payload, signature = value.split(".")
+        except ValueError:
+            return None
+        if version != TOKEN_VERSION:
+            return None
+        if not hmac.compare_digest(signature, self._signature(f"{version}.{payload}")):
+            return None
+        try:
+            user_id, jti, issued_at, expires_at, refresh_until, flags = json.loads(_b64decode(payload))
+            return SessionToken(
+                user_id=int(user_id),
+                jti=str(jti),
+                issued_at=int(issued_at),
+                expires_at=int(expires_at),
+                refresh_until=int(refresh_until),
+                is_active=bool(flags & _FLAG_ACTIVE),
+                is_admin=bool(flags & _FLAG_ADMIN),
+                is_super_admin=bool(flags & _FLAG_SUPER_ADMIN),
+            )
+        except (ValueError, TypeError):
+            return None
+
+
+if settings.session.mode == "token" and not settings.session.token_secret:
+    raise RuntimeError("SESSION_MODE=token requires SESSION_TOKEN_SECRET")
+
+token_signer = TokenSigner(settings.session.token_secret)
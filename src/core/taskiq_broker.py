@@ -1,40 +1,95 @@
 __all__ = (
     "broker",
     "scheduler",
+    "get_broker",
+    "get_scheduler",
+    "startup_broker",
+    "shutdown_broker",
 )
 
 import logging
-
-import taskiq_fastapi
-from taskiq import TaskiqEvents, TaskiqState
-from taskiq_aio_pika import AioPikaBroker
-from taskiq import TaskiqScheduler
-from taskiq.schedule_sources import LabelScheduleSource
-
-from dishka import make_async_container
-from dishka.integrations.taskiq import TaskiqProvider, setup_dishka
+from typing import TYPE_CHECKING, Any, Optional
 
 from src.core.config.log_setup import setup_logging
 from src.core.config.settings import settings
-from src.providers.db_provider import DatabaseProvider
+
+if TYPE_CHECKING:
+    from taskiq import TaskiqScheduler
+    from taskiq_aio_pika import AioPikaBroker
 
 logger = logging.getLogger(__name__)
 
-broker = AioPikaBroker(url=settings.rabbitmq.connection_url())
+# Брокер и планировщик создаются при первом обращении (taskiq, aio-pika и aiohttp
+# заметно удлиняют импорт приложения). broker/scheduler по-прежнему доступны как
+# атрибуты модуля — в т.ч. для CLI: taskiq worker src.core.taskiq_broker:broker
+_broker: Optional["AioPikaBroker"] = None
+_scheduler: Optional["TaskiqScheduler"] = None
+_started = False
+
+
+def get_broker() -> "AioPikaBroker":
+    global _broker
+    if _broker is None:
+        import taskiq_fastapi
+        from dishka import make_async_container
+        from dishka.integrations.taskiq import TaskiqProvider, setup_dishka
+        from taskiq import TaskiqEvents, TaskiqState
+        from taskiq_aio_pika import AioPikaBroker
+
+        from src.providers.db_provider import DatabaseProvider
+
+        broker = AioPikaBroker(url=settings.rabbitmq.connection_url())
+        taskiq_fastapi.init(broker, "src.main:app")
+
+        container = make_async_container(DatabaseProvider(), TaskiqProvider())
+        setup_dishka(container, broker)
+
+        @broker.on_event(TaskiqEvents.WORKER_STARTUP)
+        async def on_worker_startup(state: TaskiqState) -> None:
+            setup_logging(debug=False)
+            logger.info("Worker startup complete, state %s", state)
+
+        _broker = broker
+    return _broker
+
+
+def get_scheduler() -> "TaskiqScheduler":
+    global _scheduler
+    if _scheduler is None:
+        from taskiq import TaskiqScheduler
+        from taskiq.schedule_sources import LabelScheduleSource
+
+        broker = get_broker()
+        _scheduler = TaskiqScheduler(
+            broker=broker,
+            sources=[LabelScheduleSource(broker)],
+        )
+    return _scheduler
 
-scheduler = TaskiqScheduler(
-    broker=broker,
-    sources=[LabelScheduleSource(broker)],
-)
 
-taskiq_fastapi.init(broker, "src.main:app")
+def __getattr__(name: str) -> Any:
+    if name == "broker":
+        return get_broker()
+    if name == "scheduler":
+        return get_scheduler()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-container = make_async_container(DatabaseProvider(), TaskiqProvider())
 
-setup_dishka(container, broker)
+async def startup_broker() -> bool:
+    """
+    Подключение к RabbitMQ из API-процесса — только если брокер создан и на нём
+    зарегистрированы задачи (их отправка требует соединения). Воркер подключается сам.
+    """
+    global _started
+    if _broker is None or _broker.is_worker_process or not _broker.get_all_tasks():
+        return False
+    await _broker.startup()
+    _started = True
+    return True
 
 
-@broker.on_event(TaskiqEvents.WORKER_STARTUP)
-async def on_worker_startup(state: TaskiqState) -> None:
-    setup_logging(debug=False)
-    logger.info("Worker startup complete, state %s", state)
+async def shutdown_broker() -> None:
+    global _started
+    if _started and _broker is not None:
+        await _broker.shutdown()
+        _started = False
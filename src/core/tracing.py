@@ -0,0 +1,121 @@
+import logging
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Виды спанов; их пишут гистограммы метрик с параметром span (см. src.core.metrics)
+SPAN_DB = "db"
+SPAN_REDIS = "redis"
+SPAN_HASH = "hash"
+
+
+@dataclass
+class SpanStats:
+    count: int = 0
+    seconds: float = 0.0
+
+
+class RequestTrace:
+    """
+    Сводка по одному запросу: сколько обращений к БД/Redis/хешированию и сколько
+    времени они заняли, в разрезе вида и метки (тип SQL-запроса, операция Redis).
+    После отправки ответа закрывается: фоновые задачи, унаследовавшие контекст
+    запроса (например, пачка продлений TTL), в неё уже не пишут.
+    """
+
+    __slots__ = ("started", "spans", "details", "closed")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.spans: dict[str, SpanStats] = {}
+        self.details: dict[tuple[str, str], SpanStats] = {}
+        self.closed = False
+
+    def add(self, kind: str, seconds: float, detail: str = "") -> None:
+        if self.closed:
+            return
+        span = self.spans.get(kind)
+        if span is None:
+            span = self.spans[kind] = SpanStats()
+        span.count += 1
+        span.seconds += seconds
+        item = self.details.get((kind, detail))
+        if item is None:
+            item = self.details[(kind, detail)] = SpanStats()
+        item.count += 1
+        item.seconds += seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self, total: float) -> str:
+        """Значение заголовка Server-Timing (длительности в мс)."""
+        parts = [
+            f'{kind};dur={span.seconds * 1000:.2f};desc="{span.count}"'
+            for kind, span in self.spans.items()
+        ]
+        # остаток: код приложения, валидация и сериализация, ожидание event loop
+        app = total - sum(span.seconds for span in self.spans.values())
+        parts.append(f"app;dur={max(app, 0.0) * 1000:.2f}")
+        parts.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(parts)
+
+    def summary(self) -> str:
+        return " ".join(
+            f"{kind}:{detail or '-'}={item.count}/{item.seconds * 1000:.2f}ms"
+            for (kind, detail), item in self.details.items()
+        )
+
+
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI-middleware (включается настройкой TRACING_ENABLED): для доли запросов
+    sample_rate собирает RequestTrace, отдаёт его в заголовке Server-Timing
+    и пишет debug-лог с числом и длительностью обращений по видам.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 1.0) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (self.sample_rate < 1.0 and random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = current_trace.set(trace)
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", trace.server_timing(trace.elapsed()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            trace.closed = True
+            current_trace.reset(token)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "%s %s %s %.2fms %s",
+                    scope["method"],
+                    scope["path"],
+                    status,
+                    trace.elapsed() * 1000,
+                    trace.summary(),
+                )
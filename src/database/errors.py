@@ -0,0 +1,21 @@
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+# SQLSTATE-коды Postgres
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def sqlstate(err: IntegrityError) -> Optional[str]:
+    """SQLSTATE ошибки драйвера (asyncpg/psycopg), если он его сообщает."""
+    orig = err.orig
+    return getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+
+
+def is_unique_violation(err: IntegrityError) -> bool:
+    return sqlstate(err) == UNIQUE_VIOLATION
+
+
+def is_foreign_key_violation(err: IntegrityError) -> bool:
+    return sqlstate(err) == FOREIGN_KEY_VIOLATION
@@ -1,7 +1,9 @@
+import functools
 import logging
+import time
 from typing import AsyncGenerator
 
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     create_async_engine,
@@ -10,11 +12,34 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from src.core.config.settings import settings
+from src.core.metrics import db_query_duration, registry
 
 logger = logging.getLogger(__name__)
 
 
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info["query_started"].pop()
+    # метка — вид запроса (SELECT/INSERT/UPDATE/...), не текст: иначе число рядов не ограничено
+    kind = statement.lstrip()[:6].upper()
+    db_query_duration.observe(time.perf_counter() - started, kind)
+
+
+def _handle_error(context) -> None:
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
 class DatabaseHelper:
+    """
+    Движки создаются при первом обращении, а не при импорте: create_async_engine
+    подгружает драйвер asyncpg и диалект, что заметно удлиняет холодный старт.
+    """
+
     def __init__(
         self,
         url: str,
@@ -23,24 +48,49 @@ class DatabaseHelper:
         pool_size: int = 10,
         max_overflow: int = 10,
     ) -> None:
-        self.engine: Engine = create_engine(
-            url,
+        self.url = url
+        self.engine_options = dict(
             echo=echo,
             echo_pool=echo_pool,
             pool_size=pool_size,
             max_overflow=max_overflow,
         )
 
-        self.async_engine: AsyncEngine = create_async_engine(
-            url,
-            echo=echo,
-            echo_pool=echo_pool,
-            pool_size=pool_size,
-            max_overflow=max_overflow,
-        )
+    @functools.cached_property
+    def engine(self) -> Engine:
+        return create_engine(self.url, **self.engine_options)
+
+    @functools.cached_property
+    def async_engine(self) -> AsyncEngine:
+        engine = create_async_engine(self.url, **self.engine_options)
+        self._instrument(engine)
+        return engine
 
-        self.session_factory = async_sessionmaker(
-            bind=self.async_engine, expire_on_commit=False, autoflush=False
+    @functools.cached_property
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        return async_sessionmaker(bind=self.async_engine, expire_on_commit=False, autoflush=False)
+
+    def _instrument(self, engine: AsyncEngine) -> None:
+        """Время SQL-запросов и состояние пула соединений — в метрики (один раз на движок)."""
+        sync_engine = engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+
+        registry.gauge(
+            "db_pool_checked_out",
+            "Connections currently checked out of the pool",
+            lambda: engine.pool.checkedout(),
+        )
+        registry.gauge(
+            "db_pool_overflow",
+            "Connections opened beyond pool_size (negative: pool not filled yet)",
+            lambda: engine.pool.overflow(),
+        )
+        registry.gauge(
+            "db_pool_size",
+            "Configured pool size",
+            lambda: engine.pool.size(),
         )
 
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
@@ -50,7 +100,8 @@ class DatabaseHelper:
 
     async def dispose(self) -> None:
         logger.info("Disposing database...")
-        await self.async_engine.dispose()
+        if "async_engine" in self.__dict__:
+            await self.async_engine.dispose()
 
 
 db_helper: DatabaseHelper = DatabaseHelper(
@@ -1,12 +1,17 @@
 import datetime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Boolean, DateTime, func, Integer
+from sqlalchemy import String, Boolean, DateTime, func, Integer, Index
 
 from src.database.models import Base
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # keyset-пагинация по (created_at, id), в т.ч. с фильтром is_active
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_is_active_created_at_id", "is_active", "created_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
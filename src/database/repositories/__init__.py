@@ -2,9 +2,12 @@ __all__ = [
     "BaseRepo",
     "UserRepository",
     "AdminRepository",
+    "Principal",
+    "PrincipalRepository",
 ]
 
 
 from .base import BaseRepo
 from .users import UserRepository
-from .admins import AdminRepository
\ No newline at end of file
+from .admins import AdminRepository
+from .principals import Principal, PrincipalRepository
\ No newline at end of file
@@ -1,10 +1,13 @@
 from typing import Optional, Sequence
 
 from sqlalchemy import select, update, delete, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 
 from src.database.models.admins import Admin
 from src.database.repositories import BaseRepo
+from src.redis_storage.role_cache import role_cache
+from src.redis_storage.user_versions import bump_user_version
 
 
 class AdminRepository(BaseRepo):
@@ -32,38 +35,54 @@ class AdminRepository(BaseRepo):
         return bool((await self.session.execute(stmt)).scalar())
 
     # --------- MUTATORS ---------
-    async def add_admin(self, user_id: int, *, super_admin: bool = False) -> Admin:
+    async def add_admin(self, user_id: int, *, super_admin: bool = False) -> Optional[Admin]:
         """
-        Создаёт администратора для user_id.
-        Бросает IntegrityError, если user_id уже админ (уникальный индекс на user_id).
+        Создаёт администратора для user_id одним INSERT ... ON CONFLICT DO NOTHING RETURNING.
+        Возвращает None, если user_id уже админ.
+        Бросает IntegrityError (foreign key), если пользователя нет.
         """
-        admin = Admin(user_id=user_id, super_admin=super_admin)
-        self.add(admin)
+        stmt = (
+            pg_insert(Admin)
+            .values(user_id=user_id, super_admin=super_admin)
+            .on_conflict_do_nothing(index_elements=[Admin.user_id])
+            .returning(Admin)
+        )
         try:
-            await self.commit()
+            admin = await self.session.scalar(stmt)
         except IntegrityError:
             await self.rollback()
-            existing = await self.get_by_user_id(user_id)
-            if existing:
-                return existing
             raise
-        await self.session.refresh(admin)
+        if admin is None:
+            await self.rollback()
+            return None
+        await self.commit()
+        await role_cache.bump()
+        await bump_user_version(user_id)
         return admin
 
     async def remove_admin(self, user_id: int) -> None:
         """Удаляет запись администратора по user_id (молчаливо, если её нет)."""
         await self.session.execute(delete(Admin).where(Admin.user_id == user_id))
         await self.commit()
+        await role_cache.bump()
+        await bump_user_version(user_id)
 
     async def set_super_admin(self, user_id: int, value: bool = True) -> Optional[Admin]:
         """
-        Проставляет/снимает флаг super_admin.
+        Проставляет/снимает флаг super_admin (UPDATE ... RETURNING).
         Возвращает обновлённую запись или None, если админ не найден.
         """
-        await self.session.execute(
+        admin = await self.session.scalar(
             update(Admin)
             .where(Admin.user_id == user_id)
             .values(super_admin=value)
+            .returning(Admin)
+            .execution_options(populate_existing=True)
         )
+        if admin is None:
+            await self.rollback()
+            return None
         await self.commit()
-        return await self.get_by_user_id(user_id)
\ No newline at end of file
+        await role_cache.bump()
+        await bump_user_version(user_id)
+        return admin
@@ -0,0 +1,51 @@
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+
+from src.database.models import User
+from src.database.models.admins import Admin
+from src.database.repositories import BaseRepo
+from src.redis_storage.role_cache import Roles, role_cache
+
+
+class Principal(NamedTuple):
+    """Минимум данных о пользователе, нужный guard'ам."""
+    id: int
+    is_active: bool
+    is_admin: bool
+    is_super_admin: bool
+
+
+class PrincipalRepository(BaseRepo):
+    """
+    Загрузка пользователя вместе с флагами администратора одним запросом.
+    Флаги берутся из кеша ролей (role_cache), если они там есть: тогда
+    читается только users.is_active по первичному ключу, без JOIN admins.
+    """
+
+    async def get(self, user_id: int) -> Optional[Principal]:
+        roles = await role_cache.lookup(user_id)
+        if roles is not None:
+            is_active = await self.session.scalar(select(User.is_active).where(User.id == user_id))
+            if is_active is None:
+                return None
+            return Principal(user_id, is_active, roles.is_admin, roles.is_super_admin)
+
+        version = role_cache.version
+        stmt = (
+            select(User.id, User.is_active, Admin.id, Admin.super_admin)
+            .outerjoin(Admin, Admin.user_id == User.id)
+            .where(User.id == user_id)
+        )
+        row = (await self.session.execute(stmt)).first()
+        if row is None:
+            return None
+        uid, is_active, admin_id, super_admin = row
+        roles = Roles(is_admin=admin_id is not None, is_super_admin=bool(super_admin))
+        role_cache.store(user_id, roles, version)
+        return Principal(
+            id=uid,
+            is_active=is_active,
+            is_admin=roles.is_admin,
+            is_super_admin=roles.is_super_admin,
+        )
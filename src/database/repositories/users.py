@@ -1,11 +1,16 @@
-from typing import Optional
+import datetime
+from typing import AsyncIterator, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import Row, select, text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import User
+from src.database.models import Admin, User
 from src.database.repositories import BaseRepo
 
+# временная таблица для массового импорта (COPY -> merge в users)
+IMPORT_STAGING_TABLE = "user_import"
+IMPORT_COLUMNS = ("line", "email", "password_hash", "first_name", "last_name", "middle_name")
+
 
 class UserRepository(BaseRepo):
     """Репозиторий для работы с таблицей users."""
@@ -21,4 +26,104 @@ class UserRepository(BaseRepo):
     async def get_all(self, limit: int = 100, offset: int = 0) -> list[User]:
         stmt = select(User).limit(limit).offset(offset)
         result = await self.session.scalars(stmt)
-        return result.all()
\ No newline at end of file
+        return result.all()
+
+    async def list_page(
+        self,
+        *,
+        limit: int,
+        after: Optional[tuple[datetime.datetime, int]] = None,
+        is_active: Optional[bool] = None,
+        created_from: Optional[datetime.datetime] = None,
+        created_to: Optional[datetime.datetime] = None,
+        is_admin: Optional[bool] = None,
+    ) -> list[Row]:
+        """
+        Страница пользователей (новые первыми) по keyset-пагинации на (created_at, id).
+        after — позиция последней строки предыдущей страницы.
+        Возвращает строки (User, is_admin, is_super_admin); LEFT JOIN admins идёт
+        по уникальному индексу admins.user_id.
+        """
+        stmt = (
+            select(
+                User,
+                Admin.id.is_not(None).label("is_admin"),
+                Admin.super_admin.is_(True).label("is_super_admin"),
+            )
+            .outerjoin(Admin, Admin.user_id == User.id)
+            .order_by(User.created_at.desc(), User.id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(User.created_at, User.id) < tuple_(*after))
+        if is_active is not None:
+            stmt = stmt.where(User.is_active.is_(is_active))
+        if created_from is not None:
+            stmt = stmt.where(User.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(User.created_at < created_to)
+        if is_admin is not None:
+            stmt = stmt.where(Admin.id.is_not(None) if is_admin else Admin.id.is_(None))
+
+        result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def stream_columns(
+        self, columns: Sequence[str], *, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Читает указанные колонки users через серверный курсор пачками по batch_size
+        (ORM-объекты не создаются). Порядок — по id.
+        """
+        stmt = (
+            select(*(getattr(User, name) for name in columns))
+            .order_by(User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(stmt)
+        try:
+            async for batch in result.partitions():
+                yield batch
+        finally:
+            await result.close()
+
+    # --------- bulk import ---------
+    async def create_import_staging(self) -> None:
+        """Временная таблица для COPY; живёт до конца транзакции."""
+        await self.session.execute(text(
+            f"CREATE TEMP TABLE {IMPORT_STAGING_TABLE} ("
+            "line integer NOT NULL, email varchar(255) NOT NULL, password_hash varchar(255) NOT NULL, "
+            "first_name varchar(100) NOT NULL, last_name varchar(100) NOT NULL, middle_name varchar(100)"
+            ") ON COMMIT DROP"
+        ))
+
+    async def copy_to_staging(self, records: Sequence[tuple]) -> None:
+        """Загружает записи (в порядке IMPORT_COLUMNS) в staging через COPY протокол asyncpg."""
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            IMPORT_STAGING_TABLE, records=records, columns=IMPORT_COLUMNS
+        )
+
+    async def merge_staging(self) -> list[Row]:
+        """
+        Одним INSERT ... SELECT ... ON CONFLICT DO NOTHING переносит staging в users.
+        Возвращает (line, email) строк, которые не вставились: email уже занят.
+        """
+        result = await self.session.execute(text(
+            f"""
+            WITH inserted AS (
+                INSERT INTO users (email, password_hash, first_name, last_name, middle_name, is_active)
+                SELECT email, password_hash, first_name, last_name, middle_name, true
+                FROM {IMPORT_STAGING_TABLE}
+                ORDER BY line
+                ON CONFLICT (email) DO NOTHING
+                RETURNING email
+            )
+            SELECT s.line, s.email
+            FROM {IMPORT_STAGING_TABLE} s
+            WHERE NOT EXISTS (SELECT 1 FROM inserted i WHERE i.email = s.email)
+            ORDER BY s.line
+            """
+        ))
+        return list(result.all())
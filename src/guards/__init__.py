@@ -1,43 +1,63 @@
-from fastapi import Depends, Request
-
-from sqlalchemy.ext.asyncio import AsyncSession
+from dishka import FromDishka
+from dishka.integrations.fastapi import inject
+from fastapi import Depends, Request, Response
 
+from src.api.auth.cookies import set_session_cookie
+from src.api.auth.schemas import UserSnapshot
 from src.api.auth.services import AuthService, COOKIE_NAME
 from src.core.infra.exceptions import NotAuthenticated, Forbidden
 
-from src.database import db_helper
 from src.database.models import User
-from src.database.repositories.admins import AdminRepository
+from src.database.repositories.principals import Principal
+
+# Guard'ы берут AuthService из request-scope контейнера Dishka,
+# поэтому делят один AsyncSession (и одно соединение из пула) с сервисами запроса.
+# Если при проверке токен сессии был обновлён, guard отдаёт его клиенту в cookie.
 
-def get_admin_repo(
-    db: AsyncSession = Depends(db_helper.get_session),
-) -> AdminRepository:
-    return AdminRepository(db)
 
+@inject
 async def require_user(
     request: Request,
-    db: AsyncSession = Depends(db_helper.get_session),
-) -> User:
+    response: Response,
+    service: FromDishka[AuthService],
+) -> User | UserSnapshot:
+    """Текущий пользователь с профилем — для ручек, которым нужны его данные."""
+    sid = request.cookies.get(COOKIE_NAME)
+    if not sid:
+        raise NotAuthenticated()
+    user = await service.get_current_user(sid)
+    if service.refreshed_token:
+        set_session_cookie(response, service.refreshed_token)
+    return user
+
+
+@inject
+async def require_principal(
+    request: Request,
+    response: Response,
+    service: FromDishka[AuthService],
+) -> Principal | UserSnapshot:
+    """id, is_active и флаги администратора одним запросом — для проверки прав."""
     sid = request.cookies.get(COOKIE_NAME)
     if not sid:
         raise NotAuthenticated()
-    service = AuthService(db)
-    return await service.get_current_user(sid)
+    principal = await service.get_current_principal(sid)
+    if service.refreshed_token:
+        set_session_cookie(response, service.refreshed_token)
+    return principal
 
 
 async def require_admin(
-    current_user: User = Depends(require_user),
-    repo: AdminRepository = Depends(get_admin_repo),
-) -> User:
-    if not await repo.is_admin(current_user.id):
+    principal: Principal | UserSnapshot = Depends(require_principal),
+) -> Principal | UserSnapshot:
+    if not principal.is_admin:
         raise Forbidden("Administrator rights required")
-    return current_user
+    return principal
 
 
 async def require_super_admin(
-    current_user: User = Depends(require_user),
-    repo: AdminRepository = Depends(get_admin_repo),
-) -> User:
-    if not await repo.is_super_admin(current_user.id):
+    principal: Principal | UserSnapshot = Depends(require_principal),
+) -> Principal | UserSnapshot:
+    if not principal.is_super_admin:
         raise Forbidden("Super admin rights required")
-    return current_user
\ No newline at end of file
+    return principal
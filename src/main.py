@@ -1,21 +1,23 @@
 import logging
 
-import uvicorn
-
 from fastapi import FastAPI
-from scalar_fastapi import get_scalar_api_reference
-from starlette.responses import RedirectResponse
+from starlette.responses import PlainTextResponse, RedirectResponse
 
 from src.api import setup_container, api_router
 from src.api.auth import auth_router
 
 from src.api.exception_handlers import not_authenticated_exception_handler, invalid_authenticated_exception_handler, \
     http_exception_handler, session_expired_exception_handler, forbidden_exception_handler, \
-    inactive_user_exception_handler, not_found_exception_handler, conflict_exception_handler
-from src.core import setup_logging, settings, lifespan
+    inactive_user_exception_handler, not_found_exception_handler, conflict_exception_handler, \
+    too_many_requests_exception_handler
+from src.core import setup_logging, settings
+from src.core.lifespan import lifespan
+from src.core.admission import AdmissionMiddleware, admission
+from src.core.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from src.core.tracing import ServerTimingMiddleware
 
 from src.core.infra.exceptions import NotAuthenticated, InvalidCredentials, SessionExpired, Forbidden, InactiveUser, \
-    NotFound, Conflict
+    NotFound, Conflict, TooManyRequests
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +36,12 @@ app = FastAPI(
 
 
 setup_container(app)
+app.add_middleware(AdmissionMiddleware, controller=admission)
+if settings.metrics.enabled:
+    # внешний слой: в латентность попадают и отказы admission control (503)
+    app.add_middleware(MetricsMiddleware, skip_paths=[settings.metrics.path])
+if settings.tracing.enabled:
+    app.add_middleware(ServerTimingMiddleware, sample_rate=settings.tracing.sample_rate)
 
 # 401
 app.add_exception_handler(NotAuthenticated, not_authenticated_exception_handler)
@@ -50,6 +58,9 @@ app.add_exception_handler(NotFound, not_found_exception_handler)
 # 409
 app.add_exception_handler(Conflict, conflict_exception_handler)
 
+# 429
+app.add_exception_handler(TooManyRequests, too_many_requests_exception_handler)
+
 # 500 (catch-all)
 app.add_exception_handler(Exception, http_exception_handler)
 
@@ -59,6 +70,8 @@ async def redirect_to_docs() -> RedirectResponse:
 
 @app.get("/docs", include_in_schema=False)
 async def init_scalar_docs():
+    from scalar_fastapi import get_scalar_api_reference
+
     return get_scalar_api_reference(
         title=app.title,  # type: ignore
         openapi_url=app.openapi_url,  # type: ignore
@@ -66,11 +79,18 @@ async def init_scalar_docs():
         hide_download_button=True,
     )
 
+if settings.metrics.enabled:
+    @app.get(settings.metrics.path, include_in_schema=False)
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
 app.include_router(auth_router)
 app.include_router(api_router)
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     try:
         uvicorn.run(app, host="0.0.0.0", port=8000)
     except (KeyboardInterrupt, SystemExit):
@@ -1,6 +1,15 @@
 from redis.asyncio import Redis
 
 from src.core.config.settings import settings
+from src.redis_storage.backend import RedisBackend
 
 
+# основной узел: служебные ключи (ограничение попыток, списки отзыва), L1-трекинг
 redis = Redis.from_url(settings.redis.connection_url(), decode_responses=True)
+
+# узлы для ключей RedisRepo (сессии, user_ver): один узел, шарды или кластер
+backend = RedisBackend.from_settings(
+    redis,
+    shard_urls=settings.redis.shard_urls,
+    cluster_url=settings.redis.cluster_url,
+)
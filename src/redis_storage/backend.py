@@ -0,0 +1,62 @@
+import bisect
+import hashlib
+import logging
+from typing import Sequence
+
+from redis.asyncio import Redis, RedisCluster
+
+from src.redis_storage.keys import hash_tag
+
+logger = logging.getLogger(__name__)
+
+
+def _point(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class RedisBackend:
+    """
+    Выбор узла Redis для ключа:
+      - один узел (по умолчанию);
+      - несколько независимых узлов (REDIS_SHARD_URLS): консистентное хеширование
+        hash tag ключа по кольцу с виртуальными узлами — при добавлении узла
+        переезжает ~1/N ключей; у каждого узла свой пул соединений;
+      - Redis Cluster (REDIS_CLUSTER_URL): слот по тому же hash tag выбирает сам клиент.
+    """
+
+    def __init__(self, nodes: Sequence[Redis], *, names: Sequence[str] = (), vnodes: int = 160) -> None:
+        self.nodes = list(nodes)
+        self.cluster = len(self.nodes) == 1 and isinstance(self.nodes[0], RedisCluster)
+        self._ring: list[int] = []
+        self._owners: list[Redis] = []
+        if len(self.nodes) > 1:
+            points = sorted(
+                (_point(f"{name}#{i}"), node)
+                for name, node in zip(names, self.nodes)
+                for i in range(vnodes)
+            )
+            self._ring = [point for point, _ in points]
+            self._owners = [node for _, node in points]
+
+    @property
+    def sharded(self) -> bool:
+        return self.cluster or len(self.nodes) > 1
+
+    def client_for(self, key: str) -> Redis:
+        if not self._ring:
+            return self.nodes[0]
+        i = bisect.bisect(self._ring, _point(hash_tag(key))) % len(self._ring)
+        return self._owners[i]
+
+    @classmethod
+    def from_settings(cls, default: Redis, *, shard_urls: Sequence[str], cluster_url: str) -> "RedisBackend":
+        if cluster_url:
+            logger.info("Redis backend: cluster %s", cluster_url)
+            return cls([RedisCluster.from_url(cluster_url, decode_responses=True)])
+        if len(shard_urls) > 1:
+            logger.info("Redis backend: %s shards", len(shard_urls))
+            return cls(
+                [Redis.from_url(url, decode_responses=True) for url in shard_urls],
+                names=shard_urls,
+            )
+        return cls([default])
@@ -0,0 +1,27 @@
+import hashlib
+from typing import Optional
+
+# Hash tag ({...}) в имени ключа определяет узел: слот в Redis Cluster
+# или точку на кольце консистентного хеширования (RedisBackend).
+# Все ключи одного пользователя (сессии, их индекс, user_ver) получают тег
+# user_tag(user_id), поэтому многоключевые операции и Lua-скрипты по ним
+# выполняются на одном узле.
+
+
+def hash_tag(key: str) -> str:
+    """Часть ключа, по которой выбирается узел (правила Redis Cluster)."""
+    start = key.find("{")
+    if start != -1:
+        end = key.find("}", start + 1)
+        if end > start + 1:
+            return key[start + 1:end]
+    return key
+
+
+def user_tag(user_id: int | str) -> str:
+    return hashlib.blake2s(str(user_id).encode("ascii"), digest_size=4).hexdigest()
+
+
+def tagged_prefix(prefix: str, tag: Optional[str]) -> str:
+    """prefix:{tag} — без тега (старые ключи) остаётся просто prefix."""
+    return f"{prefix}:{{{tag}}}" if tag else prefix
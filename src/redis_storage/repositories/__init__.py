@@ -1,39 +1,74 @@
 from typing import Optional
 
-from src.redis_storage import redis
+from redis.asyncio import Redis
+
+from src.core.metrics import redis_duration
+from src.redis_storage import backend
 
 
 class RedisRepo:
+    """
+    Ключи с префиксом prefix. Узел Redis выбирается по ключу (RedisBackend),
+    если явно не передан client.
+    """
+
     def __init__(
-        self, prefix: str, key: Optional[str] = None, ttl: Optional[int] = None
+        self,
+        prefix: str,
+        key: Optional[str] = None,
+        ttl: Optional[int] = None,
+        client: Optional[Redis] = None,
     ) -> None:
         self.prefix = prefix
         self.default_key = key
         self.ttl = ttl
-        self.redis = redis
+        self.client = client
+
+    def _redis(self, real_key: str) -> Redis:
+        return self.client or backend.client_for(real_key)
 
     def _key(self, key: Optional[str] = None) -> str:
         raw_key = key or self.default_key or self.prefix
         return f"{self.prefix}:{raw_key}"
 
+    @redis_duration.time("set")
     async def set(self, value: str, key: Optional[str] = None):
-        return await self.redis.set(self._key(key), value, ex=self.ttl)
+        real_key = self._key(key)
+        return await self._redis(real_key).set(real_key, value, ex=self.ttl)
 
+    @redis_duration.time("get")
     async def get(self, key: Optional[str] = None) -> Optional[bytes]:
-        return await self.redis.get(self._key(key))
+        real_key = self._key(key)
+        return await self._redis(real_key).get(real_key)
 
+    @redis_duration.time("h_set")
     async def h_set(self, data: Optional[dict] = None, key: Optional[str] = None):
         data = data or {}
         real_key = self._key(key)
-        await self.redis.hset(real_key, mapping=data)
-        if self.ttl:
-            await self.redis.expire(real_key, self.ttl)
+        if not self.ttl:
+            await self._redis(real_key).hset(real_key, mapping=data)
+            return
+        async with self._redis(real_key).pipeline(transaction=True) as pipe:
+            pipe.hset(real_key, mapping=data)
+            pipe.expire(real_key, self.ttl)
+            await pipe.execute()
 
+    @redis_duration.time("incr")
+    async def incr(self, key: Optional[str] = None) -> int:
+        real_key = self._key(key)
+        return await self._redis(real_key).incr(real_key)
+
+    @redis_duration.time("h_get")
     async def h_get(self, field: str, key: Optional[str] = None) -> Optional[bytes]:
-        return await self.redis.hget(self._key(key), field)
+        real_key = self._key(key)
+        return await self._redis(real_key).hget(real_key, field)
 
+    @redis_duration.time("h_get_all")
     async def h_get_all(self, key: Optional[str] = None) -> dict[bytes, bytes]:
-        return await self.redis.hgetall(self._key(key))
+        real_key = self._key(key)
+        return await self._redis(real_key).hgetall(real_key)
 
+    @redis_duration.time("delete")
     async def delete(self, key: Optional[str] = None):
-        return await self.redis.delete(self._key(key))
+        real_key = self._key(key)
+        return await self._redis(real_key).delete(real_key)
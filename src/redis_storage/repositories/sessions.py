@@ -0,0 +1,193 @@
+import secrets
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from src.core.metrics import redis_duration
+from src.redis_storage import backend, scripts
+from src.redis_storage.keys import tagged_prefix, user_tag
+from src.redis_storage.repositories import RedisRepo
+from src.redis_storage.session_codec import (
+    SessionRecord,
+    decode_legacy_session,
+    decode_session,
+    encode_session,
+)
+
+SESSION_PREFIX = "sess"
+USER_SESSIONS_PREFIX = "user_sessions"
+
+
+def sid_tag(sid: str) -> Optional[str]:
+    """Hash tag пользователя из SID вида {tag}.{random}; у старых SID тега нет."""
+    tag, sep, _ = sid.partition(".")
+    return tag if sep else None
+
+
+class SessionRepo(RedisRepo):
+    """
+    Сессии sess:{tag}:{sid} -> упакованная SessionRecord (session_codec)
+    и индекс user_sessions:{tag}:{user_id} -> {sid, ...}.
+    Индекс позволяет отозвать все сессии пользователя без SCAN по keyspace.
+    TTL индекса выставляется равным TTL сессии при её создании и продлевается
+    вместе с ней, так что индекс живёт не дольше последней сессии; истёкшие SID
+    вычищаются из него при создании новой сессии и при отзыве всех сессий.
+
+    tag = user_tag(user_id) входит и в сам SID, поэтому по SID без обращения
+    к Redis известен узел (слот), где лежат сессия, индекс и user_ver пользователя.
+    Старые SID без тега читаются по прежним ключам sess:{sid}, старые сессии-хеши
+    читаются наравне с новыми и переписываются в новый формат при обновлении снапшота.
+    """
+
+    def __init__(
+        self,
+        key: Optional[str] = None,
+        ttl: Optional[int] = None,
+        client: Optional[Redis] = None,
+    ) -> None:
+        super().__init__(prefix=SESSION_PREFIX, key=key, ttl=ttl, client=client)
+
+    @staticmethod
+    def make_sid(user_id: int) -> str:
+        return f"{user_tag(user_id)}.{secrets.token_urlsafe(32)}"
+
+    def _key(self, key: Optional[str] = None) -> str:
+        sid = key or self.default_key or self.prefix
+        return f"{tagged_prefix(self.prefix, sid_tag(sid))}:{sid}"
+
+    @staticmethod
+    def _index_key(user_id: int | str, tag: Optional[str] = None) -> str:
+        return f"{tagged_prefix(USER_SESSIONS_PREFIX, tag or user_tag(user_id))}:{user_id}"
+
+    @redis_duration.time("session_create")
+    async def create(self, sid: str, record: SessionRecord) -> None:
+        """Создаёт сессию с TTL и добавляет её в индекс пользователя."""
+        real_key = self._key(sid)
+        index_key = self._index_key(record.user_id)
+        session_prefix = f"{tagged_prefix(self.prefix, user_tag(record.user_id))}:"
+        client = self._redis(real_key)
+        value = encode_session(record)
+        if scripts.scripts_available:
+            args = [self.ttl, sid, session_prefix, value]
+            try:
+                await scripts.CREATE_SESSION(keys=[real_key, index_key], args=args, client=client)
+                return
+            except ResponseError:
+                pass
+        # без скриптов: живость SID из индекса проверяется отдельным round trip
+        dead = []
+        sids = list(await client.smembers(index_key))
+        if sids:
+            async with client.pipeline(transaction=False) as pipe:
+                for member in sids:
+                    pipe.exists(f"{session_prefix}{member}")
+                alive = await pipe.execute()
+            dead = [member for member, exists in zip(sids, alive) if not exists]
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.set(real_key, value, ex=self.ttl)
+            if dead:
+                pipe.srem(index_key, *dead)
+            pipe.sadd(index_key, sid)
+            pipe.expire(index_key, self.ttl)
+            await pipe.execute()
+
+    @redis_duration.time("session_load")
+    async def load(
+        self, ref_prefix: Optional[str] = None, key: Optional[str] = None
+    ) -> tuple[Optional[SessionRecord], Optional[str], int]:
+        """
+        Сессия, значение ключа {ref_prefix}:{user_id} (если ref_prefix задан) и
+        оставшийся TTL (мс) за один round trip, без записи. Без скриптов — до трёх.
+        ValueError — сессия повреждена.
+        """
+        real_key = self._key(key)
+        client = self._redis(real_key)
+        if scripts.scripts_available:
+            try:
+                raw, ref, pttl = await scripts.GET_SESSION(
+                    keys=[real_key], args=[f"{ref_prefix}:" if ref_prefix else ""], client=client
+                )
+                if raw is None:
+                    return None, None, pttl
+                if isinstance(raw, str):
+                    return decode_session(raw), ref, pttl
+                return decode_legacy_session(dict(zip(raw[::2], raw[1::2]))), ref, pttl
+            except ResponseError:
+                pass
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.get(real_key)
+            pipe.pttl(real_key)
+            raw, pttl = await pipe.execute(raise_on_error=False)
+        if isinstance(raw, ResponseError):
+            # WRONGTYPE: сессия в старом формате
+            record = decode_legacy_session(await client.hgetall(real_key))
+        elif raw is None:
+            return None, None, pttl
+        else:
+            record = decode_session(raw)
+        ref = None
+        if ref_prefix:
+            ref_key = f"{ref_prefix}:{record.user_id}"
+            ref = await self._redis(ref_key).get(ref_key)
+        return record, ref, pttl
+
+    @redis_duration.time("session_replace")
+    async def replace(self, record: SessionRecord, key: Optional[str] = None) -> bool:
+        """Перезаписывает существующую сессию, не трогая TTL (истёкшую не воскрешает)."""
+        real_key = self._key(key)
+        client = self._redis(real_key)
+        return bool(await client.set(real_key, encode_session(record), xx=True, keepttl=True))
+
+    @redis_duration.time("session_remove")
+    async def remove(self, sid: str) -> None:
+        """Удаляет сессию и убирает её из индекса пользователя."""
+        real_key = self._key(sid)
+        tag = sid_tag(sid)
+        client = self._redis(real_key)
+        if scripts.scripts_available:
+            try:
+                await scripts.DELETE_SESSION(
+                    keys=[real_key],
+                    args=[f"{tagged_prefix(USER_SESSIONS_PREFIX, tag)}:", sid],
+                    client=client,
+                )
+                return
+            except ResponseError:
+                pass
+        if await client.type(real_key) == "hash":
+            user_id = await client.hget(real_key, "user_id")
+        else:
+            value = await client.get(real_key)
+            user_id = decode_session(value).user_id if value else None
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.delete(real_key)
+            if user_id:
+                pipe.srem(f"{tagged_prefix(USER_SESSIONS_PREFIX, tag)}:{user_id}", sid)
+            await pipe.execute()
+
+    @redis_duration.time("session_revoke_all")
+    async def revoke_all(self, user_id: int) -> list[str]:
+        """Удаляет все сессии пользователя одним вызовом. Возвращает отозванные SID."""
+        sids = await self._revoke_index(self._index_key(user_id), user_tag(user_id))
+        if not backend.sharded:
+            # сессии, созданные до появления тегов, ещё живут в старом индексе
+            sids += await self._revoke_index(f"{USER_SESSIONS_PREFIX}:{user_id}", None)
+        return sids
+
+    async def _revoke_index(self, index_key: str, tag: Optional[str]) -> list[str]:
+        client = self._redis(index_key)
+        if scripts.scripts_available:
+            try:
+                return await scripts.REVOKE_SESSIONS(
+                    keys=[index_key], args=[f"{tagged_prefix(self.prefix, tag)}:"], client=client
+                )
+            except ResponseError:
+                pass
+        sids = list(await client.smembers(index_key))
+        async with client.pipeline(transaction=True) as pipe:
+            for sid in sids:
+                pipe.delete(self._key(sid))
+            pipe.delete(index_key)
+            await pipe.execute()
+        return sids
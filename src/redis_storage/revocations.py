@@ -0,0 +1,31 @@
+from src.core.metrics import redis_duration
+from src.redis_storage import redis
+
+# Список отзыва для режима подписанных токенов (SESSION_MODE=token).
+# Проверяется только при обновлении токена, поэтому в горячем пути запросов Redis не участвует.
+# sess_revoked:{jti}            -> "1"  — токен отозван (logout)
+# sess_revoked_user:{user_id}   -> мс   — отозваны все токены, выданные до этого момента
+TOKEN_REVOKED_PREFIX = "sess_revoked"
+USER_TOKENS_REVOKED_PREFIX = "sess_revoked_user"
+
+
+@redis_duration.time("revoke_token")
+async def revoke_token(jti: str, ttl: int) -> None:
+    await redis.set(f"{TOKEN_REVOKED_PREFIX}:{jti}", "1", ex=ttl)
+
+
+@redis_duration.time("revoke_user_tokens")
+async def revoke_user_tokens(user_id: int, revoked_at: int, ttl: int) -> None:
+    await redis.set(f"{USER_TOKENS_REVOKED_PREFIX}:{user_id}", revoked_at, ex=ttl)
+
+
+@redis_duration.time("is_token_revoked")
+async def is_token_revoked(jti: str, user_id: int, issued_at: int) -> bool:
+    """Одна проверка (MGET) по обоим спискам."""
+    token_revoked, user_revoked_at = await redis.mget(
+        f"{TOKEN_REVOKED_PREFIX}:{jti}",
+        f"{USER_TOKENS_REVOKED_PREFIX}:{user_id}",
+    )
+    if token_revoked:
+        return True
+    return user_revoked_at is not None and issued_at <= int(user_revoked_at)
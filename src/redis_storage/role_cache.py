@@ -0,0 +1,123 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from redis.exceptions import RedisError
+
+from src.core.config.settings import settings
+from src.core.metrics import registry
+from src.redis_storage.repositories import RedisRepo
+
+logger = logging.getLogger(__name__)
+
+ROLE_VERSION_PREFIX = "admin_roles"
+
+
+class Roles(NamedTuple):
+    is_admin: bool
+    is_super_admin: bool
+
+
+class RoleCache:
+    """
+    In-process TTL/LRU кеш ролей администраторов по user_id.
+
+    Глобальная версия ролей хранится в Redis (admin_roles:version) и
+    увеличивается мутаторами AdminRepository. Каждый воркер сверяет версию
+    не чаще раза в version_check_interval секунд и при изменении сбрасывает
+    кеш целиком — таблица админов маленькая и меняется редко.
+
+    Использование (см. PrincipalRepository): lookup(); при промахе запомнить
+    version, прочитать роли из БД и положить их через store(user_id, roles, version).
+    """
+
+    def __init__(self, *, ttl: float, max_size: int, version_check_interval: float) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.version_check_interval = version_check_interval
+        self.hits = 0
+        self.misses = 0
+
+        self._repo = RedisRepo(prefix=ROLE_VERSION_PREFIX, key="version")
+        self._entries: OrderedDict[int, tuple[float, Optional[str], Roles]] = OrderedDict()
+        self._version: Optional[str] = None
+        self._checked_at = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @property
+    def version(self) -> Optional[str]:
+        """Версия ролей, с которой сверяются записи; фиксируется до чтения из БД."""
+        return self._version
+
+    async def lookup(self, user_id: int) -> Optional[Roles]:
+        """Роли из кеша или None (промах, кеш выключен)."""
+        if not self.enabled:
+            return None
+
+        await self._sync_version()
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            expires_at, version, roles = entry
+            if expires_at > time.monotonic() and version == self._version:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return roles
+            del self._entries[user_id]
+
+        self.misses += 1
+        return None
+
+    def store(self, user_id: int, roles: Roles, version: Optional[str]) -> None:
+        """
+        Кладёт роли, прочитанные из БД при версии version. Если версия за это
+        время сменилась (параллельный bump), запись сразу считается устаревшей.
+        """
+        if not self.enabled:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl, version, roles)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def bump(self) -> None:
+        """Инвалидирует роли во всех воркерах."""
+        self._entries.clear()
+        await self._repo.incr()
+        self._checked_at = 0.0
+
+    async def _sync_version(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self.version_check_interval:
+            return
+        try:
+            version = await self._repo.get()
+        except RedisError as e:
+            # без версии нельзя доверять кешу — работаем напрямую с БД до восстановления Redis
+            logger.warning("Cannot read admin roles version: %s", e)
+            self._entries.clear()
+            self._version = None
+            self._checked_at = 0.0
+            return
+        self._checked_at = now
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+
+role_cache = RoleCache(
+    ttl=settings.role_cache.ttl,
+    max_size=settings.role_cache.size,
+    version_check_interval=settings.role_cache.version_check_interval,
+)
+
+registry.counter_callback(
+    "role_cache_requests_total",
+    "Admin role cache lookups",
+    lambda: [(("hit",), role_cache.hits), (("miss",), role_cache.misses)],
+    ("result",),
+)
+registry.gauge("role_cache_entries", "Users held in the admin role cache", lambda: len(role_cache._entries))
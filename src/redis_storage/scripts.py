@@ -0,0 +1,140 @@
+import logging
+
+from redis.exceptions import RedisError
+
+from src.redis_storage import backend, redis
+
+logger = logging.getLogger(__name__)
+
+
+# ---------- сессии + индекс user_sessions:{user_id} ----------
+# Ключи сессий вычисляются внутри скриптов: сессии, индекс и user_ver пользователя
+# имеют общий hash tag и поэтому лежат на одном узле (слоте), см. SessionRepo.
+
+# KEYS[1] — ключ сессии, KEYS[2] — индекс; ARGV[1] — TTL, ARGV[2] — sid,
+# ARGV[3] — префикс ключей сессий, ARGV[4] — упакованная сессия (session_codec).
+# Попутно вычищает из индекса уже истёкшие сессии; TTL индекса — не меньше TTL
+# любой его сессии (продление сессии продлевает и индекс, см. AuthService._load_session).
+CREATE_SESSION = redis.register_script(
+    """
+    redis.call('SET', KEYS[1], ARGV[4], 'EX', ARGV[1])
+    for _, sid in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+        if redis.call('EXISTS', ARGV[3] .. sid) == 0 then
+            redis.call('SREM', KEYS[2], sid)
+        end
+    end
+    redis.call('SADD', KEYS[2], ARGV[2])
+    redis.call('EXPIRE', KEYS[2], ARGV[1])
+    return 1
+    """
+)
+
+# user_id сессии: из упакованной строки ([формат, user_id, ...]) или из старого хеша.
+_SESSION_USER_ID = """
+    local kind = redis.call('TYPE', KEYS[1])['ok']
+    local data, uid = false, false
+    if kind == 'string' then
+        data = redis.call('GET', KEYS[1])
+        uid = string.match(data, '^%[%d+,(%d+),') or false
+    elseif kind == 'hash' then
+        data = redis.call('HGETALL', KEYS[1])
+        uid = redis.call('HGET', KEYS[1], 'user_id') or false
+    end
+"""
+
+# KEYS[1] — ключ сессии; ARGV[1] — префикс индекса, ARGV[2] — sid
+DELETE_SESSION = redis.register_script(
+    _SESSION_USER_ID
+    + """
+    redis.call('DEL', KEYS[1])
+    if uid then
+        redis.call('SREM', ARGV[1] .. uid, ARGV[2])
+    end
+    return uid
+    """
+)
+
+# Только чтение: сессия (строка — новый формат, массив field, value — старый хеш),
+# значение ключа ARGV[1]..user_id (пустой ARGV[1] — не читать) и оставшийся TTL (мс).
+GET_SESSION = redis.register_script(
+    _SESSION_USER_ID
+    + """
+    if not data then
+        return {false, false, -2}
+    end
+    local ref = false
+    if uid and ARGV[1] ~= '' then
+        ref = redis.call('GET', ARGV[1] .. uid)
+    end
+    return {data, ref, redis.call('PTTL', KEYS[1])}
+    """
+)
+
+# KEYS[1] — индекс; ARGV[1] — префикс ключей сессий. Возвращает отозванные SID.
+REVOKE_SESSIONS = redis.register_script(
+    """
+    local sids = redis.call('SMEMBERS', KEYS[1])
+    for _, sid in ipairs(sids) do
+        redis.call('DEL', ARGV[1] .. sid)
+    end
+    redis.call('DEL', KEYS[1])
+    return sids
+    """
+)
+
+# ---------- ограничение частоты (GCRA) ----------
+
+# KEYS — ключи лимитов; ARGV — пары (интервал между попытками, допуск на всплеск) в мс
+# для каждого ключа. Попытка засчитывается всем ключам или ни одному.
+# Возвращает 0, если попытка разрешена, иначе через сколько мс можно повторить.
+GCRA_HIT = redis.register_script(
+    """
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+    local tats = {}
+    local retry = 0
+    for i, key in ipairs(KEYS) do
+        local interval = tonumber(ARGV[2 * i - 1])
+        local tolerance = tonumber(ARGV[2 * i])
+        local tat = math.max(tonumber(redis.call('GET', key) or now), now)
+        if tat - now > tolerance then
+            retry = math.max(retry, tat - now - tolerance)
+        end
+        tats[i] = tat + interval
+    end
+    if retry > 0 then
+        return retry
+    end
+    for i, key in ipairs(KEYS) do
+        redis.call('SET', key, tats[i], 'PX', tats[i] - now)
+    end
+    return 0
+    """
+)
+
+SCRIPTS = (
+    CREATE_SESSION,
+    DELETE_SESSION,
+    GET_SESSION,
+    REVOKE_SESSIONS,
+    GCRA_HIT,
+)
+
+# False — сервер не принимает скрипты (ACL, отключённый scripting), работаем через pipeline
+scripts_available = False
+
+
+async def load_scripts() -> bool:
+    """Регистрирует Lua-скрипты на всех узлах (SCRIPT LOAD) один раз при старте."""
+    global scripts_available
+    nodes = [redis, *(node for node in backend.nodes if node is not redis)]
+    try:
+        for node in nodes:
+            for script in SCRIPTS:
+                await node.script_load(script.script)
+    except RedisError as e:
+        logger.warning("Redis scripts are unavailable, falling back to pipelines: %s", e)
+        scripts_available = False
+    else:
+        scripts_available = True
+    return scripts_available
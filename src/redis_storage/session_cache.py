@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from src.core.config.settings import settings
+from src.core.metrics import registry
+from src.redis_storage import backend
+from src.redis_storage.session_codec import SessionRecord
+from src.redis_storage.user_versions import USER_VERSION_PREFIX
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "__redis__:invalidate"
+
+
+class SessionCache:
+    """
+    L1-кеш сессий в памяти процесса: ограниченный LRU с локальным TTL.
+
+    Инвалидация серверная: отдельное соединение включает
+    CLIENT TRACKING ... BCAST PREFIX sess: NOLOOP с перенаправлением
+    уведомлений в pub/sub-соединение (__redis__:invalidate). Любое изменение,
+    удаление или истечение ключа sess:* на любом узле вытесняет запись.
+    Изменение user_ver:{tag}:{user_id} (снапшоты пользователя) вытесняет все сессии
+    этого пользователя.
+
+    Отдельное соединение служит только для управления трекингом и для пачек
+    продления TTL (session_toucher): с NOLOOP собственный EXPIRE не вытесняет
+    только что прочитанные записи. Промахи читаются обычным пулом соединений —
+    в BCAST-режиме уведомления не зависят от того, каким соединением читали, а гонку
+    чтения с инвалидацией закрывают begin()/complete().
+    Пока трекинг не установлен (или соединение потеряно), кеш не используется.
+    Трекинг ведётся на одном узле, поэтому при шардировании сессий
+    (несколько узлов или Redis Cluster) кеш отключается.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        prefix: str,
+        user_prefix: Optional[str] = None,
+        max_size: int,
+        ttl: float,
+        enabled: bool = True,
+        retry_delay: float = 1.0,
+    ) -> None:
+        self.url = url
+        self.prefix = prefix
+        self.user_prefix = user_prefix
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self.retry_delay = retry_delay
+
+        self.active = False
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        self._entries: OrderedDict[str, tuple[float, SessionRecord]] = OrderedDict()
+        # key -> [число незавершённых чтений, счётчик инвалидаций за это время]
+        self._inflight: dict[str, list[int]] = {}
+        self._control: Optional[Redis] = None
+        self._broken = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def tracking_client(self) -> Optional[Redis]:
+        """
+        Соединение с трекингом для продления TTL (не для чтения), если кеш активен;
+        иначе None — узел выбирается по ключу (RedisBackend).
+        """
+        if self.active and self._control is not None:
+            return self._control
+        return None
+
+    # ---------- lifecycle ----------
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        if backend.sharded:
+            logger.warning("Session cache is disabled: sessions are sharded across several Redis nodes")
+            self.enabled = False
+            return
+        self._task = asyncio.create_task(self._run(), name="session-cache-invalidation")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # ---------- cache API ----------
+    def get(self, key: str) -> Optional[SessionRecord]:
+        if not self.active:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def begin(self, key: str) -> Optional[int]:
+        """Отмечает начало чтения key из Redis; результат передаётся в complete()."""
+        if not self.active:
+            return None
+        token = self._inflight.setdefault(key, [0, 0])
+        token[0] += 1
+        return token[1]
+
+    def complete(self, key: str, seen: Optional[int], value: Optional[SessionRecord]) -> None:
+        """
+        Кладёт прочитанное значение в кеш, если за время чтения
+        по ключу не пришла инвалидация.
+        """
+        if seen is None:
+            return
+        token = self._inflight.get(key)
+        if token is None:
+            return
+        token[0] -= 1
+        if token[0] <= 0:
+            del self._inflight[key]
+        if not value or token[1] != seen or not self.active:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def evict(self, key: str) -> None:
+        self._entries.pop(key, None)
+        token = self._inflight.get(key)
+        if token is not None:
+            token[1] += 1
+
+    def evict_user(self, user_id: int) -> None:
+        for key in [k for k, (_, v) in self._entries.items() if v.user_id == user_id]:
+            del self._entries[key]
+        # какая из читаемых сейчас сессий принадлежит пользователю — неизвестно
+        for token in self._inflight.values():
+            token[1] += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        for token in self._inflight.values():
+            token[1] += 1
+
+    # ---------- invalidation ----------
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Session cache tracking connection lost: %s", e)
+            finally:
+                self._deactivate()
+            await asyncio.sleep(self.retry_delay)
+
+    async def _listen(self) -> None:
+        name = f"l1-inval-{os.getpid()}-{secrets.token_hex(4)}"
+        listener = Redis.from_url(self.url, decode_responses=True, client_name=name)
+        control = Redis.from_url(self.url, decode_responses=True, single_connection_client=True)
+        pubsub = listener.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATE_CHANNEL)
+            clients = await control.client_list(_type="pubsub")
+            client_id = next(int(c["id"]) for c in clients if c.get("name") == name)
+            prefixes = [f"{self.prefix}:"]
+            if self.user_prefix:
+                prefixes.append(f"{self.user_prefix}:")
+            await control.client_tracking_on(
+                clientid=client_id,
+                prefix=prefixes,
+                bcast=True,
+                noloop=True,
+            )
+
+            # любое переподключение означает потерю трекинга/уведомлений
+            self._broken = False
+            pubsub.connection.register_connect_callback(self._on_reconnect)
+            control.connection.register_connect_callback(self._on_reconnect)
+
+            self._control = control
+            self.active = True
+            logger.info("Session cache tracking enabled (client id %s)", client_id)
+
+            while not self._broken:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message["type"] == "message":
+                    self._on_invalidate(message["data"])
+        finally:
+            self._deactivate()
+            await pubsub.aclose()
+            await listener.aclose()
+            await control.aclose()
+
+    def _on_reconnect(self, _connection) -> None:
+        self._broken = True
+        self._deactivate()
+
+    def _on_invalidate(self, keys: Optional[list[str]]) -> None:
+        self.invalidations += 1
+        if keys is None:
+            # FLUSHALL/FLUSHDB или переполнение таблицы трекинга на сервере
+            self.clear()
+            return
+        user_marker = f"{self.user_prefix}:" if self.user_prefix else None
+        for key in keys:
+            if user_marker and key.startswith(user_marker):
+                # user_ver:{tag}:{user_id} (старый формат — user_ver:{user_id})
+                user_id = key.rsplit(":", 1)[-1]
+                if user_id.isdigit():
+                    self.evict_user(int(user_id))
+                else:
+                    self.clear()
+            else:
+                self.evict(key)
+
+    def _deactivate(self) -> None:
+        self.active = False
+        self._control = None
+        self.clear()
+
+
+session_cache = SessionCache(
+    settings.redis.connection_url(),
+    prefix="sess",
+    user_prefix=USER_VERSION_PREFIX,
+    max_size=settings.session.cache_size,
+    ttl=settings.session.cache_ttl,
+    enabled=settings.session.cache_enabled,
+)
+
+registry.counter_callback(
+    "session_cache_requests_total",
+    "L1 session cache lookups",
+    lambda: [(("hit",), session_cache.hits), (("miss",), session_cache.misses)],
+    ("result",),
+)
+registry.counter_callback(
+    "session_cache_invalidations_total",
+    "Invalidation messages received from Redis",
+    lambda: session_cache.invalidations,
+)
+registry.gauge("session_cache_entries", "Sessions held in the L1 cache", lambda: len(session_cache._entries))
+registry.gauge("session_cache_active", "1 if server-assisted tracking is established", lambda: int(session_cache.active))
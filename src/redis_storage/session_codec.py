@@ -0,0 +1,101 @@
+import datetime
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+# Формат значения sess:*: строка с JSON-массивом
+#   [2, user_id, issued_at, expires_at]                                  — без снапшота
+#   [2, user_id, issued_at, expires_at, ver, email, first_name,
+#    last_name, middle_name, flags]                                      — со снапшотом
+# Время — unix time в секундах. Первый элемент — версия формата; формат 1 —
+# хеш со строковыми полями (user_id, issued_at в ISO-8601, ...), он читается
+# до истечения старых сессий.
+# JSON, а не msgpack: клиенты работают с decode_responses=True, а Lua-скриптам
+# достаточно string.match, чтобы достать user_id (см. scripts.GET_SESSION).
+SESSION_FORMAT = 2
+
+FLAG_ACTIVE = 1
+FLAG_ADMIN = 2
+FLAG_SUPER_ADMIN = 4
+
+_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_loads = json.loads
+
+
+@dataclass(frozen=True, slots=True)
+class SessionRecord:
+    user_id: int
+    issued_at: int
+    expires_at: int
+    # снапшот пользователя; version=None — снапшота нет или он устарел
+    version: Optional[str] = None
+    email: str = ""
+    first_name: str = ""
+    last_name: str = ""
+    middle_name: Optional[str] = None
+    flags: int = 0
+
+
+def encode_session(record: SessionRecord) -> str:
+    body = [SESSION_FORMAT, record.user_id, record.issued_at, record.expires_at]
+    if record.version is not None:
+        body.extend(
+            (
+                record.version,
+                record.email,
+                record.first_name,
+                record.last_name,
+                record.middle_name,
+                record.flags,
+            )
+        )
+    return _dumps(body)
+
+
+def decode_session(value: str) -> SessionRecord:
+    """Разбирает упакованную сессию. ValueError — значение повреждено или формат неизвестен."""
+    try:
+        body = _loads(value)
+        if body[0] != SESSION_FORMAT:
+            raise ValueError(f"Unsupported session format: {body[0]!r}")
+        if len(body) == 4:
+            return SessionRecord(body[1], body[2], body[3])
+        if len(body) != 10:
+            raise ValueError("Corrupted session")
+        return SessionRecord(*body[1:])
+    except (TypeError, IndexError, KeyError) as e:
+        raise ValueError("Corrupted session") from e
+
+
+def _timestamp(value: Optional[str]) -> int:
+    if not value:
+        return 0
+    return int(datetime.datetime.fromisoformat(value).timestamp())
+
+
+def decode_legacy_session(data: dict[str, str]) -> SessionRecord:
+    """Сессия в старом формате (хеш со строковыми полями)."""
+    try:
+        user_id = int(data["user_id"])
+        issued_at = _timestamp(data.get("issued_at"))
+        expires_at = _timestamp(data.get("expires_at"))
+        if "ver" not in data:
+            return SessionRecord(user_id, issued_at, expires_at)
+        flags = (
+            (FLAG_ACTIVE if data["is_active"] == "1" else 0)
+            | (FLAG_ADMIN if data.get("is_admin") == "1" else 0)
+            | (FLAG_SUPER_ADMIN if data.get("is_super_admin") == "1" else 0)
+        )
+        return SessionRecord(
+            user_id,
+            issued_at,
+            expires_at,
+            version=data["ver"],
+            email=data["email"],
+            first_name=data["first_name"],
+            last_name=data["last_name"],
+            middle_name=data.get("middle_name") or None,
+            flags=flags,
+        )
+    except (KeyError, TypeError) as e:
+        raise ValueError("Corrupted session") from e
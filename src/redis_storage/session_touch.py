@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.core.config.settings import settings
+from src.core.metrics import redis_duration, registry
+from src.redis_storage import backend
+from src.redis_storage.session_cache import session_cache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TouchStats:
+    requested: int = 0  # продлений поставлено в очередь (с учётом повторов одного ключа)
+    flushed: int = 0    # EXPIRE реально отправлено
+    batches: int = 0
+    errors: int = 0
+
+
+class SessionToucher:
+    """
+    Скользящий TTL сессий без записи в Redis на каждый запрос.
+
+    Сессия продлевается, только если её оставшийся TTL опустился ниже
+    fraction * ttl (слабина — не больше (1 - fraction) * ttl). Продления
+    копятся в памяти (повторы одного ключа схлопываются) и уходят одним
+    pipeline (на каждый узел Redis) раз в flush_interval секунд.
+    """
+
+    def __init__(self, *, fraction: float, flush_interval: float) -> None:
+        self.fraction = fraction
+        self.flush_interval = flush_interval
+        self.stats = TouchStats()
+        self._pending: dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def due(self, pttl_ms: int, ttl: int) -> bool:
+        """Пора ли продлевать ключ с оставшимся TTL pttl_ms (PTTL < 0 — ключа нет/TTL не задан)."""
+        return 0 <= pttl_ms < self.fraction * ttl * 1000
+
+    def touch(self, key: str, ttl: int) -> None:
+        self.stats.requested += 1
+        self._pending[key] = ttl
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_later(), name="session-touch-flush")
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.sleep(self.flush_interval)
+        finally:
+            self._task = None
+        await self.flush()
+
+    @redis_duration.time("session_touch_flush")
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        # через соединение с трекингом: собственный EXPIRE не инвалидирует L1-кеш (NOLOOP);
+        # без кеша — один pipeline на узел
+        control = session_cache.tracking_client
+        by_node: dict[int, tuple[Redis, list[str]]] = {}
+        for key in batch:
+            client = control or backend.client_for(key)
+            by_node.setdefault(id(client), (client, []))[1].append(key)
+        try:
+            for client, keys in by_node.values():
+                async with client.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.expire(key, batch[key])
+                    await pipe.execute()
+        except RedisError as e:
+            self.stats.errors += 1
+            logger.warning("Session touch flush failed (%s keys): %s", len(batch), e)
+            return
+        self.stats.batches += 1
+        self.stats.flushed += len(batch)
+
+    async def stop(self) -> None:
+        """Отправляет накопленные продления (при остановке приложения)."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+session_toucher = SessionToucher(
+    fraction=settings.session.touch_fraction,
+    flush_interval=settings.session.touch_flush_ms / 1000,
+)
+
+registry.counter_callback(
+    "session_touch_total",
+    "Sliding-TTL session refreshes: requested, actually sent as EXPIRE, failed flushes",
+    lambda: [
+        (("requested",), session_toucher.stats.requested),
+        (("flushed",), session_toucher.stats.flushed),
+        (("error",), session_toucher.stats.errors),
+    ],
+    ("result",),
+)
@@ -0,0 +1,104 @@
+import hashlib
+import logging
+import math
+from typing import Optional
+
+from redis.exceptions import RedisError, ResponseError
+
+from src.core.config.settings import settings
+from src.core.metrics import redis_duration
+from src.redis_storage import redis, scripts
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_PREFIX = "throttle:login"
+
+
+class LoginThrottle:
+    """
+    Ограничение попыток входа по email и по IP (GCRA): limit попыток подряд,
+    дальше — одна попытка на period/limit секунд. Обе проверки — один вызов
+    Lua-скрипта; без скриптов — фиксированное окно (INCR + EXPIRE в MULTI).
+    При недоступном Redis попытки не ограничиваются.
+    """
+
+    def __init__(
+        self,
+        *,
+        email_limit: int,
+        email_period: int,
+        ip_limit: int,
+        ip_period: int,
+        enabled: bool = True,
+    ) -> None:
+        self.email_limit = email_limit
+        self.email_period = email_period
+        self.ip_limit = ip_limit
+        self.ip_period = ip_period
+        self.enabled = enabled
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        digest = hashlib.sha256(email.strip().lower().encode("utf-8")).hexdigest()[:32]
+        return f"{THROTTLE_PREFIX}:email:{digest}"
+
+    @staticmethod
+    def _ip_key(ip: str) -> str:
+        return f"{THROTTLE_PREFIX}:ip:{ip}"
+
+    @redis_duration.time("login_throttle")
+    async def hit(self, email: str, ip: Optional[str]) -> float:
+        """
+        Засчитывает попытку входа. Возвращает 0, если она разрешена,
+        иначе — через сколько секунд можно повторить.
+        """
+        if not self.enabled:
+            return 0.0
+
+        limits = [(self._email_key(email), self.email_limit, self.email_period)]
+        if ip:
+            limits.append((self._ip_key(ip), self.ip_limit, self.ip_period))
+
+        try:
+            if scripts.scripts_available:
+                try:
+                    return await self._gcra(limits)
+                except ResponseError:
+                    pass
+            return await self._fixed_window(limits)
+        except RedisError as e:
+            logger.warning("Login throttle is unavailable: %s", e)
+            return 0.0
+
+    async def _gcra(self, limits: list[tuple[str, int, int]]) -> float:
+        args: list[int] = []
+        for _, limit, period in limits:
+            interval = math.ceil(period * 1000 / limit)
+            args.extend((interval, interval * (limit - 1)))
+        retry_ms = await scripts.GCRA_HIT(keys=[key for key, _, _ in limits], args=args, client=redis)
+        return int(retry_ms) / 1000
+
+    async def _fixed_window(self, limits: list[tuple[str, int, int]]) -> float:
+        async with redis.pipeline(transaction=True) as pipe:
+            for key, _, period in limits:
+                window_key = f"{key}:w"
+                pipe.incr(window_key)
+                pipe.expire(window_key, period, nx=True)
+                pipe.ttl(window_key)
+            results = await pipe.execute()
+
+        retry = 0.0
+        for i, (_, limit, _) in enumerate(limits):
+            count, _, ttl = results[3 * i:3 * i + 3]
+            if count > limit:
+                retry = max(retry, float(max(ttl, 1)))
+        return retry
+
+
+login_throttle = LoginThrottle(
+    email_limit=settings.throttle.login_email_limit,
+    email_period=settings.throttle.login_email_period,
+    ip_limit=settings.throttle.login_ip_limit,
+    ip_period=settings.throttle.login_ip_period,
+    enabled=settings.throttle.enabled,
+)
@@ -0,0 +1,20 @@
+from src.redis_storage.keys import tagged_prefix, user_tag
+from src.redis_storage.repositories import RedisRepo
+
+# user_ver:{tag}:{user_id} -> счётчик изменений пользователя (профиль, активность, права).
+# Снапшот в сессии считается актуальным, пока его версия совпадает с этим счётчиком.
+# Тег тот же, что у сессий пользователя (см. SessionRepo): ключ лежит на их узле.
+USER_VERSION_PREFIX = "user_ver"
+
+
+def _repo(user_id: int) -> RedisRepo:
+    return RedisRepo(prefix=tagged_prefix(USER_VERSION_PREFIX, user_tag(user_id)), key=str(user_id))
+
+
+async def get_user_version(user_id: int) -> str:
+    value = await _repo(user_id).get()
+    return value or "0"
+
+
+async def bump_user_version(user_id: int) -> None:
+    await _repo(user_id).incr()
@@ -1,71 +1,153 @@
+"""
+Создание администраторов по умолчанию.
+
+Вызывается из lifespan (если SEED_ADMINS_ON_STARTUP) или отдельно, один раз при деплое:
+
+    python -m src.startup.add_admin
+"""
+import asyncio
 import logging
+import sys
+from typing import NamedTuple
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
-import bcrypt
-from sqlalchemy import select
+from src.core import setup_logging
+from src.core.security import password_executor
 from src.database import db_helper
 from src.database.models import User
 from src.database.models.admins import Admin
+from src.redis_storage.role_cache import role_cache
+from src.redis_storage.user_versions import bump_user_version
 
 logger = logging.getLogger("Startup task")
 
+# Ключ pg_advisory_xact_lock: воркеры, стартующие одновременно, сидируют по очереди
+SEED_LOCK_KEY = 0x5EED_AD31
+
+
+class DefaultAdmin(NamedTuple):
+    email: str
+    password: str
+    first_name: str
+    last_name: str
+    super_admin: bool
+
+
+DEFAULT_ADMINS = (
+    DefaultAdmin("superadmin@example.com", "superpass", "Super", "Admin", super_admin=True),
+    # обычный админ: не может, например, назначать суперадминов
+    DefaultAdmin("admin@example.com", "adminpass", "Normal", "Admin", super_admin=False),
+)
+
+
+async def _seed_state(session: AsyncSession) -> dict[str, tuple[int, bool | None]]:
+    """email -> (user_id, super_admin или None, если прав нет) для существующих пользователей."""
+    stmt = (
+        select(User.email, User.id, Admin.super_admin)
+        .outerjoin(Admin, Admin.user_id == User.id)
+        .where(User.email.in_([admin.email for admin in DEFAULT_ADMINS]))
+    )
+    return {email: (user_id, super_admin) for email, user_id, super_admin in await session.execute(stmt)}
+
+
+def _is_seeded(state: dict[str, tuple[int, bool | None]]) -> bool:
+    return all(
+        admin.email in state and state[admin.email][1] is admin.super_admin
+        for admin in DEFAULT_ADMINS
+    )
+
 
-async def create_default_admins() -> None:
+async def create_default_admins() -> bool:
     """
-    Создаёт двух пользователей:
-    - superadmin@example.com (суперадмин)
-    - admin@example.com (обычный админ)
-    Если пользователи уже есть — только обновит статусы.
+    Создаёт суперадмина superadmin@example.com и админа admin@example.com.
+    Существующим пользователям только выставляет права (пароль не меняется).
+
+    Если всё уже на месте — один SELECT без блокировок и хеширования. Иначе под
+    advisory-блокировкой (транзакционной) состояние перечитывается, пароли хешируются
+    только для недостающих пользователей (в пуле password_executor, не в event loop),
+    затем INSERT ... ON CONFLICT для пользователей и прав. Версии пользователей с изменёнными
+    правами увеличиваются (снапшоты в сессиях перечитываются). Возвращает True, если что-то изменено.
     """
     async with db_helper.session_factory() as session:
-        # ---- SUPER ADMIN ----
-        super_email = "superadmin@example.com"
-        super_pass = "superpass"
-
-        super_user = await session.scalar(select(User).where(User.email == super_email))
-        if not super_user:
-            salt = bcrypt.gensalt(rounds=12)
-            super_user = User(
-                email=super_email,
-                password_hash=bcrypt.hashpw(super_pass.encode("utf-8"), salt).decode("utf-8"),
-                first_name="Super",
-                last_name="Admin",
-                is_active=True,
+        if _is_seeded(await _seed_state(session)):
+            logger.debug("Default admins are already present")
+            return False
+
+        await session.execute(select(func.pg_advisory_xact_lock(SEED_LOCK_KEY)))
+        state = await _seed_state(session)
+        if _is_seeded(state):
+            # пока ждали блокировку, сидирование выполнил другой воркер
+            await session.commit()
+            return False
+
+        missing = [admin for admin in DEFAULT_ADMINS if admin.email not in state]
+        if missing:
+            hashes = await asyncio.gather(*(password_executor.hash(admin.password) for admin in missing))
+            await session.execute(
+                pg_insert(User)
+                .values(
+                    [
+                        {
+                            "email": admin.email,
+                            "password_hash": password_hash,
+                            "first_name": admin.first_name,
+                            "last_name": admin.last_name,
+                            "is_active": True,
+                        }
+                        for admin, password_hash in zip(missing, hashes)
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=[User.email])
             )
-            session.add(super_user)
-            await session.flush()
-            logger.info("Создан супер-админ: %s", super_email)
-
-        super_admin = await session.scalar(select(Admin).where(Admin.user_id == super_user.id))
-        if not super_admin:
-            super_admin = Admin(user_id=super_user.id, super_admin=True)
-            session.add(super_admin)
-        else:
-            super_admin.super_admin = True
-
-        # ---- ORDINARY ADMIN ----
-        admin_email = "admin@example.com"
-        admin_pass = "adminpass"
-
-        admin_user = await session.scalar(select(User).where(User.email == admin_email))
-        if not admin_user:
-            salt = bcrypt.gensalt(rounds=12)
-            admin_user = User(
-                email=admin_email,
-                password_hash=bcrypt.hashpw(admin_pass.encode("utf-8"), salt).decode("utf-8"),
-                first_name="Normal",
-                last_name="Admin",
-                is_active=True,
+
+        # права одним запросом: user_id берём по email, флаг — из DEFAULT_ADMINS
+        super_admins = [admin.email for admin in DEFAULT_ADMINS if admin.super_admin]
+        rows = select(User.id, User.email.in_(super_admins)).where(
+            User.email.in_([admin.email for admin in DEFAULT_ADMINS])
+        )
+        stmt = pg_insert(Admin).from_select([Admin.user_id, Admin.super_admin], rows)
+        # RETURNING отдаёт только вставленные и изменённые строки — их снапшоты и токены устарели
+        changed_user_ids = list(
+            await session.scalars(
+                stmt.on_conflict_do_update(
+                    index_elements=[Admin.user_id],
+                    set_={Admin.super_admin: stmt.excluded.super_admin},
+                    where=Admin.super_admin.is_distinct_from(stmt.excluded.super_admin),
+                ).returning(Admin.user_id)
             )
-            session.add(admin_user)
-            await session.flush()
-            logger.info("Создан админ: %s", admin_email)
+        )
+        await session.commit()
 
-        admin = await session.scalar(select(Admin).where(Admin.user_id == admin_user.id))
-        if not admin:
-            admin = Admin(user_id=admin_user.id, super_admin=False)
-            session.add(admin)
-        else:
-            admin.super_admin = False
+    # как в мутаторах AdminRepository: после commit, чтобы перечитанное состояние было новым
+    if changed_user_ids:
+        await role_cache.bump()
+        for user_id in changed_user_ids:
+            await bump_user_version(user_id)
 
-        await session.commit()
-        logger.info("Созданы/обновлены супер-админ и админ.")
+    for admin in missing:
+        logger.info("Создан %s: %s", "супер-админ" if admin.super_admin else "админ", admin.email)
+    logger.info("Созданы/обновлены супер-админ и админ.")
+    return True
+
+
+async def run() -> int:
+    password_executor.start()
+    try:
+        changed = await create_default_admins()
+    finally:
+        await db_helper.dispose()
+        password_executor.shutdown()
+    logger.info("Default admins created/updated" if changed else "Default admins are already present")
+    return 0
+
+
+def main() -> None:
+    setup_logging(debug=False)
+    sys.exit(asyncio.run(run()))
+
+
+if __name__ == "__main__":
+    main()
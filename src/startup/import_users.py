@@ -0,0 +1,46 @@
+"""
+Массовый импорт пользователей из файла.
+
+    python -m src.startup.import_users users.csv
+    python -m src.startup.import_users users.ndjson --format ndjson --batch-size 2000
+
+Отчёт (ImportReport) печатается в stdout в JSON.
+"""
+import argparse
+import asyncio
+import sys
+
+from src.core import setup_logging
+from src.api.admins.imports import DEFAULT_BATCH_SIZE, IMPORT_FORMATS, import_users, iter_file_lines
+from src.core.security import password_executor
+from src.database import db_helper
+
+
+async def run(path: str, fmt: str, batch_size: int) -> int:
+    password_executor.start()
+    try:
+        async with db_helper.session_factory() as session:
+            report = await import_users(session, iter_file_lines(path), fmt, batch_size=batch_size)
+    finally:
+        await db_helper.dispose()
+        password_executor.shutdown()
+
+    print(report.model_dump_json(indent=2))
+    return 0 if not report.invalid else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import of users (CSV/NDJSON)")
+    parser.add_argument("path", help="CSV (с заголовком) или NDJSON файл")
+    parser.add_argument("--format", dest="fmt", choices=IMPORT_FORMATS, default=None,
+                        help="по умолчанию — по расширению файла")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.fmt or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    setup_logging(debug=False)
+    sys.exit(asyncio.run(run(args.path, fmt, args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
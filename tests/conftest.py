@@ -0,0 +1,24 @@
+from typing import Any
+
+import pytest
+
+
+@pytest.fixture
+def memory_redis(monkeypatch: pytest.MonkeyPatch) -> Any:
+    """
+    fakeredis вместо основного клиента и узлов RedisBackend, Lua-скрипты включены
+    (нужны fakeredis и lupa). Клиент создаётся на тест: он привязан к циклу asyncio.run теста.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+
+    import src.redis_storage
+    from src.redis_storage import backend, revocations, scripts, throttle
+
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    for module in (src.redis_storage, revocations, scripts, throttle):
+        monkeypatch.setattr(module, "redis", client)
+    monkeypatch.setattr(backend, "nodes", [client])
+    monkeypatch.setattr(backend, "_ring", [])
+    monkeypatch.setattr(scripts, "scripts_available", True)
+    return client
@@ -0,0 +1,133 @@
+"""
+Сидирование администраторов по умолчанию (create_default_admins) идемпотентно:
+повторный запуск ничего не меняет (ни пользователей и хешей паролей, ни прав, ни версий
+в Redis), недостающие права восстанавливаются, а воркеры, стартующие одновременно,
+сидируют по очереди под advisory-блокировкой.
+
+Нужен Postgres (INSERT ... ON CONFLICT, pg_advisory_xact_lock): URL базы —
+в TEST_DATABASE_URL (postgresql+asyncpg://...), без него тесты пропускаются.
+Таблицы создаются в отдельной временной схеме, которая удаляется после теста.
+"""
+import asyncio
+import os
+import secrets
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+import src.startup.add_admin as add_admin
+from src.core.security.executor import PasswordExecutor
+from src.core.security.hashers import BcryptHasher
+from src.database import db_helper
+from src.database.models import Base, User
+from src.database.models.admins import Admin
+from src.redis_storage.role_cache import ROLE_VERSION_PREFIX
+from src.startup.add_admin import DEFAULT_ADMINS, create_default_admins
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+
+@pytest.fixture
+def seeding(monkeypatch: pytest.MonkeyPatch, memory_redis):
+    """Открывает временную схему и направляет в неё db_helper; хеширование — дешёвый bcrypt."""
+    monkeypatch.setattr(add_admin, "password_executor", PasswordExecutor(workers=0, hasher=BcryptHasher(rounds=4)))
+
+    @asynccontextmanager
+    async def database() -> AsyncIterator[async_sessionmaker]:
+        schema = f"test_seed_{secrets.token_hex(4)}"
+        admin_engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+        async with admin_engine.begin() as conn:
+            await conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+        engine = create_async_engine(
+            DATABASE_URL,
+            poolclass=NullPool,
+            connect_args={"server_settings": {"search_path": schema}},
+        )
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            factory = async_sessionmaker(bind=engine, expire_on_commit=False, autoflush=False)
+            monkeypatch.setattr(db_helper, "session_factory", factory, raising=False)
+            yield factory
+        finally:
+            await engine.dispose()
+            async with admin_engine.begin() as conn:
+                await conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+            await admin_engine.dispose()
+
+    return database
+
+
+async def _state(factory: async_sessionmaker, redis) -> tuple:
+    async with factory() as session:
+        rows = await session.execute(
+            select(User.email, User.id, User.password_hash, User.is_active, Admin.super_admin)
+            .outerjoin(Admin, Admin.user_id == User.id)
+            .order_by(User.email)
+        )
+        db = [tuple(row) for row in rows]
+    keys = sorted(await redis.keys("*"))
+    return db, {key: await redis.get(key) for key in keys}
+
+
+def test_seeding_twice_leaves_the_same_state(seeding, memory_redis):
+    async def main() -> None:
+        async with seeding() as factory:
+            assert await create_default_admins() is True
+            first = await _state(factory, memory_redis)
+
+            assert await create_default_admins() is False
+            assert await _state(factory, memory_redis) == first
+
+        db, versions = first
+        assert [(email, super_admin) for email, _, _, _, super_admin in db] == sorted(
+            (admin.email, admin.super_admin) for admin in DEFAULT_ADMINS
+        )
+        # права изменились у обоих: версия ролей и версии пользователей увеличены по разу
+        assert versions[f"{ROLE_VERSION_PREFIX}:version"] == "1"
+        assert sorted(v for k, v in versions.items() if k != f"{ROLE_VERSION_PREFIX}:version") == ["1", "1"]
+
+    asyncio.run(main())
+
+
+def test_missing_rights_are_restored_without_touching_users(seeding, memory_redis):
+    async def main() -> None:
+        async with seeding() as factory:
+            await create_default_admins()
+            seeded, _ = await _state(factory, memory_redis)
+
+            async with factory() as session:
+                await session.execute(update(Admin).values(super_admin=False))
+                await session.commit()
+
+            assert await create_default_admins() is True
+            restored, versions = await _state(factory, memory_redis)
+            # пользователи и пароли те же, права — как после первого сидирования
+            assert restored == seeded
+            # изменились права только суперадмина
+            assert versions[f"{ROLE_VERSION_PREFIX}:version"] == "2"
+            assert sorted(v for k, v in versions.items() if k != f"{ROLE_VERSION_PREFIX}:version") == ["1", "2"]
+
+    asyncio.run(main())
+
+
+def test_concurrent_seeding_runs_once(seeding, memory_redis):
+    async def main() -> None:
+        async with seeding() as factory:
+            results = await asyncio.gather(*(create_default_admins() for _ in range(4)))
+            assert sorted(results) == [False, False, False, True]
+
+            db, versions = await _state(factory, memory_redis)
+            assert len(db) == len(DEFAULT_ADMINS)
+            assert versions[f"{ROLE_VERSION_PREFIX}:version"] == "1"
+
+            assert await create_default_admins() is False
+            assert await _state(factory, memory_redis) == (db, versions)
+
+    asyncio.run(main())
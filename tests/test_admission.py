@@ -0,0 +1,130 @@
+"""
+Admission control (AdmissionMiddleware): при переполненной очереди и по истечении
+ожидания слота — 503 с Retry-After и статусом UNAVAILABLE; пути вне /api и /auth
+(в том числе /metrics) бюджетами не ограничиваются.
+"""
+import asyncio
+
+import httpx
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from src.core.admission import AdmissionBudget, AdmissionController, AdmissionMiddleware, admission
+from src.core.config.settings import settings
+from src.core.infra import ErrorStatus
+
+RETRY_AFTER = 7
+
+
+def _app(controller: AdmissionController, release: asyncio.Event, started: asyncio.Event) -> Starlette:
+    async def slow(request: Request) -> PlainTextResponse:
+        started.set()
+        await release.wait()
+        return PlainTextResponse("ok")
+
+    async def metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse("metrics")
+
+    app = Starlette(
+        routes=[
+            Route("/api/slow", slow),
+            Route("/auth/login", slow, methods=["POST"]),
+            Route("/metrics", metrics),
+        ]
+    )
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    return app
+
+
+def _controller(*, queue_size: int, timeout: float) -> AdmissionController:
+    return AdmissionController(
+        credentials=AdmissionBudget("credentials", limit=1, queue_size=queue_size, timeout=timeout),
+        authenticated=AdmissionBudget("authenticated", limit=1, queue_size=queue_size, timeout=timeout),
+        retry_after=RETRY_AFTER,
+    )
+
+
+def _assert_unavailable(response: httpx.Response) -> None:
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(RETRY_AFTER)
+    assert response.json()["error"]["status"] == ErrorStatus.UNAVAILABLE
+
+
+async def _while_slot_is_held(controller: AdmissionController, path: str, method: str, requests):
+    """Держит единственный слот класса path, пока выполняются requests(client)."""
+    release, started = asyncio.Event(), asyncio.Event()
+    transport = httpx.ASGITransport(app=_app(controller, release, started))
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        holder = asyncio.create_task(client.request(method, path))
+        await started.wait()
+        try:
+            return await requests(client)
+        finally:
+            release.set()
+            assert (await holder).status_code == 200
+
+
+def test_full_queue_is_rejected_immediately():
+    controller = _controller(queue_size=0, timeout=10)
+
+    async def main() -> None:
+        response = await _while_slot_is_held(
+            controller, "/api/slow", "GET", lambda client: client.get("/api/slow")
+        )
+        _assert_unavailable(response)
+
+    asyncio.run(main())
+    assert controller.authenticated.stats.rejected == 1
+    assert controller.authenticated.stats.timed_out == 0
+    assert controller.authenticated.active == 0
+
+
+def test_queued_request_times_out():
+    controller = _controller(queue_size=1, timeout=0.05)
+
+    async def main() -> None:
+        response = await _while_slot_is_held(
+            controller, "/auth/login", "POST", lambda client: client.post("/auth/login")
+        )
+        _assert_unavailable(response)
+
+    asyncio.run(main())
+    assert controller.credentials.stats.timed_out == 1
+    assert controller.credentials.waiting == 0
+    assert controller.credentials.active == 0
+
+
+def test_queued_request_gets_the_released_slot():
+    controller = _controller(queue_size=1, timeout=10)
+    release, started = asyncio.Event(), asyncio.Event()
+
+    async def main() -> list[int]:
+        transport = httpx.ASGITransport(app=_app(controller, release, started))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/api/slow"))
+            await started.wait()
+            second = asyncio.create_task(client.get("/api/slow"))
+            while controller.authenticated.waiting == 0:
+                await asyncio.sleep(0)
+            release.set()
+            return [r.status_code for r in await asyncio.gather(first, second)]
+
+    assert asyncio.run(main()) == [200, 200]
+    assert controller.authenticated.stats.admitted == 2
+
+
+def test_metrics_bypass_admission():
+    controller = _controller(queue_size=0, timeout=10)
+
+    async def main() -> None:
+        response = await _while_slot_is_held(
+            controller, "/api/slow", "GET", lambda client: client.get("/metrics")
+        )
+        assert response.status_code == 200
+        assert response.text == "metrics"
+
+    asyncio.run(main())
+    assert controller.authenticated.stats.rejected == 0
+    assert admission.classify(settings.metrics.path) is None
@@ -0,0 +1,90 @@
+"""
+Алгоритмы хеширования паролей: проверка хешей любого поддерживаемого формата
+(bcrypt, scrypt, argon2 — если установлен argon2-cffi) и needs_rehash при смене
+стоимости или алгоритма в настройках. Стоимость минимальная, чтобы тесты были быстрыми.
+"""
+import asyncio
+
+import pytest
+
+from src.core.security.executor import PasswordExecutor
+from src.core.security.hashers import (
+    Argon2Hasher,
+    BcryptHasher,
+    PasswordHasher,
+    ScryptHasher,
+    argon2,
+    identify_hasher,
+)
+
+needs_argon2 = pytest.mark.skipif(argon2 is None, reason="argon2-cffi is not installed")
+
+HASHERS = [
+    pytest.param(BcryptHasher(rounds=4), BcryptHasher(rounds=5), id="bcrypt"),
+    pytest.param(ScryptHasher(ln=4), ScryptHasher(ln=5), id="scrypt"),
+    pytest.param(
+        Argon2Hasher(time_cost=1, memory_cost=8),
+        Argon2Hasher(time_cost=2, memory_cost=8),
+        id="argon2",
+        marks=needs_argon2,
+    ),
+]
+
+
+@pytest.mark.parametrize("hasher, costlier", HASHERS)
+def test_verify(hasher: PasswordHasher, costlier: PasswordHasher):
+    encoded = hasher.hash("correct horse")
+
+    assert hasher.identify(encoded)
+    assert hasher.verify("correct horse", encoded)
+    assert not hasher.verify("wrong horse", encoded)
+    # параметры берутся из самого хеша, а не из экземпляра
+    assert costlier.verify("correct horse", encoded)
+    assert not hasher.verify("correct horse", encoded[:-4])
+
+
+@pytest.mark.parametrize("hasher, costlier", HASHERS)
+def test_needs_rehash_on_cost_change(hasher: PasswordHasher, costlier: PasswordHasher):
+    encoded = hasher.hash("correct horse")
+
+    assert not hasher.needs_rehash(encoded)
+    assert costlier.needs_rehash(encoded)
+    assert not costlier.needs_rehash(costlier.hash("correct horse"))
+
+
+def test_executor_verifies_every_format():
+    executor = PasswordExecutor(workers=0, hasher=ScryptHasher(ln=4))
+    hashes = [BcryptHasher(rounds=4).hash("pw"), ScryptHasher(ln=5).hash("pw")]
+    if argon2 is not None:
+        hashes.append(Argon2Hasher(time_cost=1, memory_cost=8).hash("pw"))
+
+    async def main() -> list[bool]:
+        return [await executor.verify(password, h) for h in hashes for password in ("pw", "other")]
+
+    assert asyncio.run(main()) == [True, False] * len(hashes)
+    assert asyncio.run(executor.verify("pw", "$unknown$hash")) is False
+    assert identify_hasher("plain-text") is None
+
+
+@pytest.mark.parametrize(
+    "current, configured",
+    [
+        pytest.param(BcryptHasher(rounds=4), ScryptHasher(ln=4), id="bcrypt-to-scrypt"),
+        pytest.param(ScryptHasher(ln=4), BcryptHasher(rounds=4), id="scrypt-to-bcrypt"),
+        pytest.param(BcryptHasher(rounds=4), Argon2Hasher(time_cost=1, memory_cost=8),
+                     id="bcrypt-to-argon2", marks=needs_argon2),
+    ],
+)
+def test_executor_needs_rehash_on_algorithm_change(current: PasswordHasher, configured: PasswordHasher):
+    encoded = current.hash("pw")
+
+    assert not PasswordExecutor(workers=0, hasher=current).needs_rehash(encoded)
+    assert PasswordExecutor(workers=0, hasher=configured).needs_rehash(encoded)
+
+
+def test_executor_needs_rehash_on_cost_change():
+    encoded = BcryptHasher(rounds=4).hash("pw")
+
+    assert not PasswordExecutor(workers=0, hasher=BcryptHasher(rounds=4)).needs_rehash(encoded)
+    assert PasswordExecutor(workers=0, hasher=BcryptHasher(rounds=5)).needs_rehash(encoded)
+    assert PasswordExecutor(workers=0, hasher=BcryptHasher(rounds=4)).needs_rehash("$unknown$hash")
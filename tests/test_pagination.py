@@ -0,0 +1,127 @@
+"""
+Keyset-пагинация пользователей в админке: курсор (created_at, id) переживает
+кодирование, страницы по next_cursor покрывают всех пользователей без повторов,
+а битый курсор даёт 400, не доходя до БД.
+"""
+import asyncio
+import base64
+import datetime
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.admins.services import AdminService
+from src.api.auth.services import COOKIE_NAME, AuthService
+from src.core.infra.pagination import InvalidCursor, decode_cursor, encode_cursor
+from src.database import db_helper
+from src.database.repositories.principals import Principal
+from src.main import app
+
+UTC = datetime.timezone.utc
+MSK = datetime.timezone(datetime.timedelta(hours=3))
+
+
+@pytest.mark.parametrize(
+    "created_at",
+    [
+        datetime.datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=UTC),
+        datetime.datetime(2025, 3, 1, 15, 30, tzinfo=MSK),
+    ],
+)
+def test_cursor_round_trip(created_at):
+    cursor = encode_cursor(created_at, 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "!!!",
+        "a",
+        _b64(b"not json"),
+        _b64(b"[]"),
+        _b64(b'["2025-03-01T12:00:00+00:00"]'),
+        _b64(b'["not a date", 1]'),
+        _b64(b'["2025-03-01T12:00:00+00:00", "1"]'),
+        _b64(b'["2025-03-01T12:00:00", 1]'),  # без часового пояса
+        _b64(b'{"created_at": 1}'),
+    ],
+)
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+class MemoryUsers:
+    """UserRepository.list_page над списком в памяти: тот же порядок и keyset-условие."""
+
+    def __init__(self, count: int) -> None:
+        start = datetime.datetime(2025, 1, 1, tzinfo=UTC)
+        # по две строки на одну секунду: порядок внутри секунды решает id
+        self.rows = [
+            SimpleNamespace(
+                id=i,
+                email=f"user{i}@example.com",
+                first_name="User",
+                last_name=str(i),
+                middle_name=None,
+                is_active=True,
+                created_at=start + datetime.timedelta(seconds=i // 2),
+            )
+            for i in range(1, count + 1)
+        ]
+
+    async def list_page(self, *, limit: int, after: Optional[tuple] = None, **filters: Any) -> list:
+        ordered = sorted(self.rows, key=lambda u: (u.created_at, u.id), reverse=True)
+        if after is not None:
+            ordered = [u for u in ordered if (u.created_at, u.id) < after]
+        return [(u, False, False) for u in ordered[:limit]]
+
+
+def test_pages_follow_next_cursor():
+    service = AdminService(None, None)
+    service.users = MemoryUsers(23)
+
+    async def main() -> list[list[int]]:
+        pages, cursor = [], None
+        while True:
+            page = await service.list_users(limit=5, cursor=cursor)
+            pages.append([item.id for item in page.items])
+            if page.next_cursor is None:
+                return pages
+            cursor = page.next_cursor
+
+    pages = asyncio.run(main())
+
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    assert sum(pages, []) == list(range(23, 0, -1))
+
+
+def test_invalid_cursor_returns_400(monkeypatch):
+    class Session:
+        async def __aenter__(self) -> "Session":
+            return self
+
+        async def __aexit__(self, *exc: Any) -> None:
+            pass
+
+    async def get_current_principal(self: AuthService, sid: str) -> Principal:
+        return Principal(1, True, True, False)
+
+    monkeypatch.setattr(db_helper, "session_factory", Session, raising=False)
+    monkeypatch.setattr(AuthService, "get_current_principal", get_current_principal)
+
+    client = TestClient(app)
+    client.cookies.set(COOKIE_NAME, "sid")
+    response = client.get("/api/admins/users", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert "Invalid cursor" in response.text
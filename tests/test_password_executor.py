@@ -0,0 +1,64 @@
+"""
+Массовое хеширование (hash_many): отдельная операция в метриках и не больше
+batch_workers одновременно занятых воркеров — остальные остаются для входа.
+"""
+import asyncio
+import threading
+import time
+
+from src.core.metrics import password_hash_duration
+from src.core.security.executor import PasswordExecutor
+from src.core.security.hashers import PasswordHasher
+
+
+class SlowHasher(PasswordHasher):
+    """Считает, сколько паролей хешируется одновременно (workers=0 — пул потоков)."""
+
+    algorithm = "slow"
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def hash(self, password: str) -> str:
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        return f"slow${password}"
+
+
+def _observations(operation: str) -> int:
+    series = password_hash_duration._series.get((operation,))
+    return sum(series[0]) if series else 0
+
+
+def test_hash_many_is_capped_and_labelled():
+    hasher = SlowHasher()
+    executor = PasswordExecutor(workers=0, hasher=hasher, batch_workers=2)
+    hash_before, batch_before = _observations("hash"), _observations("hash_batch")
+
+    async def main() -> list[list[str]]:
+        # два импорта одновременно делят одни и те же batch_workers слотов
+        return await asyncio.gather(
+            executor.hash_many([f"a{i}" for i in range(8)]),
+            executor.hash_many([f"b{i}" for i in range(8)]),
+        )
+
+    first, second = asyncio.run(main())
+
+    assert first == [f"slow$a{i}" for i in range(8)]
+    assert second == [f"slow$b{i}" for i in range(8)]
+    assert hasher.max_active <= 2
+    assert executor.stats.hash.count == 0
+    assert executor.stats.hash_batch.count == 4
+    assert _observations("hash") == hash_before
+    assert _observations("hash_batch") - batch_before == 4
+
+
+def test_batch_workers_default_to_half_of_the_pool():
+    assert PasswordExecutor(workers=8, hasher=SlowHasher()).batch_workers == 4
+    assert PasswordExecutor(workers=1, hasher=SlowHasher()).batch_workers == 1
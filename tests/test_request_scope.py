@@ -0,0 +1,114 @@
+"""
+Один AsyncSession (и не больше одного соединения из пула) на запрос: guard'ы и
+сервисы ручки берут AuthService и сессию из одного request-scope контейнера Dishka.
+
+БД и Redis не нужны: фабрика сессий db_helper подменяется счётчиком, а методы,
+которые ходят в хранилища, — заглушками, запоминающими, с каким AuthService их вызвали.
+"""
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.admins.services import AdminService
+from src.api.auth.schemas import UserSnapshot
+from src.api.auth.services import COOKIE_NAME, AuthService
+from src.api.users.services import UserService
+from src.database import db_helper
+from src.main import app
+
+USER = dict(id=1, email="admin@example.com", first_name="Normal", last_name="Admin", is_active=True)
+
+
+class FakeSession:
+    def __init__(self, factory: "CountingSessionFactory") -> None:
+        self.factory = factory
+
+    async def __aenter__(self) -> "FakeSession":
+        self.factory.opened += 1
+        self.factory.active += 1
+        self.factory.max_active = max(self.factory.max_active, self.factory.active)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.factory.active -= 1
+
+
+class CountingSessionFactory:
+    """Вместо async_sessionmaker: считает открытые и одновременно живые сессии."""
+
+    def __init__(self) -> None:
+        self.opened = 0
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self) -> FakeSession:
+        return FakeSession(self)
+
+
+@pytest.fixture
+def sessions(monkeypatch: pytest.MonkeyPatch) -> CountingSessionFactory:
+    factory = CountingSessionFactory()
+    # session_factory — cached_property: атрибут экземпляра его перекрывает
+    monkeypatch.setattr(db_helper, "session_factory", factory, raising=False)
+    return factory
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, AuthService, Any]]:
+    """(имя вызова, AuthService, AsyncSession) для guard'ов и сервисов ручки."""
+    seen: list[tuple[str, AuthService, Any]] = []
+    snapshot = UserSnapshot(**USER, is_admin=True, version="1")
+
+    async def get_current_user(self: AuthService, sid: str) -> UserSnapshot:
+        seen.append(("guard", self, self.session))
+        return snapshot
+
+    async def get_current_principal(self: AuthService, sid: str) -> UserSnapshot:
+        seen.append(("guard", self, self.session))
+        return snapshot
+
+    async def update_profile(self: UserService, user_id: int, data: Any) -> dict:
+        seen.append(("service", self.auth_service, self.session))
+        return {**USER, "middle_name": None, **data.model_dump(exclude_unset=True)}
+
+    async def list_admins(self: AdminService) -> list:
+        seen.append(("service", self.auth_service, self.session))
+        return []
+
+    monkeypatch.setattr(AuthService, "get_current_user", get_current_user)
+    monkeypatch.setattr(AuthService, "get_current_principal", get_current_principal)
+    monkeypatch.setattr(UserService, "update_profile", update_profile)
+    monkeypatch.setattr(AdminService, "list_admins", list_admins)
+    return seen
+
+
+@pytest.fixture
+def client() -> TestClient:
+    # без with: lifespan (подключение к БД, Redis, брокеру) не запускается
+    client = TestClient(app)
+    client.cookies.set(COOKIE_NAME, "sid")
+    return client
+
+
+@pytest.mark.parametrize(
+    "method, path, body",
+    [
+        ("PATCH", "/api/users/me", {"first_name": "Renamed"}),
+        ("GET", "/api/admins", None),
+    ],
+)
+def test_one_session_and_auth_service_per_request(client, sessions, calls, method, path, body):
+    for _ in range(2):
+        calls.clear()
+        opened = sessions.opened
+        response = client.request(method, path, json=body)
+        assert response.status_code == 200, response.text
+
+        assert sessions.opened - opened == 1
+        assert {"guard", "service"} <= {name for name, _, _ in calls}
+        assert len({id(service) for _, service, _ in calls}) == 1
+        assert len({id(session) for _, _, session in calls}) == 1
+
+    assert sessions.max_active == 1
+    assert sessions.active == 0
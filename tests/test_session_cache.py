@@ -0,0 +1,123 @@
+"""
+L1-кеш сессий (SessionCache): инвалидация, пришедшая между чтением из Redis (begin)
+и сохранением (complete), не даёт закешировать устаревшее значение; потеря или
+переподключение соединения трекинга очищает кеш и выключает его до нового трекинга.
+
+Redis не нужен: состояние «трекинг установлен» выставляется напрямую, уведомления
+подаются в _on_invalidate так же, как их передаёт _listen.
+"""
+import asyncio
+
+import pytest
+
+from src.redis_storage.session_cache import SessionCache
+from src.redis_storage.session_codec import SessionRecord
+
+KEY = "sess:ab12cd34:ab12cd34.sid"
+OTHER_KEY = "sess:ab12cd34:ab12cd34.other"
+RECORD = SessionRecord(user_id=7, issued_at=0, expires_at=0)
+
+
+@pytest.fixture
+def cache() -> SessionCache:
+    cache = SessionCache("redis://unused", prefix="sess", user_prefix="user_ver", max_size=10, ttl=60)
+    cache.active = True
+    return cache
+
+
+def test_read_without_invalidation_is_cached(cache):
+    seen = cache.begin(KEY)
+    cache.complete(KEY, seen, RECORD)
+
+    assert cache.get(KEY) == RECORD
+    assert cache._inflight == {}
+
+
+@pytest.mark.parametrize(
+    "keys",
+    [
+        pytest.param([KEY], id="session-key"),
+        pytest.param(["user_ver:{ab12cd34}:7"], id="user-version"),
+        pytest.param(None, id="flush"),
+    ],
+)
+def test_invalidation_during_read_prevents_caching(cache, keys):
+    seen = cache.begin(KEY)
+    cache._on_invalidate(keys)
+    cache.complete(KEY, seen, RECORD)
+
+    assert cache.get(KEY) is None
+    assert cache._inflight == {}
+
+    # следующее чтение после инвалидации кешируется как обычно
+    seen = cache.begin(KEY)
+    cache.complete(KEY, seen, RECORD)
+    assert cache.get(KEY) == RECORD
+
+
+def test_invalidation_of_another_key_does_not_block(cache):
+    seen = cache.begin(KEY)
+    cache._on_invalidate([OTHER_KEY])
+    cache.complete(KEY, seen, RECORD)
+
+    assert cache.get(KEY) == RECORD
+
+
+def test_overlapping_reads_of_one_key(cache):
+    first = cache.begin(KEY)
+    cache._on_invalidate([KEY])
+    second = cache.begin(KEY)
+
+    cache.complete(KEY, first, RECORD)
+    assert cache.get(KEY) is None
+    # второе чтение началось после инвалидации — его значение свежее
+    cache.complete(KEY, second, RECORD)
+    assert cache.get(KEY) == RECORD
+
+
+def test_reconnect_flushes_and_disables(cache):
+    cache._control = object()
+    seen = cache.begin(KEY)
+    cache.complete(KEY, cache.begin(OTHER_KEY), RECORD)
+
+    cache._on_reconnect(None)
+
+    assert cache._broken
+    assert not cache.active
+    assert cache.tracking_client is None
+    assert cache._entries == {}
+    # чтение, начатое до переподключения, в кеш не попадает
+    cache.complete(KEY, seen, RECORD)
+    assert cache._entries == {}
+    # пока трекинг не восстановлен, кеш не используется
+    assert cache.begin(KEY) is None
+    assert cache.get(OTHER_KEY) is None
+
+
+def test_lost_tracking_connection_disables_cache():
+    cache = SessionCache("redis://unused", prefix="sess", max_size=10, ttl=60, retry_delay=60)
+    attempts = []
+
+    async def listen() -> None:
+        # трекинг установлен, запись закеширована, затем соединение обрывается
+        attempts.append(1)
+        cache.active = True
+        cache.complete(KEY, cache.begin(KEY), RECORD)
+        assert cache.get(KEY) == RECORD
+        raise ConnectionError("connection reset")
+
+    cache._listen = listen
+
+    async def main() -> None:
+        task = asyncio.create_task(cache._run())
+        while not attempts:
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert not cache.active
+        assert cache._entries == {}
+        assert cache.get(KEY) is None
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Формат значения sess:* (session_codec): упаковка и разбор сессии со снапшотом и без,
+чтение старого формата (хеш со строковыми полями) и повреждённое значение —
+для клиента это истёкшая сессия, а не 500.
+"""
+import asyncio
+import datetime
+
+import pytest
+
+from src.api.auth.services import AuthService
+from src.core.infra.exceptions import SessionExpired
+from src.redis_storage import scripts
+from src.redis_storage.repositories.sessions import SessionRepo
+from src.redis_storage.session_codec import (
+    FLAG_ACTIVE,
+    FLAG_ADMIN,
+    FLAG_SUPER_ADMIN,
+    SessionRecord,
+    decode_legacy_session,
+    decode_session,
+    encode_session,
+)
+
+BARE = SessionRecord(user_id=7, issued_at=1_700_000_000, expires_at=1_700_086_400)
+SNAPSHOT = SessionRecord(
+    user_id=7,
+    issued_at=1_700_000_000,
+    expires_at=1_700_086_400,
+    version="3",
+    email="ivan@example.com",
+    first_name="Иван",
+    last_name="Петров",
+    middle_name=None,
+    flags=FLAG_ACTIVE | FLAG_ADMIN,
+)
+
+
+@pytest.mark.parametrize("record", [BARE, SNAPSHOT], ids=["bare", "snapshot"])
+def test_round_trip(record):
+    value = encode_session(record)
+    assert decode_session(value) == record
+
+
+def test_bare_record_has_no_snapshot():
+    assert encode_session(BARE) == "[2,7,1700000000,1700086400]"
+    assert decode_session(encode_session(BARE)).version is None
+
+
+def _iso(timestamp: int) -> str:
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc).isoformat()
+
+
+def test_legacy_hash():
+    legacy = {
+        "user_id": "7",
+        "issued_at": _iso(SNAPSHOT.issued_at),
+        "expires_at": _iso(SNAPSHOT.expires_at),
+        "ver": "3",
+        "email": "ivan@example.com",
+        "first_name": "Иван",
+        "last_name": "Петров",
+        "middle_name": "",
+        "is_active": "1",
+        "is_admin": "1",
+        "is_super_admin": "0",
+    }
+    assert decode_legacy_session(legacy) == SNAPSHOT
+    assert decode_legacy_session({"user_id": "7", "issued_at": legacy["issued_at"]}) == SessionRecord(
+        7, SNAPSHOT.issued_at, 0
+    )
+    flags = decode_legacy_session({**legacy, "is_active": "0", "is_super_admin": "1"}).flags
+    assert flags == FLAG_ADMIN | FLAG_SUPER_ADMIN
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["", "not json", "5", "{}", "[]", "[1,7,0,0]", "[2,7]", "[2,7,0,0,\"3\"]"],
+)
+def test_malformed_value_is_rejected(value):
+    with pytest.raises(ValueError):
+        decode_session(value)
+
+
+def test_malformed_legacy_hash_is_rejected():
+    with pytest.raises(ValueError):
+        decode_legacy_session({"issued_at": "2024-01-01T00:00:00"})
+    with pytest.raises(ValueError):
+        decode_legacy_session({"user_id": "7", "ver": "1"})
+
+
+@pytest.mark.parametrize("lua", [True, False], ids=["script", "pipeline"])
+def test_stored_sessions_are_decoded_and_corrupted_one_expires(memory_redis, monkeypatch, lua):
+    monkeypatch.setattr(scripts, "scripts_available", lua)
+    service = AuthService(None, snapshot_enabled=False, session_mode="redis")
+
+    async def main() -> None:
+        sid = SessionRepo.make_sid(7)
+        key = SessionRepo(key=sid)._key()
+
+        await memory_redis.set(key, encode_session(SNAPSHOT), ex=60)
+        record, _, pttl = await SessionRepo(key=sid).load()
+        assert record == SNAPSHOT and pttl > 0
+
+        await memory_redis.delete(key)
+        await memory_redis.hset(key, mapping={"user_id": "7", "issued_at": _iso(BARE.issued_at)})
+        record, _, _ = await SessionRepo(key=sid).load()
+        assert record == SessionRecord(7, BARE.issued_at, 0)
+
+        await memory_redis.delete(key)
+        await memory_redis.set(key, "[2,7", ex=60)
+        with pytest.raises(SessionExpired):
+            await service.get_current_user(sid)
+
+    asyncio.run(main())
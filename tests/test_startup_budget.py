@@ -0,0 +1,30 @@
+"""
+Бюджет холодного старта процесса API: `import src.main` и startup приложения
+(lifespan) укладываются в benchmarks.importtime.DEFAULT_BUDGET_MS, а модули,
+которые должны загружаться лениво (taskiq, aio-pika, uvicorn), при этом не загружаются.
+
+Бюджет для медленной машины — переменная окружения STARTUP_BUDGET_MS.
+"""
+import statistics
+
+from benchmarks.importtime import DEFAULT_BUDGET_MS, DEFAULT_FORBIDDEN, forbidden_modules, measure_startup
+
+RUNS = 3
+
+
+def test_import_and_startup_within_budget():
+    # первый прогон прогревает .pyc и файловый кеш
+    warmup = measure_startup()
+    assert warmup.startup_ms is not None
+
+    runs = [measure_startup() for _ in range(RUNS)]
+    median = statistics.median(m.total_ms for m in runs)
+    assert median <= DEFAULT_BUDGET_MS, (
+        f"import + startup median {median:.0f} ms > budget {DEFAULT_BUDGET_MS:.0f} ms: "
+        + ", ".join(f"{m.import_ms:.0f}+{m.startup_ms:.0f}" for m in runs)
+    )
+
+
+def test_lazy_modules_are_not_loaded_on_startup():
+    loaded = [name for name in forbidden_modules(measure_startup().modules, DEFAULT_FORBIDDEN) if "." not in name]
+    assert loaded == []
@@ -0,0 +1,102 @@
+"""
+Ограничение попыток входа (LoginThrottle): сверх лимита login отвечает TooManyRequests
+до запроса в БД и хеширования пароля; ключи email и IP в GCRA-скрипте расходуются
+вместе или не расходуются вовсе; без Lua-скриптов работает фиксированное окно.
+"""
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import src.api.auth.services as auth_services
+from src.api.auth.services import AuthService
+from src.core.infra.exceptions import InvalidCredentials, TooManyRequests
+from src.redis_storage import scripts
+from src.redis_storage.throttle import LoginThrottle
+
+
+def _throttle(*, email_limit: int = 2, ip_limit: int = 5) -> LoginThrottle:
+    return LoginThrottle(email_limit=email_limit, email_period=60, ip_limit=ip_limit, ip_period=60)
+
+
+class CountingSession:
+    """AsyncSession для login: считает запросы пользователя."""
+
+    def __init__(self) -> None:
+        self.queries = 0
+
+    async def scalar(self, stmt: Any) -> Any:
+        self.queries += 1
+        return SimpleNamespace(password_hash="hash", is_active=True)
+
+
+def test_over_limit_is_rejected_before_db_and_hashing(memory_redis, monkeypatch):
+    monkeypatch.setattr(auth_services, "login_throttle", _throttle())
+    checks: list[str] = []
+
+    async def check_password(password: str, password_hash: str) -> bool:
+        checks.append(password)
+        return False
+
+    monkeypatch.setattr(AuthService, "_check_password", staticmethod(check_password))
+    session = CountingSession()
+    service = AuthService(session, session_mode="redis")
+
+    async def main() -> None:
+        for attempt in range(2):
+            with pytest.raises(InvalidCredentials):
+                await service.login("user@example.com", f"wrong{attempt}", "10.0.0.1")
+        with pytest.raises(TooManyRequests) as exc:
+            await service.login("user@example.com", "wrong2", "10.0.0.1")
+        assert exc.value.extra["retry_after"] > 0
+
+    asyncio.run(main())
+    assert checks == ["wrong0", "wrong1"]
+    assert session.queries == 2
+
+
+def test_email_and_ip_are_consumed_together(memory_redis):
+    throttle = _throttle(email_limit=2, ip_limit=3)
+    email_key, ip_key = throttle._email_key("a@example.com"), throttle._ip_key("10.0.0.1")
+
+    async def main() -> None:
+        assert await throttle.hit("a@example.com", "10.0.0.1") == 0
+        assert await throttle.hit("a@example.com", "10.0.0.1") == 0
+        state = await memory_redis.mget(email_key, ip_key)
+        assert None not in state
+
+        # email исчерпан: попытка отклонена, и счётчик IP не тронут
+        assert await throttle.hit("a@example.com", "10.0.0.1") > 0
+        assert await memory_redis.mget(email_key, ip_key) == state
+
+        # у IP остаётся одна попытка: её расходует другой email, затем IP исчерпан,
+        # и отказ по IP не расходует лимит нового email
+        assert await throttle.hit("b@example.com", "10.0.0.1") == 0
+        assert await throttle.hit("c@example.com", "10.0.0.1") > 0
+        assert not await memory_redis.exists(throttle._email_key("c@example.com"))
+        assert await throttle.hit("c@example.com", "10.0.0.2") == 0
+
+    asyncio.run(main())
+
+
+def test_fixed_window_without_scripts(memory_redis, monkeypatch):
+    monkeypatch.setattr(scripts, "scripts_available", False)
+
+    async def fail(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("GCRA script must not run without scripts")
+
+    monkeypatch.setattr(scripts, "GCRA_HIT", fail)
+    throttle = _throttle(email_limit=2, ip_limit=5)
+    email_key = throttle._email_key("a@example.com")
+
+    async def main() -> None:
+        assert await throttle.hit("a@example.com", "10.0.0.1") == 0
+        assert await throttle.hit("a@example.com", "10.0.0.1") == 0
+        retry = await throttle.hit("a@example.com", "10.0.0.1")
+        assert 0 < retry <= 60
+        assert await memory_redis.get(f"{email_key}:w") == "3"
+        assert 0 < await memory_redis.ttl(f"{email_key}:w") <= 60
+        assert not await memory_redis.exists(email_key)
+
+    asyncio.run(main())
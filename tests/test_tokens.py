@@ -0,0 +1,172 @@
+"""
+Подписанные токены сессии (SESSION_MODE=token): подпись и разбор, подделанная
+подпись или payload, срок жизни и окно обновления, список отзыва (sess_revoked:{jti}
+и отсечка пользователя sess_revoked_user:{user_id}) и cookie обновлённого токена
+в потоковой выгрузке пользователей.
+"""
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.api.auth.services as auth_services
+from src.api.admins.services import AdminService
+from src.api.auth.services import COOKIE_NAME, AuthService
+from src.core.infra.exceptions import SessionExpired
+from src.core.security.tokens import SessionToken, TokenSigner, _b64decode, _b64encode
+from src.database import db_helper
+from src.database.repositories.principals import Principal, PrincipalRepository
+from src.main import app
+from src.redis_storage.revocations import revoke_token, revoke_user_tokens
+
+SIGNER = TokenSigner("test-secret")
+HOUR_MS = 3600 * 1000
+
+
+def _token(*, expires_in: int, refresh_in: int, issued_ago: int = 0, jti: str = "jti-1") -> SessionToken:
+    now = int(time.time() * 1000)
+    return SessionToken(
+        user_id=7,
+        jti=jti,
+        issued_at=now - issued_ago,
+        expires_at=now + expires_in,
+        refresh_until=now + refresh_in,
+        is_admin=True,
+    )
+
+
+def test_sign_and_load():
+    token = _token(expires_in=HOUR_MS, refresh_in=24 * HOUR_MS)
+    value = SIGNER.sign(token)
+
+    assert TokenSigner.is_token(value)
+    assert SIGNER.load(value) == token
+    assert TokenSigner("other-secret").load(value) is None
+
+
+def test_tampered_token_is_rejected():
+    value = SIGNER.sign(_token(expires_in=HOUR_MS, refresh_in=24 * HOUR_MS))
+    version, payload, signature = value.split(".")
+
+    body = json.loads(_b64decode(payload))
+    body[0] = 1  # чужой user_id
+    forged_payload = _b64encode(json.dumps(body, separators=(",", ":")).encode())
+    forged_signature = _b64encode(b"\x00" * 32)
+
+    assert SIGNER.load(f"{version}.{forged_payload}.{signature}") is None
+    assert SIGNER.load(f"{version}.{payload}.{forged_signature}") is None
+    assert SIGNER.load(f"v2.{payload}.{signature}") is None
+    assert SIGNER.load(f"{version}.{payload}") is None
+    assert SIGNER.load("not-a-token") is None
+
+
+@pytest.fixture
+def lookups(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """user_id, для которых флаги читались из БД (заглушка PrincipalRepository.get)."""
+    seen: list[int] = []
+
+    async def get(self: PrincipalRepository, user_id: int) -> Optional[Principal]:
+        seen.append(user_id)
+        return Principal(user_id, True, False, False)
+
+    monkeypatch.setattr(PrincipalRepository, "get", get)
+    return seen
+
+
+@pytest.fixture
+def service(monkeypatch: pytest.MonkeyPatch, lookups: list[int]) -> AuthService:
+    monkeypatch.setattr(auth_services, "token_signer", SIGNER)
+    return AuthService(None, session_mode="token", session_ttl=24 * 3600, token_ttl=600)
+
+
+def test_valid_token_needs_no_storage(service, lookups):
+    token = _token(expires_in=HOUR_MS, refresh_in=24 * HOUR_MS)
+
+    # без memory_redis: любое обращение к Redis или БД здесь бы упало
+    assert asyncio.run(service._authenticate_token(SIGNER.sign(token))) == token
+    assert service.refreshed_token is None
+    assert lookups == []
+
+
+def test_expired_token_is_refreshed_within_window(service, lookups, memory_redis):
+    token = _token(expires_in=-1000, refresh_in=HOUR_MS, issued_ago=HOUR_MS)
+
+    renewed = asyncio.run(service._authenticate_token(SIGNER.sign(token)))
+
+    assert lookups == [7]
+    assert renewed.jti == token.jti
+    assert renewed.issued_at > token.issued_at
+    assert renewed.expires_at - renewed.issued_at == 600 * 1000
+    # флаги — из БД, а не из старого токена
+    assert renewed.is_admin is False
+    assert SIGNER.load(service.refreshed_token) == renewed
+
+
+def test_token_past_refresh_window_expires(service, lookups):
+    token = _token(expires_in=-2000, refresh_in=-1000, issued_ago=HOUR_MS)
+
+    with pytest.raises(SessionExpired):
+        asyncio.run(service._authenticate_token(SIGNER.sign(token)))
+    assert lookups == []
+
+
+def test_revoked_token_is_not_refreshed(service, memory_redis):
+    revoked = _token(expires_in=-1000, refresh_in=HOUR_MS, issued_ago=HOUR_MS, jti="revoked")
+    other = _token(expires_in=-1000, refresh_in=HOUR_MS, issued_ago=HOUR_MS, jti="other")
+
+    async def main() -> None:
+        await revoke_token("revoked", 60)
+        assert await memory_redis.ttl("sess_revoked:revoked") > 0
+        with pytest.raises(SessionExpired):
+            await service._authenticate_token(SIGNER.sign(revoked))
+        await service._authenticate_token(SIGNER.sign(other))
+
+    asyncio.run(main())
+
+
+def test_user_cutoff_revokes_tokens_issued_before_it(service, memory_redis):
+    cutoff = int(time.time() * 1000) - HOUR_MS // 2
+    before = _token(expires_in=-1000, refresh_in=HOUR_MS, issued_ago=HOUR_MS, jti="before")
+    after = _token(expires_in=-1000, refresh_in=HOUR_MS, issued_ago=HOUR_MS // 4, jti="after")
+
+    async def main() -> None:
+        await revoke_user_tokens(7, cutoff, 60)
+        with pytest.raises(SessionExpired):
+            await service._authenticate_token(SIGNER.sign(before))
+        await service._authenticate_token(SIGNER.sign(after))
+
+    asyncio.run(main())
+
+
+class _Session:
+    async def __aenter__(self) -> "_Session":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        pass
+
+
+def test_export_keeps_refreshed_token_cookie(monkeypatch):
+    monkeypatch.setattr(db_helper, "session_factory", _Session, raising=False)
+
+    async def get_current_principal(self: AuthService, sid: str) -> Principal:
+        self.refreshed_token = "v1.renewed.token"
+        return Principal(1, True, True, False)
+
+    async def export_users(self: AdminService, fmt: str) -> AsyncIterator[str]:
+        yield '{"id":1}\n'
+
+    monkeypatch.setattr(AuthService, "get_current_principal", get_current_principal)
+    monkeypatch.setattr(AdminService, "export_users", export_users)
+
+    client = TestClient(app)
+    client.cookies.set(COOKIE_NAME, "v1.expired.token")
+    response = client.get("/api/admins/users/export")
+
+    assert response.status_code == 200, response.text
+    assert response.text == '{"id":1}\n'
+    assert response.cookies.get(COOKIE_NAME) == "v1.renewed.token"
+    assert "attachment" in response.headers["content-disposition"]